@@ -3,6 +3,7 @@ import os
 from dotenv import load_dotenv
 
 from sqlalchemy import engine_from_config
+from sqlalchemy import inspect
 from sqlalchemy import pool
 
 from alembic import context
@@ -73,6 +74,14 @@ def run_migrations_online() -> None:
             connection=connection, target_metadata=target_metadata
         )
 
+        if not inspect(connection).get_table_names():
+            # The revisions start from the schema older versions created at startup, so an
+            # empty database gets today's schema from the models and is stamped at head
+            target_metadata.create_all(connection)
+            context.get_context().stamp(context.script, "heads")
+            connection.commit()
+            return
+
         with context.begin_transaction():
             context.run_migrations()
 
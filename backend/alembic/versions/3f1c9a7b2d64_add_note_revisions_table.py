@@ -0,0 +1,42 @@
+"""Add note_revisions table for compact note history
+
+Revision ID: 3f1c9a7b2d64
+Revises: 6d3b8f2a4c17
+Create Date: 2026-10-19 10:02:41.517203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7b2d64'
+down_revision: Union[str, Sequence[str], None] = '6d3b8f2a4c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'note_revisions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('note_id', sa.Integer(), nullable=False),
+        sa.Column('rev', sa.Integer(), nullable=False),
+        sa.Column('is_snapshot', sa.Boolean(), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['note_id'], ['notes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_note_revisions_id'), 'note_revisions', ['id'], unique=False)
+    op.create_index('ix_note_revisions_note_rev', 'note_revisions', ['note_id', 'rev'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_note_revisions_note_rev', table_name='note_revisions')
+    op.drop_index(op.f('ix_note_revisions_id'), table_name='note_revisions')
+    op.drop_table('note_revisions')
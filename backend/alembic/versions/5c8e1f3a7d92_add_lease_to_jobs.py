@@ -0,0 +1,31 @@
+"""Add jobs.lease_expires_at
+
+Revision ID: 5c8e1f3a7d92
+Revises: a9d2e5c7b310
+Create Date: 2026-10-19 21:14:52.108337
+
+A worker renews the lease of the job it is running; only running jobs whose
+lease lapsed are put back to pending, so several processes can share the
+jobs table without re-running each other's work (see backend/jobs.py).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c8e1f3a7d92'
+down_revision: Union[str, Sequence[str], None] = 'a9d2e5c7b310'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('jobs', sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('jobs', 'lease_expires_at')
@@ -0,0 +1,56 @@
+"""Add parent_child_links table and restore parents.child_id
+
+Revision ID: 6d3b8f2a4c17
+Revises: 8adc50a73338
+Create Date: 2026-10-19 22:05:13.640921
+
+8adc50a73338 dropped parents.child_id while the application still reads it.
+Where it ran, the column comes back nullable (the old values are gone, so
+those parents relink with the family code); where the database was stamped
+past it instead, the column is kept and only made nullable. Links are then
+backfilled from it.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6d3b8f2a4c17'
+down_revision: Union[str, Sequence[str], None] = '8adc50a73338'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('parents')}
+    with op.batch_alter_table('parents') as batch_op:
+        if 'child_id' in columns:
+            batch_op.alter_column('child_id', existing_type=sa.Integer(), nullable=True)
+        else:
+            batch_op.add_column(sa.Column('child_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key('parents_child_id_fkey', 'children', ['child_id'], ['id'])
+
+    op.create_table(
+        'parent_child_links',
+        sa.Column('parent_id', sa.Integer(), nullable=False),
+        sa.Column('child_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['child_id'], ['children.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['parent_id'], ['parents.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('parent_id', 'child_id'),
+    )
+    op.create_index('ix_parent_child_links_child_id', 'parent_child_links', ['child_id'], unique=False)
+    op.execute(
+        "INSERT INTO parent_child_links (parent_id, child_id, created_at) "
+        "SELECT id, child_id, created_at FROM parents WHERE child_id IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # parents.child_id stays nullable: parents relinked after the upgrade may have no value to restore
+    op.drop_index('ix_parent_child_links_child_id', table_name='parent_child_links')
+    op.drop_table('parent_child_links')
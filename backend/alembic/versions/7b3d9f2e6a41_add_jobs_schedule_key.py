@@ -0,0 +1,32 @@
+"""Add jobs.schedule_key
+
+Revision ID: 7b3d9f2e6a41
+Revises: e1b7c4a9d205
+Create Date: 2026-10-20 16:03:52.418027
+
+Every worker process schedules the periodic jobs; in durable mode the
+unique key lets only the first of them queue each run.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3d9f2e6a41'
+down_revision: Union[str, Sequence[str], None] = 'e1b7c4a9d205'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('jobs', sa.Column('schedule_key', sa.String(length=160), nullable=True))
+    op.create_index('ux_jobs_schedule_key', 'jobs', ['schedule_key'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_jobs_schedule_key', table_name='jobs')
+    op.drop_column('jobs', 'schedule_key')
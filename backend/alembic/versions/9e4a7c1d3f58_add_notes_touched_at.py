@@ -0,0 +1,31 @@
+"""Add notes.touched_at
+
+Revision ID: 9e4a7c1d3f58
+Revises: 5c8e1f3a7d92
+Create Date: 2026-10-20 09:41:06.273519
+
+Checklist changes set it, so a note whose items are still being ticked off
+is not archived just because its title and content are old.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4a7c1d3f58'
+down_revision: Union[str, Sequence[str], None] = '5c8e1f3a7d92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable with no default: a metadata-only change, even on a large notes table
+    op.add_column('notes', sa.Column('touched_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('notes', 'touched_at')
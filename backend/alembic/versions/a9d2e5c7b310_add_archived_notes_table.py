@@ -0,0 +1,49 @@
+"""Add archived_notes table and notes.rehydrated_at
+
+Revision ID: a9d2e5c7b310
+Revises: f4b1c7d9a2e3
+Create Date: 2026-10-19 18:03:27.415806
+
+Notes untouched for ARCHIVE_AFTER_DAYS are moved out of the hot tables into
+one compressed row each (see backend/service/archive.py); rehydrated_at keeps
+a note restored on access from being archived again straight away.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d2e5c7b310'
+down_revision: Union[str, Sequence[str], None] = 'f4b1c7d9a2e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'archived_notes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.Column('raw_bytes', sa.Integer(), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('revision_data', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['owner_id'], ['children.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_archived_notes_owner_created', 'archived_notes', ['owner_id', 'created_at'], unique=False)
+    # Nullable with no default: a metadata-only change, even on a large notes table
+    op.add_column('notes', sa.Column('rehydrated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Archived notes are dropped with the table; rehydrate any that must be kept first
+    op.drop_column('notes', 'rehydrated_at')
+    op.drop_index('ix_archived_notes_owner_created', table_name='archived_notes')
+    op.drop_table('archived_notes')
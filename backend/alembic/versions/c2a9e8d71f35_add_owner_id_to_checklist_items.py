@@ -0,0 +1,49 @@
+"""Add owner_id to checklist_items (copy of notes.owner_id)
+
+Revision ID: c2a9e8d71f35
+Revises: b7e2d41c9f08
+Create Date: 2026-10-19 14:05:37.402951
+
+Checklist items carry their note's owner so they can be co-partitioned with
+notes by owner_id. Existing rows are backfilled in id batches, each committed
+separately so the table is never locked for the whole backfill.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2a9e8d71f35'
+down_revision: Union[str, Sequence[str], None] = 'b7e2d41c9f08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 50000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('checklist_items', sa.Column('owner_id', sa.Integer(), nullable=True))
+
+    conn = op.get_bind()
+    max_id = conn.execute(sa.text("SELECT COALESCE(max(id), 0) FROM checklist_items")).scalar()
+    with op.get_context().autocommit_block():
+        for lo in range(0, max_id, BATCH_SIZE):
+            conn.execute(sa.text(
+                "UPDATE checklist_items SET owner_id = "
+                "(SELECT notes.owner_id FROM notes WHERE notes.id = checklist_items.note_id) "
+                "WHERE id > :lo AND id <= :hi AND owner_id IS NULL"
+            ), {"lo": lo, "hi": lo + BATCH_SIZE})
+
+        op.create_index(
+            op.f('ix_checklist_items_owner_id'), 'checklist_items', ['owner_id'], unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_checklist_items_owner_id'), table_name='checklist_items')
+    op.drop_column('checklist_items', 'owner_id')
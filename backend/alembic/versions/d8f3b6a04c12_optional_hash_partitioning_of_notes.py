@@ -0,0 +1,48 @@
+"""Optional hash partitioning of notes and checklist_items by owner_id
+
+Revision ID: d8f3b6a04c12
+Revises: c2a9e8d71f35
+Create Date: 2026-10-19 14:31:02.685117
+
+A no-op unless running on PostgreSQL with a partition count, e.g.
+`alembic -x notes_partitions=16 upgrade head` (or NOTES_PARTITIONS=16).
+Deployments that skip it here can convert later, online, with
+`python -m backend.partitioning --partitions 16`. See backend/partitioning.py.
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import context, op
+
+from partitioning import is_partitioned, rebuild
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8f3b6a04c12'
+down_revision: Union[str, Sequence[str], None] = 'c2a9e8d71f35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _partitions() -> int:
+    value = context.get_x_argument(as_dictionary=True).get("notes_partitions") or os.getenv("NOTES_PARTITIONS")
+    return int(value) if value else 0
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    partitions = _partitions()
+    if conn.dialect.name != "postgresql" or not partitions or is_partitioned(conn):
+        return
+    with op.get_context().autocommit_block():
+        rebuild(conn, partitions)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql" or not is_partitioned(conn):
+        return
+    with op.get_context().autocommit_block():
+        rebuild(conn, None)
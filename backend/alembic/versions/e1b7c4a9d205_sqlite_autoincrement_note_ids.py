@@ -0,0 +1,71 @@
+"""Stop SQLite reusing note, checklist item and revision ids
+
+Revision ID: e1b7c4a9d205
+Revises: 9e4a7c1d3f58
+Create Date: 2026-10-20 14:12:47.905133
+
+Without AUTOINCREMENT SQLite hands out max(id) + 1, so an id held by an
+archived_notes row (or by an item or revision inside its payload) can be
+given to a new row, and rehydrating that note then fails. The tables are
+rebuilt with AUTOINCREMENT and sqlite_sequence is moved past every archived
+id. Other databases use sequences, which never reuse ids: nothing to do.
+"""
+import json
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1b7c4a9d205'
+down_revision: Union[str, Sequence[str], None] = '9e4a7c1d3f58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('notes', 'checklist_items', 'note_revisions')
+
+
+def archived_max_ids(conn) -> dict:
+    """Highest id per table still held by an archive row"""
+    highest = dict.fromkeys(TABLES, 0)
+    for note_id, data in conn.execute(sa.text("SELECT id, data FROM archived_notes")):
+        payload = json.loads(zlib.decompress(data))
+        highest['notes'] = max(highest['notes'], note_id)
+        highest['checklist_items'] = max([highest['checklist_items']] + [i[0] for i in payload["items"]])
+        highest['note_revisions'] = max([highest['note_revisions']] + [r[0] for r in payload["revisions"]])
+    return highest
+
+
+def rebuild(autoincrement: bool) -> None:
+    for table in TABLES:
+        with op.batch_alter_table(table, recreate='always',
+                                  table_kwargs={'sqlite_autoincrement': autoincrement}):
+            pass
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    if conn.dialect.name != 'sqlite':
+        return
+    rebuild(True)
+    # Copying the rows seeded sqlite_sequence with each table's max(id); archived ids count too
+    for table, highest in archived_max_ids(conn).items():
+        if not highest:
+            continue
+        seq = conn.execute(sa.text("SELECT seq FROM sqlite_sequence WHERE name = :name"), {"name": table}).scalar()
+        if seq is None:
+            conn.execute(sa.text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"),
+                         {"name": table, "seq": highest})
+        elif seq < highest:
+            conn.execute(sa.text("UPDATE sqlite_sequence SET seq = :seq WHERE name = :name"),
+                         {"name": table, "seq": highest})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    rebuild(False)
@@ -0,0 +1,39 @@
+"""Add index on checklist_items.note_id
+
+Revision ID: f4b1c7d9a2e3
+Revises: d8f3b6a04c12
+Create Date: 2026-10-19 16:12:48.930214
+
+Checklist items are looked up by note (per note, and for whole listing pages
+and /batch with note_id IN (...)); without this index each lookup scanned
+the table.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from partitioning import is_partitioned
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b1c7d9a2e3'
+down_revision: Union[str, Sequence[str], None] = 'd8f3b6a04c12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    # Partitioned parents cannot be indexed CONCURRENTLY; the index is built per partition
+    concurrently = conn.dialect.name == "postgresql" and not is_partitioned(conn, "checklist_items")
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_checklist_items_note_id'), 'checklist_items', ['note_id'], unique=False,
+            postgresql_concurrently=concurrently,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_checklist_items_note_id'), table_name='checklist_items')
@@ -0,0 +1,118 @@
+"""Archival of stale notes: job throughput, bytes reclaimed, rehydration latency.
+
+Seeds --children children with --notes-per-child notes (timestamps spread
+over the past year), then runs the archive job with --days. Reports the
+job's run time and the byte counts it records for /metrics/archive, hot
+table sizes before and after (PostgreSQL only), listing latency (cache
+bypassed) before and after, with include_archived, and the latency of
+GET /notes/{id} for archived notes, which rehydrates them for their owner,
+next to GET of a live note.
+
+Usage: python -m backend.benchmarks.bench_archive [--children 200] [--days 90]
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime
+
+from .common import configure_database, create_schema, git_revision, summarize, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--children", type=int, default=200)
+    parser.add_argument("--notes-per-child", type=int, default=500)
+    parser.add_argument("--items-per-note", type=int, default=2)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--rehydrations", type=int, default=500)
+    args = parser.parse_args()
+
+    configure_database()
+    create_schema()
+    from fastapi.testclient import TestClient
+    from sqlalchemy import text
+    from backend.db import SessionLocal, get_engine
+    from backend.main import app
+    from backend.model import ArchivedNote, Child, Note
+    from backend.service.archive import archive_metrics, archive_stale_notes
+    from backend.service.auth import create_access_token
+    from backend.service.notes import list_notes_by_owner
+    from .seed import Seeder
+
+    engine = get_engine()
+    seeded = Seeder(engine).run(args.children, 0, args.notes_per_child, args.items_per_note)
+    rng = random.Random(0)
+    db = SessionLocal()
+    owner_ids = [row.id for row in db.query(Child.id)]
+
+    def table_sizes():
+        if engine.dialect.name != "postgresql":
+            return None
+        with engine.connect() as conn:
+            return {
+                table: conn.execute(text("SELECT pg_total_relation_size(:t)"), {"t": table}).scalar()
+                for table in ("notes", "checklist_items", "note_revisions", "archived_notes")
+            }
+
+    def listing(include_archived=False):
+        def run():
+            list_notes_by_owner(db, rng.choice(owner_ids), limit=20, offset=0, include_archived=include_archived)
+            db.expunge_all()
+        return run
+
+    before = {"table_bytes": table_sizes(), "list_notes": summarize(timed(listing(), args.iterations))}
+    start = time.perf_counter()
+    archived = archive_stale_notes(db, days=args.days)
+    job_seconds = time.perf_counter() - start
+    metrics = archive_metrics.snapshot()
+    after = {
+        "table_bytes": table_sizes(),
+        "list_notes": summarize(timed(listing(), args.iterations)),
+        "list_notes_include_archived": summarize(timed(listing(True), args.iterations)),
+    }
+
+    client = TestClient(app)
+    # Archived notes are only rehydrated for their owner, so each GET carries the owner's token
+    archived_rows = db.query(ArchivedNote.id, ArchivedNote.owner_id).limit(args.rehydrations).all()
+    live_rows = db.query(Note.id, Note.owner_id).limit(args.iterations).all()
+    db.close()
+
+    def get_note(rows):
+        pending = iter([
+            (row.id, {"Authorization": f"Bearer {create_access_token({'user_id': row.owner_id, 'role': 'child'})}"})
+            for row in rows
+        ])
+
+        def run():
+            note_id, headers = next(pending)
+            client.get(f"/notes/{note_id}", headers=headers).raise_for_status()
+        return run
+
+    get_live = summarize(timed(get_note(live_rows), len(live_rows)))
+    get_archived = summarize(timed(get_note(archived_rows), len(archived_rows)))
+
+    print(json.dumps({
+        "git_revision": git_revision(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "seeded": seeded,
+        "archive_after_days": args.days,
+        "archive_job": {
+            "seconds": job_seconds,
+            "notes_archived": archived,
+            "notes_per_second": archived / job_seconds if job_seconds else 0.0,
+            "hot_bytes_moved": metrics["hot_bytes_moved"],
+            "archive_bytes_written": metrics["archive_bytes_written"],
+            "bytes_reclaimed": metrics["bytes_reclaimed"],
+        },
+        "before": before,
+        "after": after,
+        "get_live_note": get_live,
+        "get_archived_note": get_archived,
+        "rehydration": {k: v for k, v in archive_metrics.snapshot().items() if k.startswith("rehydration")},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
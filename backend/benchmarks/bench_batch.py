@@ -0,0 +1,105 @@
+"""Dashboard page load: separate read calls versus one POST /batch.
+
+A page load is what the frontend issues on open: the first listing page, the
+note and checklist of --open-notes notes, and the family-code lookup. Each
+variant is timed end to end and its SQL statements are counted. TestClient
+has no network, so --rtt-ms adds a simulated round-trip per HTTP call.
+
+Usage: python -m backend.benchmarks.bench_batch [--loads 200] [--rtt-ms 40]
+"""
+import argparse
+import json
+import threading
+import time
+
+from .common import configure_database, create_schema, signup_child, summarize
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=40)
+    parser.add_argument("--items-per-note", type=int, default=3)
+    parser.add_argument("--open-notes", type=int, default=5)
+    parser.add_argument("--loads", type=int, default=200)
+    parser.add_argument("--rtt-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    configure_database()
+    create_schema()
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from backend.db import get_engine
+    from backend.main import app
+    from backend.model import Child
+
+    client = TestClient(app)
+    child_id, headers = signup_child(client)
+    note_ids = []
+    for i in range(args.notes):
+        note = client.post("/notes/", headers=headers, json={
+            "title": f"Note {i}", "content": "words " * 50, "owner_id": child_id, "is_checklist": True,
+        }).json()
+        note_ids.append(note["id"])
+        for j in range(args.items_per_note):
+            client.post(f"/notes/{note['id']}/checklist/", headers=headers, json={"text": f"item {j}"})
+    from backend.db import SessionLocal
+    db = SessionLocal()
+    family_code = db.query(Child.family_code).filter(Child.id == child_id).scalar()
+    db.close()
+
+    # The app runs on TestClient's worker threads, so count in a shared cell
+    statements = {"count": 0}
+    lock = threading.Lock()
+
+    @event.listens_for(get_engine(), "before_cursor_execute")
+    def count_statement(*_):
+        with lock:
+            statements["count"] += 1
+
+    opened = note_ids[:args.open_notes]
+    page = [
+        {"path": "/notes/", "params": {"owner_id": child_id, "limit": 20, "offset": 0}},
+        *({"path": f"/notes/{note_id}"} for note_id in opened),
+        *({"path": f"/notes/{note_id}/checklist/"} for note_id in opened),
+        {"path": "/child/by-family-code", "params": {"family_code": family_code}},
+    ]
+
+    def call(method, path, **kwargs):
+        if args.rtt_ms:
+            time.sleep(args.rtt_ms / 1000)
+        response = getattr(client, method)(path, headers=headers, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def separate():
+        for sub in page:
+            call("get", sub["path"], params=sub.get("params"))
+
+    def batched():
+        body = call("post", "/batch", json={"requests": page}).json()
+        assert all(r["status"] == 200 for r in body["responses"]), body
+
+    def measure(fn):
+        # Listing pages are served from the cache after the first load, as in production
+        samples, counts = [], []
+        for _ in range(args.loads):
+            statements["count"] = 0
+            start = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - start)
+            counts.append(statements["count"])
+        return {"latency": summarize(samples), "sql_statements_per_load": sum(counts) / len(counts)}
+
+    separate()
+    batched()
+    results = {"separate": measure(separate), "batch": measure(batched)}
+    print(json.dumps({
+        "http_calls_per_load": {"separate": len(page), "batch": 1},
+        "rtt_ms": args.rtt_ms,
+        **results,
+        "speedup_p50": results["separate"]["latency"]["p50_ms"] / results["batch"]["latency"]["p50_ms"],
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
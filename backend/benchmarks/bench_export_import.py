@@ -0,0 +1,91 @@
+"""Export and import throughput for one large account.
+
+Seeds one child with --notes notes (100k by default), streams the NDJSON and
+Markdown-zip exports, then re-imports the NDJSON into a second account in
+upload-sized chunks. Peak RSS after each export is reported so constant-memory
+streaming can be checked by varying --notes (the benchmark itself keeps the
+NDJSON for the import step). TestClient buffers request bodies, so import
+memory is not meaningful here; measure it against a real server.
+
+Usage: python -m backend.benchmarks.bench_export_import [--notes 100000]
+"""
+import argparse
+import json
+import resource
+import time
+
+from .common import configure_database, create_schema, git_revision
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=100000)
+    parser.add_argument("--items-per-note", type=int, default=2)
+    parser.add_argument("--upload-chunk-bytes", type=int, default=64 * 1024)
+    args = parser.parse_args()
+
+    configure_database()
+    create_schema()
+    from fastapi.testclient import TestClient
+    from sqlalchemy import text
+    from backend.db import get_engine
+    from backend.main import app
+    from backend.service.auth import create_access_token
+    from .seed import Seeder
+
+    engine = get_engine()
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.execute(text("PRAGMA journal_mode=WAL"))
+    seeded = Seeder(engine).run(1, 0, args.notes, args.items_per_note)  # the exporting account
+    Seeder(engine).run(1, 0, 0, 0)  # an empty account to import into
+    with engine.connect() as conn:
+        source_id, target_id = [row[0] for row in conn.execute(text("SELECT id FROM children ORDER BY id"))]
+
+    def headers(child_id):
+        return {"Authorization": f"Bearer {create_access_token({'user_id': child_id, 'role': 'child'})}"}
+
+    client = TestClient(app)
+    report = {"git_revision": git_revision(), "notes": args.notes, "seeded": seeded, "export": {}}
+    ndjson = None
+    for fmt in ("ndjson", "markdown"):
+        started = time.perf_counter()
+        size = 0
+        chunks = [] if fmt == "ndjson" else None
+        with client.stream("GET", "/notes/export", params={"owner_id": source_id, "format": fmt},
+                           headers=headers(source_id)) as response:
+            response.raise_for_status()
+            for chunk in response.iter_bytes():
+                size += len(chunk)
+                if chunks is not None:
+                    chunks.append(chunk)
+        elapsed = time.perf_counter() - started
+        if chunks is not None:
+            ndjson = b"".join(chunks)
+        report["export"][fmt] = {
+            "seconds": elapsed, "bytes": size,
+            "notes_per_second": args.notes / elapsed, "mb_per_second": size / elapsed / 1e6,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+    def upload():
+        for offset in range(0, len(ndjson), args.upload_chunk_bytes):
+            yield ndjson[offset:offset + args.upload_chunk_bytes]
+
+    started = time.perf_counter()
+    response = client.post("/notes/import", content=upload(), headers=headers(target_id))
+    response.raise_for_status()
+    elapsed = time.perf_counter() - started
+    report["import"] = {
+        **response.json(), "seconds": elapsed, "bytes": len(ndjson),
+        "notes_per_second": args.notes / elapsed, "mb_per_second": len(ndjson) / elapsed / 1e6,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Idempotency-Key race checks and write-path overhead.
+
+Fires concurrent duplicates of POST /notes/ and POST /notes/{id}/checklist/
+with one key and checks that exactly one row is written and that every
+caller gets byte-identical JSON. Then times note creation with no key, with a
+fresh key per request, and replays of a used key. Exits 1 if a check fails.
+
+Usage: python -m backend.benchmarks.bench_idempotency [--requests 500] [--concurrency 16]
+"""
+import argparse
+import json
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from .common import configure_database, create_schema, signup_child, summarize, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=20, help="race rounds per route")
+    args = parser.parse_args()
+
+    configure_database()
+    create_schema()
+    from fastapi.testclient import TestClient
+    from backend.db import SessionLocal
+    from backend.idempotency import idempotency_store
+    from backend.main import app
+    from backend.model import ChecklistItem, Note
+
+    client = TestClient(app)
+    child_id, headers = signup_child(client)
+    failures = []
+
+    def count(model, **filters) -> int:
+        db = SessionLocal()
+        try:
+            return db.query(model).filter_by(**filters).count()
+        finally:
+            db.close()
+
+    def race(path: str, body: dict, model, **filters):
+        key = str(uuid.uuid4())
+        before = count(model, **filters)
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            responses = list(pool.map(
+                lambda _: client.post(path, json=body, headers={**headers, "Idempotency-Key": key}),
+                range(args.concurrency),
+            ))
+        created = count(model, **filters) - before
+        statuses = {r.status_code for r in responses}
+        bodies = {r.content for r in responses}
+        replayed = sum(r.headers.get("Idempotent-Replayed") == "true" for r in responses)
+        if created != 1 or statuses != {200} or len(bodies) != 1 or replayed != args.concurrency - 1:
+            failures.append({
+                "path": path, "rows_created": created, "statuses": sorted(statuses),
+                "distinct_bodies": len(bodies), "replayed": replayed,
+            })
+        return responses[0].json()
+
+    note_body = {"title": "Race", "content": "retry me", "owner_id": child_id}
+    note_id = None
+    for _ in range(args.rounds):
+        note_id = race("/notes/", note_body, Note, owner_id=child_id)["id"]
+    for _ in range(args.rounds):
+        race(f"/notes/{note_id}/checklist/", {"text": "tap twice", "checked": False}, ChecklistItem, note_id=note_id)
+
+    # Reusing a key for a different body is rejected, not replayed
+    key = str(uuid.uuid4())
+    client.post("/notes/", json=note_body, headers={**headers, "Idempotency-Key": key})
+    reused = client.post("/notes/", json={**note_body, "title": "Other"}, headers={**headers, "Idempotency-Key": key})
+    if reused.status_code != 422:
+        failures.append({"check": "key reused with another body", "status": reused.status_code})
+
+    # A failed request does not burn its key
+    key = str(uuid.uuid4())
+    denied = client.post("/notes/", json={**note_body, "owner_id": child_id + 1000}, headers={**headers, "Idempotency-Key": key})
+    retried = client.post("/notes/", json={**note_body, "owner_id": child_id + 1000}, headers={**headers, "Idempotency-Key": key})
+    if denied.status_code != 403 or retried.status_code != 403 or "Idempotent-Replayed" in retried.headers:
+        failures.append({"check": "failed request not stored", "statuses": [denied.status_code, retried.status_code]})
+
+    def post_note(key=None):
+        extra = {"Idempotency-Key": key} if key else {}
+        response = client.post("/notes/", json=note_body, headers={**headers, **extra})
+        response.raise_for_status()
+
+    replay_key = str(uuid.uuid4())
+    post_note(replay_key)
+    overhead = {
+        "no_key": summarize(timed(post_note, args.requests)),
+        "new_key": summarize(timed(lambda: post_note(str(uuid.uuid4())), args.requests)),
+        "replay": summarize(timed(lambda: post_note(replay_key), args.requests)),
+    }
+    overhead["added_p50_ms"] = overhead["new_key"]["p50_ms"] - overhead["no_key"]["p50_ms"]
+
+    print(json.dumps({
+        "race_rounds": args.rounds,
+        "concurrency": args.concurrency,
+        "race_failures": failures,
+        "store": idempotency_store.stats(),
+        "create_note": overhead,
+    }, indent=2))
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Cached vs. uncached latency for GET /notes/.
+
+Usage: python -m backend.benchmarks.bench_notes_cache [--notes 200] [--requests 500]
+"""
+import argparse
+import json
+
+from .common import configure_database, create_schema, signup_child, summarize, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    configure_database()
+    create_schema()
+    from fastapi.testclient import TestClient
+    from backend.main import app
+    from backend.cache import note_list_cache
+
+    client = TestClient(app)
+    child_id, headers = signup_child(client)
+    for i in range(args.notes):
+        client.post("/notes/", headers=headers, json={
+            "title": f"Note {i}", "content": "lorem ipsum " * 40, "owner_id": child_id,
+            "tags": ["bench", "cache"],
+        }).raise_for_status()
+
+    params = {"owner_id": child_id, "limit": args.limit, "offset": 0}
+
+    def list_notes():
+        client.get("/notes/", headers=headers, params=params).raise_for_status()
+
+    def list_notes_uncached():
+        # A write bumps the generation, forcing the next listing to miss
+        note_list_cache.invalidate_owner(child_id)
+        list_notes()
+
+    list_notes()
+    note_list_cache.reset_stats()
+    uncached = timed(list_notes_uncached, args.requests)
+    cached = timed(list_notes, args.requests)
+
+    print(json.dumps({
+        "uncached": summarize(uncached),
+        "cached": summarize(cached),
+        "cache": note_list_cache.stats(),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Parent feed latency for parents linked to 1, 5 and 50 children.
+
+Seeds --children children with --notes-per-child notes each, links one
+parent per fan-out to that many children, and times GET /parent/feed for the
+first page and for paging --pages deep by cursor. The feed query alone
+(service call, no HTTP) is timed at the first page and at page --pages, next
+to the global-sort query it replaces (owner_id IN (...) ORDER BY created_at
+DESC with OFFSET) at the same depths.
+
+Usage: python -m backend.benchmarks.bench_parent_feed [--fanouts 1,5,50]
+"""
+import argparse
+import json
+from datetime import datetime
+
+from .common import configure_database, create_schema, git_revision, summarize, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fanouts", default="1,5,50")
+    parser.add_argument("--children", type=int, default=50)
+    parser.add_argument("--notes-per-child", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+    fanouts = [int(f) for f in args.fanouts.split(",")]
+    if max(fanouts) > args.children:
+        raise SystemExit("--children must be at least the largest fan-out")
+
+    configure_database()
+    create_schema()
+    from fastapi.testclient import TestClient
+    from backend.db import SessionLocal, get_engine
+    from backend.main import app
+    from backend.model import Child, Note, Parent, ParentChildLink
+    from backend.service.auth import create_access_token
+    from backend.service.feed import parent_feed
+    from .seed import Seeder
+
+    engine = get_engine()
+    seeded = Seeder(engine).run(args.children, 0, args.notes_per_child, 0)
+    db = SessionLocal()
+    child_ids = [row.id for row in db.query(Child.id).order_by(Child.id)]
+    parents = {}
+    for fanout in fanouts:
+        parent = Parent(name=f"Parent of {fanout}", email=f"feed-{fanout}@example.com",
+                        hashed_password="x", child_id=child_ids[0])
+        db.add(parent)
+        db.flush()
+        db.add_all(ParentChildLink(parent_id=parent.id, child_id=cid) for cid in child_ids[:fanout])
+        parents[fanout] = parent.id
+    db.commit()
+
+    client = TestClient(app)
+    results = []
+    for fanout, parent_id in parents.items():
+        headers = {"Authorization": f"Bearer {create_access_token({'user_id': parent_id, 'role': 'parent'})}"}
+
+        def first_page():
+            client.get("/parent/feed", params={"limit": args.limit}, headers=headers).raise_for_status()
+
+        def deep_pages():
+            cursor = None
+            for _ in range(args.pages):
+                params = {"limit": args.limit, **({"cursor": cursor} if cursor else {})}
+                cursor = client.get("/parent/feed", params=params, headers=headers).json()["next_cursor"]
+                if not cursor:
+                    break
+
+        linked = child_ids[:fanout]
+
+        def global_sort(offset):
+            def run():
+                db.query(Note).filter(Note.owner_id.in_(linked)).order_by(
+                    Note.created_at.desc(), Note.id.desc(),
+                ).offset(offset).limit(args.limit).all()
+                db.expunge_all()
+            return run
+
+        def feed_query(cursor):
+            def run():
+                parent_feed(db, parent_id, limit=args.limit, cursor=cursor)
+                db.expunge_all()
+            return run
+
+        cursor = None
+        for _ in range(args.pages - 1):
+            cursor = parent_feed(db, parent_id, limit=args.limit, cursor=cursor)[1] or cursor
+
+        first_page()
+        results.append({
+            "linked_children": fanout,
+            "feed_first_page": summarize(timed(first_page, args.iterations)),
+            f"feed_{args.pages}_pages": summarize(timed(deep_pages, max(1, args.iterations // 10))),
+            "feed_query_first_page": summarize(timed(feed_query(None), args.iterations)),
+            f"feed_query_page_{args.pages}": summarize(timed(feed_query(cursor), args.iterations)),
+            "global_sort_first_page": summarize(timed(global_sort(0), args.iterations)),
+            f"global_sort_page_{args.pages}": summarize(
+                timed(global_sort(args.limit * (args.pages - 1)), args.iterations)
+            ),
+        })
+    db.close()
+
+    print(json.dumps({
+        "git_revision": git_revision(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "seeded": seeded,
+        "limit": args.limit,
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
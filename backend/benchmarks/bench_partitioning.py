@@ -0,0 +1,132 @@
+"""Index size, VACUUM time and listing latency before and after hash partitioning.
+
+PostgreSQL only. Seeds (unless --skip-seed) then measures the plain tables,
+converts them with backend.partitioning, and measures again. The default size
+is 50M checklist items (1M children x 25 notes x 2 items); pass smaller
+numbers for a quick run.
+
+Usage:
+    BENCH_DATABASE_URL=postgresql://localhost/notenest_bench \\
+        python -m backend.benchmarks.bench_partitioning --partitions 16
+"""
+import argparse
+import json
+import os
+import random
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+
+from .common import configure_database, git_revision, summarize, timed
+from .seed import Seeder
+
+TABLES = ("notes", "checklist_items")
+
+
+def table_sizes(conn, table: str) -> dict:
+    """Bytes across the table and, when partitioned, all of its partitions"""
+    relations = [table] + [row[0] for row in conn.execute(text(
+        "SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = to_regclass(:t)"
+    ), {"t": table})]
+    sizes = {"heap_bytes": 0, "index_bytes": 0, "total_bytes": 0}
+    for relation in relations:
+        row = conn.execute(text(
+            "SELECT pg_relation_size(to_regclass(:r)), pg_indexes_size(to_regclass(:r)), "
+            "pg_total_relation_size(to_regclass(:r))"
+        ), {"r": relation}).one()
+        sizes["heap_bytes"] += row[0]
+        sizes["index_bytes"] += row[1]
+        sizes["total_bytes"] += row[2]
+    sizes["largest_index_bytes"] = conn.execute(text(
+        "SELECT COALESCE(max(pg_relation_size(indexrelid)), 0) FROM pg_index "
+        "WHERE indrelid = ANY(CAST(:relations AS regclass[]))"
+    ), {"relations": "{" + ",".join(relations) + "}"}).scalar()
+    return sizes
+
+
+def measure(engine, owner_ids, lookups: int, rng: random.Random) -> dict:
+    from backend.model import ChecklistItem, Note
+    from sqlalchemy.orm import Session
+
+    result = {}
+    with engine.connect() as conn:
+        for table in TABLES:
+            started = time.perf_counter()
+            conn.execute(text(f"VACUUM (ANALYZE) {table}"))
+            result[table] = {**table_sizes(conn, table), "vacuum_seconds": time.perf_counter() - started}
+
+    def list_page():
+        # What GET /notes/ does: one page for an owner, then that page's checklist items
+        owner_id = rng.choice(owner_ids)
+        notes = (
+            db.query(Note).filter(Note.owner_id == owner_id)
+            .order_by(Note.created_at.desc()).limit(20).all()
+        )
+        if notes:
+            db.query(ChecklistItem).filter(
+                ChecklistItem.owner_id == owner_id,
+                ChecklistItem.note_id.in_([n.id for n in notes]),
+            ).all()
+        db.expunge_all()
+
+    with Session(engine) as db:
+        timed(list_page, min(lookups, 50))  # warm the cache
+        result["listing"] = summarize(timed(list_page, lookups))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure notes storage with and without hash partitioning")
+    parser.add_argument("--database-url", default=None, help="defaults to BENCH_DATABASE_URL")
+    parser.add_argument("--partitions", type=int, default=16)
+    parser.add_argument("--children", type=int, default=1000000)
+    parser.add_argument("--notes-per-child", type=int, default=25)
+    parser.add_argument("--items-per-note", type=int, default=2)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--skip-seed", action="store_true", help="reuse rows already in the database")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["BENCH_DATABASE_URL"] = args.database_url
+    url = configure_database(fresh=False)
+    engine = create_engine(url)
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("bench_partitioning needs PostgreSQL; set BENCH_DATABASE_URL or --database-url")
+    autocommit = engine.execution_options(isolation_level="AUTOCOMMIT")
+
+    from backend.partitioning import drop_old, is_partitioned, rebuild
+
+    seeded = None
+    if not args.skip_seed:
+        seeded = Seeder(engine, seed=args.seed).run(args.children, 1, args.notes_per_child, args.items_per_note)
+    with engine.connect() as conn:
+        if is_partitioned(conn):
+            raise SystemExit("notes is already partitioned; run backend.partitioning --unpartition first")
+        owner_ids = [row[0] for row in conn.execute(text("SELECT DISTINCT owner_id FROM notes LIMIT 10000"))]
+
+    rng = random.Random(args.seed)
+    before = measure(autocommit, owner_ids, args.lookups, rng)
+
+    started = time.perf_counter()
+    with autocommit.connect() as conn:
+        rebuild(conn, args.partitions)
+        drop_old(conn)
+    conversion_seconds = time.perf_counter() - started
+
+    after = measure(autocommit, owner_ids, args.lookups, rng)
+    print(json.dumps({
+        "git_revision": git_revision(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "database": engine.url.render_as_string(hide_password=True),
+        "seeded": seeded,
+        "partitions": args.partitions,
+        "conversion_seconds": conversion_seconds,
+        "plain": before,
+        "partitioned": after,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Storage growth and reconstruction latency for note revision history.
+
+Simulates autosave on one note (small appends and in-place edits), then
+compares stored bytes against keeping a full copy per edit and times
+rebuilding random revisions.
+
+Usage: python -m backend.benchmarks.bench_revisions [--edits 1000]
+"""
+import argparse
+import json
+import random
+
+from .common import configure_database, create_schema, summarize, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--edits", type=int, default=1000)
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    configure_database()
+    create_schema()
+    from backend.db import SessionLocal
+    from backend.model import Child, NoteRevision
+    from backend.service.notes import create_note, update_note
+    from backend.service.revisions import get_revision, SNAPSHOT_INTERVAL
+
+    db = SessionLocal()
+    child = Child(name="Bench Child", email="revisions@example.com", hashed_password="x", family_code="BENCH1")
+    db.add(child)
+    db.commit()
+
+    lines = [f"Line {i}: the quick brown fox jumps over the lazy dog.\n" for i in range(50)]
+    note = create_note(db, title="Diary", content="".join(lines), owner_id=child.id)
+    full_copy_bytes = len(note.content.encode("utf-8"))
+    for edit in range(args.edits):
+        if rng.random() < 0.5:
+            lines.append(f"Autosave {edit}: more words typed.\n")
+        else:
+            lines[rng.randrange(len(lines))] = f"Edited at {edit}: a changed sentence.\n"
+        update_note(db, note.id, {"content": "".join(lines)})
+        full_copy_bytes += len("".join(lines).encode("utf-8"))
+
+    revisions = db.query(NoteRevision).filter(NoteRevision.note_id == note.id).all()
+    stored_bytes = sum(len(r.data) for r in revisions)
+    latest = max(r.rev for r in revisions)
+    samples = timed(lambda: get_revision(db, note.id, rng.randint(1, latest)), args.lookups)
+    db.close()
+
+    print(json.dumps({
+        "edits": args.edits,
+        "revisions": len(revisions),
+        "snapshot_interval": SNAPSHOT_INTERVAL,
+        "stored_bytes": stored_bytes,
+        "full_copy_bytes": full_copy_bytes,
+        "ratio": stored_bytes / full_copy_bytes,
+        "reconstruction": summarize(samples),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
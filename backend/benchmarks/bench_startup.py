@@ -0,0 +1,67 @@
+"""Worker cold-start time: import the app, build it and run lifespan startup.
+
+Each sample is a fresh interpreter, as on an autoscaled worker. The database
+URL points at a path that cannot be opened, so any connection attempt during
+startup would fail the run. Exits non-zero when the median exceeds the budget.
+
+Usage: python -m backend.benchmarks.bench_startup [--runs 10] [--budget-ms 1000]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from .common import summarize
+
+UNREACHABLE_DATABASE_URL = "sqlite:////nonexistent/notenest/startup.db"
+STARTUP_BUDGET_MS = 1000.0  # median; also enforced by backend/tests/test_startup.py
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STARTUP_SCRIPT = """
+import asyncio, json, time
+start = time.perf_counter()
+from backend.main import create_app
+app = create_app()
+imported = time.perf_counter()
+
+async def startup():
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+    return ready
+
+ready = asyncio.run(startup())
+print(json.dumps({"import_s": imported - start, "startup_s": ready - start}))
+"""
+
+
+def measure_once(database_url: str) -> dict:
+    env = dict(os.environ, DATABASE_URL=database_url)
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT], env=env, cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    parser.add_argument("--database-url", default=UNREACHABLE_DATABASE_URL)
+    args = parser.parse_args()
+
+    samples = [measure_once(args.database_url) for _ in range(args.runs)]
+    startup = summarize([s["startup_s"] for s in samples])
+    report = {
+        "import": summarize([s["import_s"] for s in samples]),
+        "startup": startup,
+        "budget_ms": args.budget_ms,
+        "within_budget": startup["p50_ms"] <= args.budget_ms,
+    }
+    print(json.dumps(report, indent=2))
+    if not report["within_budget"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Shared helpers for the in-process benchmarks.
+
+Benchmarks drive the FastAPI app through ``fastapi.testclient.TestClient``,
+which needs ``httpx`` installed alongside the normal requirements. Run them
+from the repository root, e.g. ``python -m backend.benchmarks.bench_notes_cache``.
+"""
+import os
+import secrets
+import statistics
+import subprocess
+import time
+from typing import Callable, Dict, List, Tuple
+
+DEFAULT_BENCH_DATABASE_URL = "sqlite:///./notenest_bench.db"
+
+
+def configure_database(url: str = DEFAULT_BENCH_DATABASE_URL, fresh: bool = True) -> str:
+    """Point the app at a benchmark database. Call before importing backend.main.
+
+    BENCH_DATABASE_URL overrides `url`. With fresh=True the default SQLite file
+    is recreated; seeded databases should pass fresh=False.
+    """
+    if fresh and not os.getenv("BENCH_DATABASE_URL") and url == DEFAULT_BENCH_DATABASE_URL:
+        path = url[len("sqlite:///"):]
+        if os.path.exists(path):
+            os.remove(path)
+    url = os.getenv("BENCH_DATABASE_URL", url)
+    os.environ["DATABASE_URL"] = url
+    return url
+
+
+def create_schema() -> None:
+    """Create tables directly on a throwaway benchmark database (deployments use Alembic)"""
+    from backend.db import get_engine
+    from backend.model import Base
+
+    Base.metadata.create_all(bind=get_engine())
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds"""
+    return {
+        "count": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1000 if samples else 0.0,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+    }
+
+
+def timed(fn: Callable[[], object], iterations: int) -> List[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def signup_child(client) -> Tuple[int, Dict[str, str]]:
+    """Create a child account and return (child_id, auth headers)"""
+    email = f"bench-{secrets.token_hex(6)}@example.com"
+    response = client.post("/signup", json={
+        "name": "Bench Child", "email": email, "password": "bench-password", "role": "child",
+    })
+    response.raise_for_status()
+    body = response.json()
+    return body["user"]["id"], {"Authorization": f"Bearer {body['access_token']}"}
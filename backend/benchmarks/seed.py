@@ -0,0 +1,225 @@
+"""Bulk synthetic data generator for benchmarks.
+
+Writes children, parents, notes and checklist items with precomputed ids, so
+rows reference each other without a round-trip per insert. PostgreSQL is
+loaded with COPY; other databases use executemany in large batches. Every
+seeded account shares the password ``SEED_PASSWORD`` (hashed once).
+
+Usage:
+    python -m backend.benchmarks.seed --database-url sqlite:///./notenest_bench.db \\
+        --children 10000 --notes-per-child 50 --items-per-note 3
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import string
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List
+
+from sqlalchemy import create_engine, func, select, text
+
+from .common import configure_database
+
+SEED_PASSWORD = "bench-password"
+FAMILY_CODE_ALPHABET = string.ascii_uppercase + string.digits
+WORDS = (
+    "homework science math reading drawing music soccer dinosaurs planets ocean "
+    "robots garden recipe story poem chores birthday holiday friends library"
+).split()
+
+
+def child_email(child_id: int) -> str:
+    return f"seed-child-{child_id}@example.com"
+
+
+def parent_email(parent_id: int) -> str:
+    return f"seed-parent-{parent_id}@example.com"
+
+
+def family_code(child_id: int) -> str:
+    """Unique 6-character code derived from the id (36^6 codes)"""
+    code = []
+    for _ in range(6):
+        child_id, digit = divmod(child_id, len(FAMILY_CODE_ALPHABET))
+        code.append(FAMILY_CODE_ALPHABET[digit])
+    return "".join(reversed(code))
+
+
+def _batched(rows: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Seeder:
+    def __init__(self, engine, batch_size: int = 20000, seed: int = 0):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.use_copy = engine.dialect.name == "postgresql"
+
+    def _next_id(self, table) -> int:
+        with self.engine.connect() as conn:
+            return (conn.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+    def _load(self, table, rows: Iterable[Dict]) -> int:
+        count = 0
+        for batch in _batched(rows, self.batch_size):
+            if self.use_copy:
+                self._copy(table, batch)
+            else:
+                with self.engine.begin() as conn:
+                    conn.execute(table.insert(), batch)
+            count += len(batch)
+        if self.use_copy and count and "id" in table.c:
+            with self.engine.begin() as conn:
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), (SELECT max(id) FROM {table.name}))"
+                ))
+        return count
+
+    def _copy(self, table, batch: List[Dict]) -> None:
+        columns = list(batch[0].keys())
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in batch:
+            writer.writerow(["\\N" if row[c] is None else row[c] for c in columns])
+        buffer.seek(0)
+        raw = self.engine.raw_connection()
+        try:
+            with raw.cursor() as cursor:
+                cursor.copy_expert(
+                    f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                    buffer,
+                )
+            raw.commit()
+        finally:
+            raw.close()
+
+    def _timestamp(self, now: datetime) -> datetime:
+        return now - timedelta(seconds=self.rng.randint(0, 365 * 24 * 3600))
+
+    def run(self, children: int, parents_per_child: int, notes_per_child: int, items_per_note: int) -> Dict:
+        from backend.model import Base, Child, Parent, ParentChildLink, Note, ChecklistItem
+        from backend.service.auth import get_password_hash
+
+        Base.metadata.create_all(bind=self.engine)
+        hashed = get_password_hash(SEED_PASSWORD)
+        now = datetime.utcnow()
+        rng = self.rng
+        child_table = Child.__table__
+        parent_table = Parent.__table__
+        link_table = ParentChildLink.__table__
+        note_table = Note.__table__
+        item_table = ChecklistItem.__table__
+
+        first_child = self._next_id(child_table)
+        first_parent = self._next_id(parent_table)
+        first_note = self._next_id(note_table)
+        first_item = self._next_id(item_table)
+        child_ids = range(first_child, first_child + children)
+
+        def child_rows():
+            for cid in child_ids:
+                yield {
+                    "id": cid, "name": f"Child {cid}", "email": child_email(cid),
+                    "hashed_password": hashed, "family_code": family_code(cid),
+                    "refresh_token": None, "created_at": now,
+                }
+
+        def parent_rows():
+            pid = first_parent
+            for cid in child_ids:
+                for _ in range(parents_per_child):
+                    yield {
+                        "id": pid, "name": f"Parent {pid}", "email": parent_email(pid),
+                        "hashed_password": hashed, "child_id": cid,
+                        "refresh_token": None, "created_at": now,
+                    }
+                    pid += 1
+
+        def link_rows():
+            pid = first_parent
+            for cid in child_ids:
+                for _ in range(parents_per_child):
+                    yield {"parent_id": pid, "child_id": cid, "created_at": now}
+                    pid += 1
+
+        def note_rows():
+            nid = first_note
+            for cid in child_ids:
+                for _ in range(notes_per_child):
+                    created = self._timestamp(now)
+                    words = rng.choices(WORDS, k=rng.randint(20, 200))
+                    yield {
+                        "id": nid, "title": " ".join(rng.choices(WORDS, k=3)).title(),
+                        "content": " ".join(words), "owner_id": cid,
+                        "folder": rng.choice((None, "school", "home", "ideas")),
+                        "tags": ",".join(rng.sample(WORDS, k=2)),
+                        "is_checklist": items_per_note > 0, "created_at": created, "updated_at": created,
+                    }
+                    nid += 1
+
+        def item_rows():
+            iid = first_item
+            for nid in range(first_note, first_note + children * notes_per_child):
+                owner_id = first_child + (nid - first_note) // notes_per_child
+                for _ in range(items_per_note):
+                    yield {
+                        "id": iid, "note_id": nid, "owner_id": owner_id, "text": " ".join(rng.choices(WORDS, k=4)),
+                        "checked": rng.random() < 0.3,
+                    }
+                    iid += 1
+
+        started = time.perf_counter()
+        counts = {
+            "children": self._load(child_table, child_rows()),
+            "parents": self._load(parent_table, parent_rows()),
+            "parent_child_links": self._load(link_table, link_rows()),
+            "notes": self._load(note_table, note_rows()),
+            "checklist_items": self._load(item_table, item_rows()),
+        }
+        elapsed = time.perf_counter() - started
+        return {
+            **counts,
+            "seconds": elapsed,
+            "rows_per_second": sum(counts.values()) / elapsed if elapsed else 0.0,
+            "method": "copy" if self.use_copy else "executemany",
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a database with synthetic NoteNest data")
+    parser.add_argument("--database-url", default=None, help="defaults to BENCH_DATABASE_URL or a local SQLite file")
+    parser.add_argument("--children", type=int, default=1000)
+    parser.add_argument("--parents-per-child", type=int, default=1)
+    parser.add_argument("--notes-per-child", type=int, default=20)
+    parser.add_argument("--items-per-note", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["BENCH_DATABASE_URL"] = args.database_url
+    url = configure_database(fresh=False)
+    engine = create_engine(url)
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.execute(text("PRAGMA journal_mode=WAL"))
+    result = Seeder(engine, batch_size=args.batch_size, seed=args.seed).run(
+        args.children, args.parents_per_child, args.notes_per_child, args.items_per_note,
+    )
+    print(json.dumps({"database": engine.url.render_as_string(hide_password=True), **result}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Scripted workload mixes run in-process against the FastAPI app.
+
+Seed first (``python -m backend.benchmarks.seed``), then e.g.:
+
+    python -m backend.benchmarks.workloads --workload mixed --requests 5000 \\
+        --concurrency 8 --output results/mixed.json
+
+Results carry the git revision, so runs from two commits can be diffed.
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from .common import configure_database, git_revision, summarize
+from .seed import SEED_PASSWORD, child_email, parent_email
+
+
+class WorkloadContext:
+    """Seeded ids to draw requests from, plus tokens minted without bcrypt"""
+
+    def __init__(self, sample_children: int, seed: int):
+        from backend.db import SessionLocal, get_engine
+        from backend.model import Child, Parent, Note, ChecklistItem
+        from backend.service.auth import create_access_token
+
+        get_engine()
+        db = SessionLocal()
+        try:
+            child_ids = [row.id for row in db.query(Child.id).order_by(Child.id).limit(sample_children)]
+            if not child_ids:
+                raise SystemExit("No seeded children found; run backend.benchmarks.seed first")
+            parents = db.query(Parent.id, Parent.child_id).filter(Parent.child_id.in_(child_ids)).all()
+            notes = db.query(Note.id, Note.owner_id, Note.updated_at).filter(Note.owner_id.in_(child_ids)).all()
+            items = (
+                db.query(ChecklistItem.id, ChecklistItem.text, ChecklistItem.note_id)
+                .join(Note, Note.id == ChecklistItem.note_id)
+                .filter(Note.owner_id.in_(child_ids))
+                .all()
+            )
+        finally:
+            db.close()
+
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.child_ids = child_ids
+        self.parent_ids = [p.id for p in parents]
+        self.notes_by_owner: Dict[int, List[int]] = defaultdict(list)
+        self.note_versions: Dict[int, str] = {}
+        for note in notes:
+            self.notes_by_owner[note.owner_id].append(note.id)
+            self.note_versions[note.id] = note.updated_at.isoformat()
+        self.note_owner = {note.id: note.owner_id for note in notes}
+        self.owners_with_notes = list(self.notes_by_owner)
+        self.items = [(item.id, item.text, self.note_owner[item.note_id]) for item in items]
+        self.child_headers = {
+            cid: {"Authorization": f"Bearer {create_access_token({'user_id': cid, 'role': 'child'})}"}
+            for cid in child_ids
+        }
+
+    def choice(self, seq):
+        with self.lock:
+            return self.rng.choice(seq)
+
+    def random(self) -> float:
+        with self.lock:
+            return self.rng.random()
+
+
+# Operations: each issues one request and returns (operation name, status code)
+
+def op_login(client, ctx: WorkloadContext):
+    if ctx.parent_ids and ctx.random() < 0.3:
+        email = parent_email(ctx.choice(ctx.parent_ids))
+    else:
+        email = child_email(ctx.choice(ctx.child_ids))
+    response = client.post("/login", json={"email": email, "password": SEED_PASSWORD})
+    return "login", response.status_code
+
+
+def op_list_page(client, ctx: WorkloadContext):
+    owner_id = ctx.choice(ctx.child_ids)
+    page_count = max(1, len(ctx.notes_by_owner[owner_id]) // 20)
+    offset = 20 * int(ctx.random() * page_count)
+    response = client.get(
+        "/notes/", headers=ctx.child_headers[owner_id],
+        params={"owner_id": owner_id, "limit": 20, "offset": offset},
+    )
+    return "list_notes", response.status_code
+
+
+def op_autosave(client, ctx: WorkloadContext):
+    if not ctx.note_owner:
+        return "autosave", 0
+    owner_id = ctx.choice(ctx.owners_with_notes)
+    note_id = ctx.choice(ctx.notes_by_owner[owner_id])
+    headers = ctx.child_headers[owner_id]
+    response = client.patch(f"/notes/{note_id}", headers=headers, json={
+        "base_updated_at": ctx.note_versions[note_id],
+        "splices": [{"offset": 0, "delete_count": 0, "insert": "typed "}],
+    })
+    if response.status_code == 200:
+        ctx.note_versions[note_id] = response.json()["updated_at"]
+    elif response.status_code == 409:
+        current = client.get(f"/notes/{note_id}", headers=headers)
+        if current.status_code == 200:
+            ctx.note_versions[note_id] = current.json()["updated_at"]
+    return "autosave", response.status_code
+
+
+def op_checklist_toggle(client, ctx: WorkloadContext):
+    if not ctx.items:
+        return "checklist_toggle", 0
+    item_id, text, owner_id = ctx.choice(ctx.items)
+    response = client.put(
+        f"/checklist/{item_id}", headers=ctx.child_headers[owner_id],
+        json={"text": text, "checked": ctx.random() < 0.5},
+    )
+    return "checklist_toggle", response.status_code
+
+
+WORKLOADS: Dict[str, Dict[Callable, float]] = {
+    "login_storm": {op_login: 1.0},
+    "list_paging": {op_list_page: 1.0},
+    "autosave": {op_autosave: 1.0},
+    "checklist_toggles": {op_checklist_toggle: 1.0},
+    "mixed": {op_list_page: 0.6, op_autosave: 0.2, op_checklist_toggle: 0.15, op_login: 0.05},
+}
+
+
+def run_workload(name: str, requests: int, concurrency: int, ctx: WorkloadContext) -> Dict:
+    from fastapi.testclient import TestClient
+    from backend.main import app
+
+    ops = list(WORKLOADS[name].items())
+    weights = [weight for _, weight in ops]
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    results_lock = threading.Lock()
+    local = threading.local()
+
+    def one_request(_):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = TestClient(app)
+        with ctx.lock:
+            op = ctx.rng.choices(ops, weights=weights)[0][0]
+        start = time.perf_counter()
+        op_name, status = op(client, ctx)
+        elapsed = time.perf_counter() - start
+        with results_lock:
+            latencies[op_name].append(elapsed)
+            statuses[op_name][status] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one_request, range(requests)))
+    wall = time.perf_counter() - started
+
+    all_samples = [sample for samples in latencies.values() for sample in samples]
+    return {
+        "workload": name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "wall_seconds": wall,
+        "throughput_rps": requests / wall if wall else 0.0,
+        "latency": summarize(all_samples),
+        "operations": {
+            op_name: {"latency": summarize(samples), "status_codes": dict(statuses[op_name])}
+            for op_name, samples in latencies.items()
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a workload mix against a seeded database")
+    parser.add_argument("--workload", choices=sorted(WORKLOADS) + ["all"], default="mixed")
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--sample-children", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="write JSON results here as well as stdout")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["BENCH_DATABASE_URL"] = args.database_url
+    url = configure_database(fresh=False)
+    ctx = WorkloadContext(args.sample_children, args.seed)
+    names = sorted(WORKLOADS) if args.workload == "all" else [args.workload]
+
+    report = {
+        "git_revision": git_revision(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "database": url.split("@")[-1],
+        "results": [run_workload(name, args.requests, args.concurrency, ctx) for name in names],
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+try:
+    import redis
+except ImportError:  # redis is only needed for the shared backend
+    redis = None
+
+load_dotenv()
+
+# Cache Configuration
+NOTES_CACHE_BACKEND = os.getenv("NOTES_CACHE_BACKEND", "memory")  # "memory" or "redis"
+NOTES_CACHE_TTL_SECONDS = int(os.getenv("NOTES_CACHE_TTL_SECONDS", "60"))
+NOTES_CACHE_MAX_BYTES = int(os.getenv("NOTES_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+class CacheBackend:
+    """Storage interface for the response cache.
+
+    Values are opaque bytes. Counters live alongside values but must never be
+    evicted, since losing one would make stale generations readable again.
+    """
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        raise NotImplementedError
+
+    def get_counter(self, key: str) -> int:
+        raise NotImplementedError
+
+    def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Per-process LRU cache with TTL expiry, bounded by the total size of keys and values.
+
+    A count bound would not do: page size is up to the client (`limit`), so a
+    few thousand large pages could exhaust the worker's memory.
+    """
+
+    def __init__(self, max_bytes: int = NOTES_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _pop(self, key: str) -> None:
+        value, _ = self._entries.pop(key)
+        self.used_bytes -= len(key) + len(value)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._pop(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        size = len(key) + len(value)
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            if size > self.max_bytes:
+                return  # would evict everything else and still not fit
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self.used_bytes += size
+            while self.used_bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def get_counter(self, key: str) -> int:
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value = self._counters.get(key, 0) + 1
+            self._counters[key] = value
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+            self.used_bytes = 0
+
+
+class RedisCacheBackend(CacheBackend):
+    """Shared cache for multi-worker deployments (Redis evicts by TTL/maxmemory)"""
+
+    def __init__(self, url: str = REDIS_URL):
+        if redis is None:
+            raise RuntimeError("redis package is required for NOTES_CACHE_BACKEND=redis")
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        self.client.set(key, value, ex=ttl)
+
+    def get_counter(self, key: str) -> int:
+        value = self.client.get(key)
+        return int(value) if value is not None else 0
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(key))
+
+    def clear(self) -> None:
+        # Only this cache's keys: idempotency records may share the database (REDIS_URL)
+        keys = list(self.client.scan_iter(match="notes:*", count=1000))
+        for start in range(0, len(keys), 1000):
+            self.client.delete(*keys[start:start + 1000])
+
+
+class NoteListCache:
+    """Caches serialized note listings, invalidated by a per-owner generation.
+
+    Every write to an owner's notes bumps their generation, so all cached
+    pages for that owner become unreachable at once and age out of the backend.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: int = NOTES_CACHE_TTL_SECONDS):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def _generation_key(self, owner_id: int) -> str:
+        return f"notes:gen:{owner_id}"
+
+    def key(self, owner_id: int, *shape) -> str:
+        """Build the cache key for one query shape at the owner's current generation.
+
+        Resolve the key before querying the database and reuse it for set(), so a
+        write that lands mid-request files the result under the old generation.
+        """
+        generation = self.backend.get_counter(self._generation_key(owner_id))
+        return f"notes:list:{owner_id}:{generation}:" + ":".join(str(part) for part in shape)
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self.backend.get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        self.backend.set(key, value, self.ttl)
+
+    def invalidate_owner(self, owner_id: int) -> None:
+        self.backend.incr(self._generation_key(owner_id))
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            total = self.hits + self.misses
+            return {
+                "backend": type(self.backend).__name__,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self.hits = 0
+            self.misses = 0
+
+
+def create_cache_backend(name: str = NOTES_CACHE_BACKEND) -> CacheBackend:
+    if name == "memory":
+        return InMemoryCacheBackend()
+    if name == "redis":
+        return RedisCacheBackend()
+    raise ValueError(f"Unknown cache backend: {name}")
+
+
+note_list_cache = NoteListCache(create_cache_backend())
@@ -1,22 +1,230 @@
+import itertools
+import logging
+import math
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import create_engine, event, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql import Select
 from dotenv import load_dotenv
 
+from .cache import CacheBackend, note_list_cache
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 # DATABASE_URL = os.getenv("DEV_DATABASE_URL")
 
-try:
-    engine = create_engine(
-        DATABASE_URL,
-        pool_pre_ping=True,
-    )
-    # Try connecting to the database to verify connection
-    with engine.connect() as connection:
-        print("Database connection successful!")
-except Exception as e:
-    print(f"Database connection failed: {e}")
-
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
+# Read replicas (comma-separated URLs); empty means everything uses the primary
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+# After a user writes, their reads stay on the primary this long to hide replica lag
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+REPLICA_HEALTH_INTERVAL_SECONDS = float(os.getenv("REPLICA_HEALTH_INTERVAL_SECONDS", "10"))
+
+# Created lazily so importing this module never touches the database.
+# Schema changes are managed by Alembic (see backend/alembic), not at startup.
+engine: Optional[Engine] = None
+replica_pool: Optional["ReplicaPool"] = None
+
+
+class ReplicaPool:
+    """Round-robin over replica engines, skipping ones that failed their last health check"""
+
+    def __init__(self, urls: List[str]):
+        self.engines = [create_engine(url, pool_pre_ping=True) for url in urls]
+        self._healthy = {id(e): True for e in self.engines}
+        self._cycle = itertools.cycle(self.engines)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        for replica in self.engines:
+            event.listen(replica, "handle_error", self._disconnect_listener(replica))
+
+    def _disconnect_listener(self, replica: Engine):
+        def on_error(context):
+            # Stop routing to a replica that dropped its connection until it passes a check
+            if context.is_disconnect:
+                self.mark_down(replica)
+        return on_error
+
+    def choose(self) -> Optional[Engine]:
+        with self._lock:
+            for _ in range(len(self.engines)):
+                candidate = next(self._cycle)
+                if self._healthy[id(candidate)]:
+                    return candidate
+        return None
+
+    def mark_down(self, replica: Engine) -> None:
+        with self._lock:
+            self._healthy[id(replica)] = False
+
+    def check(self) -> Dict[str, bool]:
+        results = {}
+        for replica in self.engines:
+            try:
+                with replica.connect() as connection:
+                    connection.execute(text("SELECT 1"))
+                healthy = True
+            except Exception as e:
+                logger.warning("Replica health check failed for %s: %s", replica.url.render_as_string(), e)
+                healthy = False
+            with self._lock:
+                self._healthy[id(replica)] = healthy
+            results[replica.url.render_as_string()] = healthy
+        return results
+
+    def start_health_checks(self, interval: float = REPLICA_HEALTH_INTERVAL_SECONDS) -> None:
+        if self._thread:
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(interval):
+                self.check()
+
+        self._thread = threading.Thread(target=loop, name="replica-health", daemon=True)
+        self._thread.start()
+
+    def stop_health_checks(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+        self._thread = None
+
+    def dispose(self) -> None:
+        self.stop_health_checks()
+        for replica in self.engines:
+            replica.dispose()
+
+
+class ReadYourWrites:
+    """Remembers which principals wrote recently, so their reads stay on the primary.
+
+    The window lives in the cache backend, so with NOTES_CACHE_BACKEND=redis a
+    write pins the principal's reads in every worker, not just the one that
+    handled it. Deadlines are wall-clock for the same reason.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None, window: float = READ_YOUR_WRITES_SECONDS):
+        self.backend = backend or note_list_cache.backend
+        self.window = window
+
+    def _key(self, principal: Tuple[str, int]) -> str:
+        role, user_id = principal
+        return f"ryw:{role}:{user_id}"
+
+    def record_write(self, principal: Tuple[str, int]) -> None:
+        until = time.time() + self.window
+        self.backend.set(self._key(principal), repr(until).encode(), max(1, math.ceil(self.window)))
+
+    def pinned(self, principal: Optional[Tuple[str, int]]) -> bool:
+        if principal is None:
+            return False
+        until = self.backend.get(self._key(principal))
+        return until is not None and float(until) > time.time()
+
+
+read_your_writes = ReadYourWrites()
+
+
+class RoutingSession(Session):
+    """Sends read-only sessions to a replica and everything else to the primary.
+
+    A session is read-only only when a caller opts in with
+    ``session.info["read_only"] = True``; writes, flushes and principals inside
+    their read-your-writes window always use the primary. The replica is
+    chosen once per session so a request reads from one consistent snapshot.
+    ``session.info["principal"]`` is the (role, user_id) the request acts as.
+    """
+
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        if (
+            replica_pool is None
+            or not self.info.get("read_only")
+            or self._flushing
+            or (clause is not None and not isinstance(clause, Select))
+            or read_your_writes.pinned(self.info.get("principal"))
+        ):
+            return super().get_bind(mapper, clause=clause, **kw)
+        replica = self.info.get("replica")
+        if replica is None:
+            replica = self.info["replica"] = replica_pool.choose()
+        if replica is None:  # no healthy replica
+            return super().get_bind(mapper, clause=clause, **kw)
+        return replica
+
+    def reads_from_replica(self) -> bool:
+        """Whether a SELECT issued now would be served by a replica (and so may lag the primary)"""
+        return self.get_bind(clause=select(1)) is not super().get_bind()
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_wrote(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _mark_bulk_write(orm_execute_state):
+    # query().update()/delete() bypass the flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _record_write(session):
+    if session.info.pop("wrote", False) and session.info.get("principal"):
+        read_your_writes.record_write(session.info["principal"])
+
+
+class _LazySessionmaker(sessionmaker):
+    """Binds to the engine on first call, so scripts and jobs that skip the app lifespan still get one"""
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None and "bind" not in local_kw:
+            get_engine()
+        return super().__call__(**local_kw)
+
+
+SessionLocal = _LazySessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
+
+def get_engine(url: Optional[str] = None) -> Engine:
+    """Return the process-wide engine, creating it on first use (no connection is opened)"""
+    global engine, replica_pool
+    if engine is None:
+        engine = create_engine(
+            url or os.getenv("DATABASE_URL", DATABASE_URL),
+            pool_pre_ping=True,
+        )
+        SessionLocal.configure(bind=engine)
+        if DATABASE_REPLICA_URLS and replica_pool is None:
+            replica_pool = ReplicaPool(DATABASE_REPLICA_URLS)
+    return engine
+
+def dispose_engine() -> None:
+    global engine, replica_pool
+    if engine is not None:
+        engine.dispose()
+        engine = None
+    if replica_pool is not None:
+        replica_pool.dispose()
+        replica_pool = None
+
+def start_replica_health_checks() -> None:
+    if replica_pool is not None:
+        replica_pool.start_health_checks()
+
+def check_database() -> bool:
+    """Readiness probe: can we run a trivial query?"""
+    try:
+        with get_engine().connect() as connection:
+            connection.execute(text("SELECT 1"))
+        return True
+    except Exception as e:
+        logger.warning("Database readiness check failed: %s", e)
+        return False
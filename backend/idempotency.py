@@ -0,0 +1,237 @@
+import hashlib
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, NamedTuple, Optional
+
+from dotenv import load_dotenv
+
+from .cache import NOTES_CACHE_BACKEND, REDIS_URL, redis
+
+load_dotenv()
+
+# Idempotency Configuration
+IDEMPOTENCY_BACKEND = os.getenv("IDEMPOTENCY_BACKEND", NOTES_CACHE_BACKEND)  # "memory" or "redis"
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_MAX_BYTES = int(os.getenv("IDEMPOTENCY_MAX_BYTES", str(64 * 1024 * 1024)))
+# How long a retry waits for the first request with its key to finish
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
+# A crashed holder's lock (redis only) expires after this
+IDEMPOTENCY_LOCK_TTL_SECONDS = 30
+
+
+class IdempotencyInProgress(ValueError):
+    """Another request with the same key is still running"""
+
+
+class IdempotencyKeyReused(ValueError):
+    """The key was already used for a request with a different body"""
+
+
+class StoredResponse(NamedTuple):
+    fingerprint: str
+    status_code: int
+    media_type: str
+    body: bytes
+
+    def encode(self) -> bytes:
+        header = json.dumps([self.fingerprint, self.status_code, self.media_type], separators=(",", ":"))
+        return header.encode("utf-8") + b"\n" + self.body
+
+    @classmethod
+    def decode(cls, data: bytes) -> "StoredResponse":
+        header, body = data.split(b"\n", 1)
+        fingerprint, status_code, media_type = json.loads(header)
+        return cls(fingerprint, status_code, media_type, body)
+
+
+class IdempotencyBackend:
+    """Keyed store of first responses plus a per-key lock"""
+
+    def get(self, key: str) -> Optional[StoredResponse]:
+        raise NotImplementedError
+
+    def set(self, key: str, response: StoredResponse, ttl: int) -> None:
+        raise NotImplementedError
+
+    def acquire(self, key: str, timeout: float) -> Optional[str]:
+        """Lock `key`; returns a token for release(), or None on timeout"""
+        raise NotImplementedError
+
+    def release(self, key: str, token: str) -> None:
+        raise NotImplementedError
+
+
+class InMemoryIdempotencyBackend(IdempotencyBackend):
+    """Per-process LRU store with TTL expiry, bounded by the total size of keys and stored responses.
+
+    Locks are held only while in use. A response larger than the whole
+    budget is not stored, so a retry of that request runs it again.
+    """
+
+    def __init__(self, max_bytes: int = IDEMPOTENCY_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._locks: Dict[str, list] = {}  # key -> [lock, number of requests using it]
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[StoredResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            data, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._pop(key)
+                return None
+        return StoredResponse.decode(data)
+
+    def _pop(self, key: str) -> None:
+        data, _ = self._entries.pop(key)
+        self.used_bytes -= len(key) + len(data)
+
+    def set(self, key: str, response: StoredResponse, ttl: int) -> None:
+        data = response.encode()
+        size = len(key) + len(data)
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (data, time.monotonic() + ttl)
+            self.used_bytes += size
+            while self.used_bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def acquire(self, key: str, timeout: float) -> Optional[str]:
+        with self._lock:
+            holder = self._locks.setdefault(key, [threading.Lock(), 0])
+            holder[1] += 1
+        if holder[0].acquire(timeout=timeout):
+            return key
+        self._forget(key, holder)
+        return None
+
+    def release(self, key: str, token: str) -> None:
+        with self._lock:
+            holder = self._locks[key]
+        holder[0].release()
+        self._forget(key, holder)
+
+    def _forget(self, key: str, holder: list) -> None:
+        with self._lock:
+            holder[1] -= 1
+            if holder[1] == 0:
+                del self._locks[key]
+
+
+class RedisIdempotencyBackend(IdempotencyBackend):
+    """Shared store for multi-worker deployments; locks are SET NX keys with an expiry"""
+
+    RELEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+    def __init__(self, url: str = REDIS_URL):
+        if redis is None:
+            raise RuntimeError("redis package is required for IDEMPOTENCY_BACKEND=redis")
+        self.client = redis.Redis.from_url(url)
+        self._release = self.client.register_script(self.RELEASE_SCRIPT)
+
+    def get(self, key: str) -> Optional[StoredResponse]:
+        data = self.client.get(key)
+        return StoredResponse.decode(data) if data is not None else None
+
+    def set(self, key: str, response: StoredResponse, ttl: int) -> None:
+        self.client.set(key, response.encode(), ex=ttl)
+
+    def acquire(self, key: str, timeout: float) -> Optional[str]:
+        token = secrets.token_hex(8)
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.client.set(f"{key}:lock", token, nx=True, ex=IDEMPOTENCY_LOCK_TTL_SECONDS):
+                return token
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.05)
+
+    def release(self, key: str, token: str) -> None:
+        self._release(keys=[f"{key}:lock"], args=[token])
+
+
+class IdempotencyClaim:
+    """The caller's hold on a key: either a response to replay, or the right to produce one"""
+
+    def __init__(self, store: "IdempotencyStore", key: str, fingerprint: str, stored: Optional[StoredResponse]):
+        self._store = store
+        self._key = key
+        self.fingerprint = fingerprint
+        self.stored = stored
+
+    def save(self, status_code: int, media_type: str, body: bytes) -> None:
+        self._store.backend.set(
+            self._key, StoredResponse(self.fingerprint, status_code, media_type, body), self._store.ttl,
+        )
+
+
+class IdempotencyStore:
+    """Records the first successful response per Idempotency-Key and replays it.
+
+    Requests with the same key are serialized on a per-key lock, so a retry
+    that arrives while the original is still running waits for it and then
+    replays its response instead of repeating the write. Only responses that
+    are saved are replayed; a request that fails leaves the key free to retry.
+    """
+
+    def __init__(self, backend: IdempotencyBackend, ttl: int = IDEMPOTENCY_TTL_SECONDS,
+                 wait_seconds: float = IDEMPOTENCY_WAIT_SECONDS):
+        self.backend = backend
+        self.ttl = ttl
+        self.wait_seconds = wait_seconds
+        self._stats_lock = threading.Lock()
+        self._counts = {"executed": 0, "replayed": 0, "in_progress": 0, "key_reused": 0}
+
+    @staticmethod
+    def fingerprint(payload: bytes) -> str:
+        return hashlib.sha256(payload).hexdigest()[:32]
+
+    @contextmanager
+    def claim(self, scope: str, idempotency_key: str, payload: bytes) -> Iterator[IdempotencyClaim]:
+        """Hold the key for `scope` (principal, method and path) while the body runs"""
+        key = f"idem:{scope}:{idempotency_key}"
+        fingerprint = self.fingerprint(payload)
+        token = self.backend.acquire(key, self.wait_seconds)
+        if token is None:
+            self._count("in_progress")
+            raise IdempotencyInProgress("A request with this Idempotency-Key is still in progress")
+        try:
+            stored = self.backend.get(key)
+            if stored is not None and stored.fingerprint != fingerprint:
+                self._count("key_reused")
+                raise IdempotencyKeyReused("Idempotency-Key was already used with a different request body")
+            self._count("replayed" if stored is not None else "executed")
+            yield IdempotencyClaim(self, key, fingerprint, stored)
+        finally:
+            self.backend.release(key, token)
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self._counts[key] += 1
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {"backend": type(self.backend).__name__, **self._counts}
+
+
+def create_idempotency_backend(name: str = IDEMPOTENCY_BACKEND) -> IdempotencyBackend:
+    if name == "memory":
+        return InMemoryIdempotencyBackend()
+    if name == "redis":
+        return RedisIdempotencyBackend()
+    raise ValueError(f"Unknown idempotency backend: {name}")
+
+
+idempotency_store = IdempotencyStore(create_idempotency_backend())
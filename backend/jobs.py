@@ -0,0 +1,388 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+
+from .db import SessionLocal, get_engine
+from .metrics import LATENCY_SAMPLES, percentile_ms
+from .model import Job
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Job Queue Configuration
+JOB_QUEUE_MODE = os.getenv("JOB_QUEUE_MODE", "memory")  # "memory" or "durable" (jobs table)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_MAXSIZE = int(os.getenv("JOB_QUEUE_MAXSIZE", "1000"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_ENQUEUE_TIMEOUT_SECONDS = float(os.getenv("JOB_ENQUEUE_TIMEOUT_SECONDS", "0.5"))
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1.0"))
+# A claimed durable job is held this long; its worker renews the lease every third of it while running
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+JOB_RETRY_BACKOFF_SECONDS = 2.0
+# Whether this process schedules the periodic jobs. Durable mode queues each run once however many
+# processes do; in memory mode every scheduling process runs them, so enable it in only one
+JOB_SCHEDULER = os.getenv("JOB_SCHEDULER", "true").lower() in ("1", "true", "yes")
+
+# Handlers take a DB session plus the job's keyword arguments and commit their own work
+_handlers: Dict[str, Callable] = {}
+
+
+def job(name: str):
+    """Register a function as the handler for jobs called `name`"""
+    def decorator(fn: Callable) -> Callable:
+        _handlers[name] = fn
+        return fn
+    return decorator
+
+
+class _PendingJob:
+    __slots__ = ("name", "payload", "attempts", "enqueued_at")
+
+    def __init__(self, name: str, payload: dict, attempts: int = 0, enqueued_at: Optional[float] = None):
+        self.name = name
+        self.payload = payload
+        self.attempts = attempts
+        self.enqueued_at = enqueued_at if enqueued_at is not None else time.monotonic()
+
+
+class JobQueue:
+    """Runs side effects on worker threads, off the request path.
+
+    In "memory" mode jobs live in a bounded queue; when it is full, enqueue()
+    waits briefly and then runs the job inline, so producers slow down instead
+    of dropping work. Until start() is called (scripts, tests) memory jobs run
+    inline. In "durable" mode jobs are rows in the jobs table and survive
+    restarts; workers claim them with a conditional UPDATE and hold a lease
+    that a crashed process stops renewing.
+    """
+
+    def __init__(
+        self,
+        mode: str = JOB_QUEUE_MODE,
+        workers: int = JOB_WORKERS,
+        maxsize: int = JOB_QUEUE_MAXSIZE,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+    ):
+        if mode not in ("memory", "durable"):
+            raise ValueError(f"Unknown job queue mode: {mode}")
+        self.mode = mode
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self._queue: "queue.Queue[_PendingJob]" = queue.Queue(maxsize=maxsize)
+        self._threads: List[threading.Thread] = []
+        self._timers: List[threading.Timer] = []
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._latencies: deque = deque(maxlen=LATENCY_SAMPLES)
+        self._counts = {"enqueued": 0, "completed": 0, "retried": 0, "failed": 0, "ran_inline": 0}
+
+    # Lifecycle
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        get_engine()
+        target = self._durable_worker if self.mode == "durable" else self._memory_worker
+        for i in range(self.workers):
+            thread = threading.Thread(target=target, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            self._stop.set()
+            timers, self._timers = self._timers, []
+        for timer in timers:
+            timer.cancel()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def schedule(self, name: str, interval_seconds: float, **payload) -> None:
+        """Enqueue `name` every interval_seconds until stop().
+
+        In durable mode a tick is keyed by its interval-long wall-clock window,
+        so when several processes schedule the same job one run per window is queued.
+        """
+        def tick():
+            if self._stop.is_set():
+                return
+            if self.mode == "durable":
+                self._enqueue_once(name, f"{name}:{int(time.time() // interval_seconds)}", payload)
+            else:
+                self.enqueue(name, **payload)
+            self._start_timer(interval_seconds, tick)
+
+        self._start_timer(interval_seconds, tick)
+
+    def _start_timer(self, interval_seconds: float, fn: Callable, *args) -> None:
+        """Run fn after a delay unless stop() comes first (schedule ticks and retries)"""
+        timer = threading.Timer(interval_seconds, fn, args=args)
+        timer.daemon = True
+        with self._lock:
+            if self._stop.is_set():
+                return
+            # Drop timers that already fired, so a long-lived schedule does not grow the list
+            self._timers = [t for t in self._timers if t.is_alive()]
+            self._timers.append(timer)
+        timer.start()
+
+    # Producers
+
+    def enqueue(self, name: str, **payload) -> None:
+        if name not in _handlers:
+            raise ValueError(f"No handler registered for job: {name}")
+        self._count("enqueued")
+        if self.mode == "durable":
+            db = SessionLocal()
+            try:
+                db.add(Job(name=name, payload=json.dumps(payload)))
+                db.commit()
+            finally:
+                db.close()
+            return
+
+        pending = _PendingJob(name, payload)
+        if not self._threads:
+            # No workers in this process would ever drain the queue
+            self._count("ran_inline")
+            self._run(pending)
+            return
+        try:
+            self._queue.put(pending, timeout=JOB_ENQUEUE_TIMEOUT_SECONDS)
+        except queue.Full:
+            # Backpressure: the caller pays for the job rather than losing it
+            self._count("ran_inline")
+            self._run(pending)
+
+    def _enqueue_once(self, name: str, schedule_key: str, payload: dict) -> bool:
+        """Durable enqueue unless a job with schedule_key already exists; returns whether it was queued"""
+        db = SessionLocal()
+        try:
+            # Finished runs of earlier windows have nothing left to block
+            db.query(Job).filter(
+                Job.name == name, Job.status == "done", Job.schedule_key != schedule_key,
+            ).delete(synchronize_session=False)
+            db.add(Job(name=name, payload=json.dumps(payload), schedule_key=schedule_key))
+            db.commit()
+        except IntegrityError:
+            db.rollback()  # another process queued this window's run
+            return False
+        finally:
+            db.close()
+        self._count("enqueued")
+        return True
+
+    # Workers
+
+    def _memory_worker(self) -> None:
+        while not self._stop.is_set():
+            try:
+                pending = self._queue.get(timeout=JOB_POLL_INTERVAL_SECONDS)
+            except queue.Empty:
+                continue
+            try:
+                self._run(pending)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, pending: _PendingJob) -> None:
+        pending.attempts += 1
+        error = self._execute(pending.name, pending.payload)
+        if error is None:
+            self._record_success(pending.enqueued_at)
+        elif pending.attempts < self.max_attempts:
+            self._count("retried")
+            self._start_timer(JOB_RETRY_BACKOFF_SECONDS * pending.attempts, self._requeue, pending)
+        else:
+            self._count("failed")
+            logger.error("Job %s failed after %d attempts: %s", pending.name, pending.attempts, error)
+
+    def _requeue(self, pending: _PendingJob) -> None:
+        if not self._threads:
+            self._run(pending)
+            return
+        try:
+            self._queue.put_nowait(pending)
+        except queue.Full:
+            self._count("ran_inline")
+            self._run(pending)
+
+    def _durable_worker(self) -> None:
+        # Recovery runs on the worker, not in start(), so startup never waits on the DB
+        recovers = threading.current_thread().name == "job-worker-0"
+        next_recovery = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                if recovers and time.monotonic() >= next_recovery:
+                    self._recover_expired_jobs()
+                    next_recovery = time.monotonic() + JOB_LEASE_SECONDS / 2
+                if not self._claim_and_run():
+                    self._stop.wait(JOB_POLL_INTERVAL_SECONDS)
+            except Exception as e:
+                # Database unavailable; keep the worker alive and poll again later
+                logger.warning("Job worker poll failed: %s", e)
+                self._stop.wait(JOB_POLL_INTERVAL_SECONDS)
+
+    def _claim_and_run(self) -> bool:
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            row = (
+                db.query(Job)
+                .filter(Job.status == "pending", Job.run_after <= now)
+                .order_by(Job.run_after)
+                .first()
+            )
+            if not row:
+                return False
+            claimed = (
+                db.query(Job)
+                .filter(Job.id == row.id, Job.status == "pending")
+                .update({
+                    "status": "running", "attempts": Job.attempts + 1,
+                    "lease_expires_at": now + timedelta(seconds=JOB_LEASE_SECONDS),
+                }, synchronize_session=False)
+            )
+            db.commit()
+            if not claimed:
+                return True  # another worker won the row; poll again immediately
+            db.refresh(row)
+
+            renewing = self._renew_lease(row.id)
+            try:
+                error = self._execute(row.name, json.loads(row.payload or "{}"))
+            finally:
+                renewing.set()
+            row.lease_expires_at = None
+            if error is None:
+                if row.schedule_key:
+                    row.status = "done"
+                else:
+                    db.delete(row)
+                db.commit()
+                self._record_success(None, created_at=row.created_at)
+            elif row.attempts < self.max_attempts:
+                row.status = "pending"
+                row.last_error = error
+                row.run_after = datetime.utcnow() + timedelta(seconds=JOB_RETRY_BACKOFF_SECONDS * row.attempts)
+                db.commit()
+                self._count("retried")
+            else:
+                row.status = "failed"
+                row.last_error = error
+                db.commit()
+                self._count("failed")
+                logger.error("Job %s (%d) failed after %d attempts: %s", row.name, row.id, row.attempts, error)
+            return True
+        finally:
+            db.close()
+
+    def _renew_lease(self, job_id: int) -> threading.Event:
+        """Extend a running job's lease until the returned event is set"""
+        done = threading.Event()
+
+        def renew():
+            while not done.wait(JOB_LEASE_SECONDS / 3):
+                db = SessionLocal()
+                try:
+                    db.query(Job).filter(Job.id == job_id, Job.status == "running").update(
+                        {"lease_expires_at": datetime.utcnow() + timedelta(seconds=JOB_LEASE_SECONDS)},
+                        synchronize_session=False,
+                    )
+                    db.commit()
+                except Exception as e:
+                    logger.warning("Renewing the lease of job %d failed: %s", job_id, e)
+                finally:
+                    db.close()
+
+        threading.Thread(target=renew, name=f"job-lease-{job_id}", daemon=True).start()
+        return done
+
+    def _recover_expired_jobs(self) -> int:
+        """Put back jobs whose worker stopped renewing the lease (a crashed or killed process).
+
+        Jobs other live processes are running keep their lease and are left
+        alone. Rows claimed before leases existed have none and count as expired.
+        """
+        db = SessionLocal()
+        try:
+            recovered = (
+                db.query(Job)
+                .filter(
+                    Job.status == "running",
+                    or_(Job.lease_expires_at.is_(None), Job.lease_expires_at < datetime.utcnow()),
+                )
+                .update({"status": "pending", "lease_expires_at": None}, synchronize_session=False)
+            )
+            db.commit()
+            return recovered
+        finally:
+            db.close()
+
+    def _execute(self, name: str, payload: dict) -> Optional[str]:
+        """Run a handler in its own session; return an error message on failure"""
+        db = SessionLocal()
+        try:
+            _handlers[name](db, **payload)
+            return None
+        except Exception as e:
+            db.rollback()
+            logger.warning("Job %s raised: %s", name, e)
+            return f"{type(e).__name__}: {e}"
+        finally:
+            db.close()
+
+    # Instrumentation
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._counts[key] += 1
+
+    def _record_success(self, enqueued_at: Optional[float], created_at: Optional[datetime] = None) -> None:
+        if enqueued_at is not None:
+            latency = time.monotonic() - enqueued_at
+        else:
+            latency = (datetime.utcnow() - created_at).total_seconds()
+        with self._lock:
+            self._counts["completed"] += 1
+            self._latencies.append(latency)
+
+    def depth(self) -> int:
+        if self.mode == "durable":
+            db = SessionLocal()
+            try:
+                return db.query(Job).filter(Job.status.in_(("pending", "running"))).count()
+            finally:
+                db.close()
+        return self._queue.qsize()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            counts = dict(self._counts)
+
+        return {
+            "mode": self.mode,
+            "workers": len(self._threads),
+            "depth": self.depth(),
+            **counts,
+            "latency_p50_ms": percentile_ms(latencies, 50),
+            "latency_p95_ms": percentile_ms(latencies, 95),
+            "latency_p99_ms": percentile_ms(latencies, 99),
+        }
+
+
+job_queue = JobQueue()
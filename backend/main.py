@@ -1,29 +1,74 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, APIRouter, Depends, Header, HTTPException, Query, Request, status, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from pydantic import BaseModel, TypeAdapter
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Callable, List, Optional, Tuple
+from contextlib import asynccontextmanager
+import json
+import os
+import re
+import secrets
 
-from .db import SessionLocal, engine
-from .model import Base, Note,Child,Parent
+from .db import SessionLocal, get_engine, dispose_engine, check_database, start_replica_health_checks
+from .model import Note,Child,Parent
 from .service.notes import (
-    create_note, get_note, list_notes_by_owner, update_note, delete_note,
-    add_checklist_item, list_checklist_items, update_checklist_item, delete_checklist_item,
+    create_note, get_note, get_notes_by_ids, list_notes_by_owner, update_note, patch_note, delete_note,
+    NoteVersionConflict, add_checklist_item, list_checklist_items, list_checklist_items_for_notes,
+    update_checklist_item, delete_checklist_item,
+)
+from .service.revisions import list_revisions, get_revision
+from .service.portability import export_ndjson, export_markdown_zip, NoteImporter
+from .sceheme import (
+    NoteSchema, ChecklistItemSchema, UserSignupSchema, UserLoginSchema, RefreshTokenSchema,
+    NoteRevisionSchema, NoteRevisionContentSchema, NotePatchSchema, BatchRequestSchema,
+    NoteFeedSchema, LinkChildSchema,
 )
-from .sceheme import NoteSchema, ChecklistItemSchema, UserSignupSchema, UserLoginSchema, RefreshTokenSchema
 from .service.auth import (
     signup_child, signup_parent, authenticate_user, verify_token,
-    refresh_access_token, logout_user , get_child_by_family_code
+    refresh_access_token, logout_user , get_child_by_family_code, get_children_by_family_codes,
+    parent_has_child, link_child_to_parent,
 )
+from .service.feed import parent_feed
+from .service.archive import archive_metrics, ARCHIVE_AFTER_DAYS, ARCHIVE_INTERVAL_SECONDS
 from .middleware import add_cors  # Remove add_jwt_middleware import
+from .cache import note_list_cache
+from .jobs import JOB_SCHEDULER, job_queue
+from .idempotency import idempotency_store, IdempotencyInProgress, IdempotencyKeyReused
 
-# Create tables if they don't exist
-Base.metadata.create_all(bind=engine)
+REFRESH_TOKEN_CLEANUP_INTERVAL_SECONDS = 3600
+# /metrics/* are disabled unless this is set, and then require it as a bearer token
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
 
-app = FastAPI(title="NoteNest API")
-add_cors(app)  # Only add CORS middleware
-# Remove this line: add_jwt_middleware(app)  # Remove global JWT middleware
+# Schema is managed by Alembic (`alembic upgrade head`); startup never touches the DB
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    get_engine()
+    start_replica_health_checks()
+    job_queue.start()
+    if JOB_SCHEDULER:
+        job_queue.schedule("auth.cleanup_refresh_tokens", REFRESH_TOKEN_CLEANUP_INTERVAL_SECONDS)
+        if ARCHIVE_AFTER_DAYS > 0:
+            job_queue.schedule("notes.archive_stale", ARCHIVE_INTERVAL_SECONDS)
+    yield
+    job_queue.stop()
+    dispose_engine()
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+def require_metrics_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)):
+    """Gate for operational metrics, which expose deployment internals"""
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not credentials or not secrets.compare_digest(credentials.credentials, METRICS_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+
+router = APIRouter()
+metrics_router = APIRouter(prefix="/metrics", dependencies=[Depends(require_metrics_token)])
+note_list_adapter = TypeAdapter(List[NoteSchema])
+checklist_list_adapter = TypeAdapter(List[ChecklistItemSchema])
 
 # Dependency to get DB session
 def get_db():
@@ -33,6 +78,36 @@ def get_db():
     finally:
         db.close()
 
+def get_optional_principal(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+) -> Optional[Tuple[str, int]]:
+    """(role, user_id) from a valid bearer token, or None; never rejects the request"""
+    if not credentials:
+        return None
+    try:
+        payload = verify_token(credentials.credentials, "access")
+    except HTTPException:
+        return None
+    if payload.get("user_id") and payload.get("role"):
+        return (payload["role"], payload["user_id"])
+    return None
+
+def get_read_db(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: Session = Depends(get_db),
+):
+    """Same request session, marked read-only so it may be served by a replica.
+
+    The caller's token (optional here) identifies them for read-your-writes even
+    on routes that do not require authentication.
+    """
+    db.info["read_only"] = True
+    if "principal" not in db.info:
+        principal = get_optional_principal(credentials)
+        if principal:
+            db.info["principal"] = principal
+    return db
+
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
     """Get current user from JWT token"""
     token = credentials.credentials
@@ -44,7 +119,8 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     if not user_id or not role:
         raise HTTPException(status_code=401, detail="Invalid token payload")
     
-    
+    # Lets the session keep this user's reads on the primary right after they write
+    db.info["principal"] = (role, user_id)
     if role == "child":
         user = db.query(Child).filter(Child.id == user_id).first()
     elif role == "parent":
@@ -75,12 +151,44 @@ def require_child_or_parent(current_user = Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="Child or parent access required")
     return current_user
 
-@app.get("/")
+def idempotent_json(idempotency_key: Optional[str], scope: str, payload: BaseModel,
+                    produce: Callable[[], BaseModel]) -> Response:
+    """Run `produce` once per Idempotency-Key and replay its exact JSON bytes on retries"""
+    if not idempotency_key:
+        return Response(content=produce().model_dump_json(), media_type="application/json")
+    try:
+        with idempotency_store.claim(scope, idempotency_key, payload.model_dump_json().encode("utf-8")) as claim:
+            if claim.stored:
+                return Response(
+                    content=claim.stored.body, status_code=claim.stored.status_code,
+                    media_type=claim.stored.media_type, headers={"Idempotent-Replayed": "true"},
+                )
+            body = produce().model_dump_json().encode("utf-8")
+            claim.save(status.HTTP_200_OK, "application/json", body)
+            return Response(content=body, media_type="application/json")
+    except IdempotencyInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except IdempotencyKeyReused as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@router.get("/")
 def read_root():
     return {"message": "Welcome to NoteNest"}
 
+# Liveness: the process is up. Readiness: it can also reach the database.
+@router.get("/healthz")
+def healthz():
+    return {"status": "ok"}
+
+@router.get("/readyz")
+def readyz(response: Response):
+    if not check_database():
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "unavailable"}
+    return {"status": "ready"}
+
 # Authentication endpoints (these remain unprotected)
-@app.post("/signup")
+@router.post("/signup")
 def api_signup(payload: UserSignupSchema, db: Session = Depends(get_db)):
     try:
         if payload.role == "child":
@@ -95,18 +203,18 @@ def api_signup(payload: UserSignupSchema, db: Session = Depends(get_db)):
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@app.post("/login")
+@router.post("/login")
 def api_login(payload: UserLoginSchema, db: Session = Depends(get_db)):
     result = authenticate_user(db, payload.email, payload.password)
     if not result:
         raise HTTPException(status_code=401, detail="Incorrect email or password")
     return result
 
-@app.post("/refresh")
+@router.post("/refresh")
 def api_refresh_token(payload: RefreshTokenSchema, db: Session = Depends(get_db)):
     return refresh_access_token(db, payload.refresh_token)
 
-@app.post("/logout")
+@router.post("/logout")
 def api_logout(current_user = Depends(get_current_user), db: Session = Depends(get_db)):
     success = logout_user(db, current_user["user"].id, current_user["role"])
     if success:
@@ -115,47 +223,73 @@ def api_logout(current_user = Depends(get_current_user), db: Session = Depends(g
         raise HTTPException(status_code=400, detail="Logout failed")
 
 # Protected Note endpoints (JWT protection via dependencies)
-@app.post("/notes/", response_model=NoteSchema)
-def api_create_note(note: NoteSchema, db: Session = Depends(get_db), current_user = Depends(require_child)):
+@router.post("/notes/", response_model=NoteSchema)
+def api_create_note(note: NoteSchema, db: Session = Depends(get_db), current_user = Depends(require_child),
+                    idempotency_key: Optional[str] = Header(None, max_length=255)):
     if note.owner_id != current_user["user"].id:
         raise HTTPException(status_code=403, detail="Can only create notes for yourself")
-    
-    db_note = create_note(
-        db=db, title=note.title, content=note.content, owner_id=current_user["user"].id,
-        folder=note.folder, tags=note.tags, is_checklist=note.is_checklist,
-    )
-    return NoteSchema(
-        id=db_note.id, title=db_note.title, content=db_note.content, owner_id=db_note.owner_id,
-        folder=db_note.folder, tags=db_note.tags.split(",") if db_note.tags else [],
-        is_checklist=db_note.is_checklist,
-        checklist_items=[ChecklistItemSchema.model_validate(item) for item in db_note.checklist_items],
-    )
 
-@app.get("/notes/", response_model=List[NoteSchema])
-def api_list_notes(owner_id: int,
-                   limit: int = 20,
-                   offset: int = 0, 
-                   db: Session = Depends(get_db), 
-                   current_user = Depends(require_child_or_parent)):
+    def create() -> NoteSchema:
+        db_note = create_note(
+            db=db, title=note.title, content=note.content, owner_id=current_user["user"].id,
+            folder=note.folder, tags=note.tags, is_checklist=note.is_checklist,
+        )
+        return NoteSchema(
+            id=db_note.id, title=db_note.title, content=db_note.content, owner_id=db_note.owner_id,
+            folder=db_note.folder, tags=db_note.tags.split(",") if db_note.tags else [],
+            is_checklist=db_note.is_checklist, updated_at=db_note.updated_at,
+            checklist_items=[ChecklistItemSchema.model_validate(item) for item in db_note.checklist_items],
+        )
+
+    # Retries with the same Idempotency-Key get the first response instead of a duplicate note
+    return idempotent_json(idempotency_key, f"child:{current_user['user'].id}:POST:/notes/", note, create)
+
+def require_owner_access(db: Session, owner_id: int, current_user) -> None:
+    """Children read their own notes, parents those of any linked child"""
     if current_user["role"] == "child":
         if owner_id != current_user["user"].id:
             raise HTTPException(status_code=403, detail="Can only view your own notes")
     elif current_user["role"] == "parent":
-        if owner_id != current_user["user"].child_id:
-            raise HTTPException(status_code=403, detail="Can only view your child's notes")
-    
-    notes = list_notes_by_owner(db, owner_id, limit=limit, offset=offset)
-    return [
-        NoteSchema(
-            id=n.id, title=n.title, content=n.content, owner_id=n.owner_id,
-            folder=n.folder, tags=n.tags.split(",") if n.tags else [],
-            is_checklist=n.is_checklist,
-            checklist_items=[ChecklistItemSchema.model_validate(item) for item in n.checklist_items],
-        )
-        for n in notes
-    ]
+        if not parent_has_child(db, current_user["user"].id, owner_id):
+            raise HTTPException(status_code=403, detail="Can only view your children's notes")
+
+@router.get("/notes/", response_model=List[NoteSchema])
+def api_list_notes(owner_id: int,
+                   limit: int = 20,
+                   offset: int = 0, 
+                   include_archived: bool = False,
+                   db: Session = Depends(get_read_db), 
+                   current_user = Depends(require_child_or_parent)):
+    require_owner_access(db, owner_id, current_user)
+    return Response(
+        content=render_note_page(db, owner_id, limit, offset, include_archived), media_type="application/json",
+    )
+
+def render_note_page(db: Session, owner_id: int, limit: int, offset: int, include_archived: bool = False) -> bytes:
+    """Pre-serialized JSON for one listing page; any write to this owner's notes invalidates it.
+
+    Only pages read from the primary are cached: a replica page can predate a
+    write that already bumped the owner's generation, and the shared cache
+    would then serve it to the writer too.
+    """
+    cache_key = note_list_cache.key(owner_id, limit, offset, int(include_archived))
+    body = note_list_cache.get(cache_key)
+    if body is None:
+        notes = list_notes_by_owner(db, owner_id, limit=limit, offset=offset, include_archived=include_archived)
+        body = note_list_adapter.dump_json([
+            NoteSchema(
+                id=n.id, title=n.title, content=n.content, owner_id=n.owner_id,
+                folder=n.folder, tags=n.tags.split(",") if n.tags else [],
+                is_checklist=n.is_checklist, updated_at=n.updated_at,
+                checklist_items=[ChecklistItemSchema.model_validate(item) for item in n.checklist_items],
+            )
+            for n in notes
+        ])
+        if not db.reads_from_replica():
+            note_list_cache.set(cache_key, body)
+    return body
 
-@app.get("/notes/all", response_model=List[NoteSchema])
+@router.get("/notes/all", response_model=List[NoteSchema])
 def api_get_all_notes(db: Session = Depends(get_db)):
     notes = db.query(Note).order_by(Note.created_at.desc()).all()
     return [
@@ -167,6 +301,7 @@ def api_get_all_notes(db: Session = Depends(get_db)):
             folder=n.folder,
             tags=n.tags.split(",") if n.tags else [],
             is_checklist=n.is_checklist,
+            updated_at=n.updated_at,
             checklist_items=[
                 ChecklistItemSchema.model_validate(item) for item in n.checklist_items
             ],
@@ -174,9 +309,67 @@ def api_get_all_notes(db: Session = Depends(get_db)):
         for n in notes
     ]
 
-@app.get("/notes/{note_id}", response_model=NoteSchema)
-def api_get_note(note_id: int, db: Session = Depends(get_db)):
-    n = get_note(db, note_id)
+EXPORT_FORMATS = {
+    "ndjson": (export_ndjson, "application/x-ndjson", "ndjson"),
+    "markdown": (export_markdown_zip, "application/zip", "zip"),
+}
+
+# Backup/migration: every note of an owner, streamed straight from a DB cursor
+@router.get("/notes/export")
+def api_export_notes(owner_id: int,
+                     format: str = Query("ndjson", pattern="^(ndjson|markdown)$"),
+                     db: Session = Depends(get_read_db),
+                     current_user = Depends(require_child_or_parent)):
+    require_owner_access(db, owner_id, current_user)
+    exporter, media_type, extension = EXPORT_FORMATS[format]
+    principal = db.info.get("principal")
+
+    def stream():
+        # The request session may be closed before streaming ends, so use our own
+        export_db = SessionLocal()
+        export_db.info.update(read_only=True, principal=principal)
+        try:
+            yield from exporter(export_db, owner_id)
+        finally:
+            export_db.close()
+
+    return StreamingResponse(stream(), media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="notes-{owner_id}.{extension}"',
+    })
+
+# Accepts the NDJSON export format; notes are added to the caller's account
+@router.post("/notes/import")
+async def api_import_notes(request: Request, db: Session = Depends(get_db), current_user = Depends(require_child)):
+    importer = NoteImporter(db, owner_id=current_user["user"].id)
+    try:
+        async for chunk in request.stream():
+            if importer.feed(chunk):
+                await run_in_threadpool(importer.flush)
+        importer.finish()
+        await run_in_threadpool(importer.flush)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{e} ({importer.notes} notes imported before the error)")
+    return {"notes": importer.notes, "checklist_items": importer.checklist_items}
+
+def owner_visible_to(db: Session, principal: Optional[Tuple[str, int]]) -> Callable[[int], bool]:
+    """Whether `principal` may see an owner's notes, which gates rehydrating archived ones"""
+    def visible(owner_id: int) -> bool:
+        if principal is None:
+            return False
+        role, user_id = principal
+        if role == "child":
+            return owner_id == user_id
+        return role == "parent" and parent_has_child(db, user_id, owner_id)
+    return visible
+
+def principal_of(current_user) -> Tuple[str, int]:
+    return current_user["role"], current_user["user"].id
+
+@router.get("/notes/{note_id}", response_model=NoteSchema)
+def api_get_note(note_id: int, db: Session = Depends(get_read_db),
+                 principal: Optional[Tuple[str, int]] = Depends(get_optional_principal)):
+    # Live notes stay readable by id; an archived one is restored only for its owner or a linked parent
+    n = get_note(db, note_id, owner_visible_to(db, principal))
     if not n:
         raise HTTPException(status_code=404, detail="Note not found")
     return NoteSchema(
@@ -187,17 +380,46 @@ def api_get_note(note_id: int, db: Session = Depends(get_db)):
         folder=n.folder,
         tags=n.tags.split(",") if n.tags else [],
         is_checklist=n.is_checklist,
+        updated_at=n.updated_at,
         checklist_items=[
             ChecklistItemSchema.model_validate(item) for item in n.checklist_items
         ],
     )
 
+def require_note_access(db: Session, note: Optional[Note], current_user) -> Note:
+    """Children see their own notes, parents those of their linked children"""
+    if not note:
+        raise HTTPException(status_code=404, detail="Note not found")
+    if current_user["role"] == "child" and note.owner_id != current_user["user"].id:
+        raise HTTPException(status_code=404, detail="Note not found")
+    if current_user["role"] == "parent" and not parent_has_child(db, current_user["user"].id, note.owner_id):
+        raise HTTPException(status_code=404, detail="Note not found")
+    return note
+
+@router.get("/notes/{note_id}/revisions", response_model=List[NoteRevisionSchema])
+def api_list_note_revisions(note_id: int, db: Session = Depends(get_read_db), current_user = Depends(require_child_or_parent)):
+    require_note_access(db, get_note(db, note_id, owner_visible_to(db, principal_of(current_user))), current_user)
+    return [
+        NoteRevisionSchema(rev=r.rev, is_snapshot=r.is_snapshot, created_at=r.created_at, size=len(r.data))
+        for r in list_revisions(db, note_id)
+    ]
+
+@router.get("/notes/{note_id}/revisions/{rev}", response_model=NoteRevisionContentSchema)
+def api_get_note_revision(note_id: int, rev: int, db: Session = Depends(get_read_db), current_user = Depends(require_child_or_parent)):
+    require_note_access(db, get_note(db, note_id, owner_visible_to(db, principal_of(current_user))), current_user)
+    found = get_revision(db, note_id, rev)
+    if not found:
+        raise HTTPException(status_code=404, detail="Revision not found")
+    revision, content = found
+    return NoteRevisionContentSchema(note_id=note_id, rev=rev, created_at=revision.created_at, content=content)
+
 # Only children can update their own notes
-@app.put("/notes/{note_id}", response_model=NoteSchema)
+@router.put("/notes/{note_id}", response_model=NoteSchema)
 def api_update_note(note_id: int, note: NoteSchema, db: Session = Depends(get_db), current_user = Depends(require_child)):
     # Check if note belongs to the authenticated child
-    existing_note = get_note(db, note_id)
-    if not existing_note or existing_note.owner_id != current_user["user"].id:
+    existing_note = get_note(db, note_id, owner_visible_to(db, principal_of(current_user)),
+                             owner_id=current_user["user"].id)
+    if not existing_note:
         raise HTTPException(status_code=404, detail="Note not found")
     
     updated = update_note(db, note_id, {
@@ -206,7 +428,7 @@ def api_update_note(note_id: int, note: NoteSchema, db: Session = Depends(get_db
         "folder": note.folder,
         "tags": ",".join(note.tags) if isinstance(note.tags, list) else note.tags,
         "is_checklist": note.is_checklist,
-    })
+    }, owner_id=current_user["user"].id)
     if not updated:
         raise HTTPException(status_code=404, detail="Note not found")
     return NoteSchema(
@@ -217,50 +439,233 @@ def api_update_note(note_id: int, note: NoteSchema, db: Session = Depends(get_db
         folder=updated.folder,
         tags=updated.tags.split(",") if updated.tags else [],
         is_checklist=updated.is_checklist,
+        updated_at=updated.updated_at,
+        checklist_items=[
+            ChecklistItemSchema.model_validate(item) for item in updated.checklist_items
+        ],
+    )
+
+# Partial update for autosave: send only changed fields or text splices
+@router.patch("/notes/{note_id}", response_model=NoteSchema)
+def api_patch_note(note_id: int, patch: NotePatchSchema, db: Session = Depends(get_db), current_user = Depends(require_child)):
+    existing_note = get_note(db, note_id, owner_visible_to(db, principal_of(current_user)),
+                             owner_id=current_user["user"].id)
+    if not existing_note:
+        raise HTTPException(status_code=404, detail="Note not found")
+    if patch.content is not None and patch.splices:
+        raise HTTPException(status_code=400, detail="Send either content or splices, not both")
+
+    # Fields left out stay as they are; an explicit null clears folder (title and friends cannot be null)
+    fields = patch.model_dump(include={"title", "content", "folder", "is_checklist"}, exclude_unset=True)
+    for key in ("title", "content", "is_checklist"):
+        if key in fields and fields[key] is None:
+            raise HTTPException(status_code=400, detail=f"{key} cannot be null")
+    if "tags" in patch.model_fields_set:
+        fields["tags"] = ",".join(patch.tags or [])
+    try:
+        updated = patch_note(
+            db, note_id, patch.base_updated_at, fields,
+            splices=[(s.offset, s.delete_count, s.insert) for s in patch.splices],
+            owner_id=current_user["user"].id,
+        )
+    except NoteVersionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not updated:
+        raise HTTPException(status_code=404, detail="Note not found")
+    return NoteSchema(
+        id=updated.id,
+        title=updated.title,
+        content=updated.content,
+        owner_id=updated.owner_id,
+        folder=updated.folder,
+        tags=updated.tags.split(",") if updated.tags else [],
+        is_checklist=updated.is_checklist,
+        updated_at=updated.updated_at,
         checklist_items=[
             ChecklistItemSchema.model_validate(item) for item in updated.checklist_items
         ],
     )
 
 # Only children can delete their own notes
-@app.delete("/notes/{note_id}", status_code=204)
+@router.delete("/notes/{note_id}", status_code=204)
 def api_delete_note(note_id: int, db: Session = Depends(get_db), current_user = Depends(require_child)):
     # Check if note belongs to the authenticated child
-    existing_note = get_note(db, note_id)
-    if not existing_note or existing_note.owner_id != current_user["user"].id:
+    existing_note = get_note(db, note_id, owner_visible_to(db, principal_of(current_user)),
+                             owner_id=current_user["user"].id)
+    if not existing_note:
         raise HTTPException(status_code=404, detail="Note not found")
     
-    ok = delete_note(db, note_id)
+    ok = delete_note(db, note_id, owner_id=current_user["user"].id)
     if not ok:
         raise HTTPException(status_code=404, detail="Note not found")
     return None
 
-@app.post("/notes/{note_id}/checklist/", response_model=ChecklistItemSchema)
-def api_add_checklist_item(note_id: int, item: ChecklistItemSchema, db: Session = Depends(get_db)):
-    db_item = add_checklist_item(db, note_id=note_id, text=item.text, checked=item.checked)
-    return ChecklistItemSchema.model_validate(db_item)
+@router.post("/notes/{note_id}/checklist/", response_model=ChecklistItemSchema)
+def api_add_checklist_item(note_id: int, item: ChecklistItemSchema, db: Session = Depends(get_db),
+                           principal: Optional[Tuple[str, int]] = Depends(get_optional_principal),
+                           idempotency_key: Optional[str] = Header(None, max_length=255)):
+    def add() -> ChecklistItemSchema:
+        # A child usually adds to their own note: try that owner's partition first
+        likely_owner_id = principal[1] if principal and principal[0] == "child" else None
+        db_item = add_checklist_item(db, note_id=note_id, text=item.text, checked=item.checked,
+                                     likely_owner_id=likely_owner_id)
+        return ChecklistItemSchema.model_validate(db_item)
+
+    if idempotency_key and not principal:
+        # Keys are scoped to the caller; anonymous callers would share (and replay) each other's
+        raise HTTPException(status_code=401, detail="Idempotency-Key requires an authenticated caller")
+    scope = f"{principal[0]}:{principal[1]}:POST:/notes/{note_id}/checklist/" if principal else ""
+    return idempotent_json(idempotency_key, scope, item, add)
 
-@app.get("/notes/{note_id}/checklist/", response_model=List[ChecklistItemSchema])
-def api_list_checklist_items(note_id: int, db: Session = Depends(get_db)):
+@router.get("/notes/{note_id}/checklist/", response_model=List[ChecklistItemSchema])
+def api_list_checklist_items(note_id: int, db: Session = Depends(get_read_db),
+                             principal: Optional[Tuple[str, int]] = Depends(get_optional_principal)):
     items = list_checklist_items(db, note_id)
+    if not items:
+        # The note may be archived: its items come back with it, for a caller allowed to see it.
+        # A live note with no items is found by the plain read and nothing is locked
+        note = get_note(db, note_id, owner_visible_to(db, principal))
+        items = note.checklist_items if note is not None else []
     return [ChecklistItemSchema.model_validate(i) for i in items]
 
-@app.put("/checklist/{item_id}", response_model=ChecklistItemSchema)
+@router.put("/checklist/{item_id}", response_model=ChecklistItemSchema)
 def api_update_checklist_item(item_id: int, item: ChecklistItemSchema, db: Session = Depends(get_db)):
     updated = update_checklist_item(db, item_id, {"text": item.text, "checked": item.checked})
     if not updated:
         raise HTTPException(status_code=404, detail="Checklist item not found")
     return ChecklistItemSchema.model_validate(updated)
 
-@app.delete("/checklist/{item_id}", status_code=204)
+@router.delete("/checklist/{item_id}", status_code=204)
 def api_delete_checklist_item(item_id: int, db: Session = Depends(get_db)):
     ok = delete_checklist_item(db, item_id)
     if not ok:
         raise HTTPException(status_code=404, detail="Checklist item not found")
     return None
 
-@app.get("/child/by-family-code")
-def get_child_by_family_code_endpoint(family_code: str, db: Session = Depends(get_db)):
+# Read endpoints that POST /batch can run, by path
+BATCH_ROUTES = [
+    ("list_notes", re.compile(r"^/notes/?$")),
+    ("get_note", re.compile(r"^/notes/(?P<note_id>\d+)/?$")),
+    ("list_checklist", re.compile(r"^/notes/(?P<note_id>\d+)/checklist/?$")),
+    ("child_by_family_code", re.compile(r"^/child/by-family-code/?$")),
+]
+
+def _batch_int_param(params: dict, name: str, default: Optional[int] = None) -> int:
+    value = params.get(name, default)
+    if value is None:
+        raise HTTPException(status_code=422, detail=f"Missing query parameter: {name}")
+    try:
+        return int(value)
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"Query parameter {name} must be an integer")
+
+# Page load in one round-trip: one auth check and one session for several reads,
+# with note, checklist and family-code lookups each coalesced into one IN query
+@router.post("/batch")
+def api_batch(batch: BatchRequestSchema, db: Session = Depends(get_read_db), current_user = Depends(require_child_or_parent)):
+    planned = []
+    note_ids, family_codes = set(), set()
+    for sub in batch.requests:
+        path = sub.path.split("?", 1)[0]
+        route, match = next(((name, m) for name, pattern in BATCH_ROUTES if (m := pattern.match(path))), (None, None))
+        if match and "note_id" in match.groupdict():
+            note_ids.add(int(match["note_id"]))
+        if route == "child_by_family_code" and "family_code" in sub.params:
+            family_codes.add(str(sub.params["family_code"]))
+        planned.append((sub, route, match))
+
+    notes = get_notes_by_ids(db, note_ids, owner_visible_to(db, principal_of(current_user)))
+    items = list_checklist_items_for_notes(db, notes)
+    children = get_children_by_family_codes(db, family_codes)
+
+    def run(sub, route, match) -> bytes:
+        if route == "list_notes":
+            owner_id = _batch_int_param(sub.params, "owner_id")
+            require_owner_access(db, owner_id, current_user)
+            return render_note_page(
+                db, owner_id, _batch_int_param(sub.params, "limit", 20), _batch_int_param(sub.params, "offset", 0),
+                str(sub.params.get("include_archived", "")).lower() in ("1", "true"),
+            )
+        if route == "get_note":
+            n = require_note_access(db, notes.get(int(match["note_id"])), current_user)
+            return NoteSchema(
+                id=n.id, title=n.title, content=n.content, owner_id=n.owner_id,
+                folder=n.folder, tags=n.tags.split(",") if n.tags else [],
+                is_checklist=n.is_checklist, updated_at=n.updated_at,
+                checklist_items=[ChecklistItemSchema.model_validate(item) for item in items[n.id]],
+            ).model_dump_json().encode("utf-8")
+        if route == "list_checklist":
+            n = require_note_access(db, notes.get(int(match["note_id"])), current_user)
+            return checklist_list_adapter.dump_json([ChecklistItemSchema.model_validate(i) for i in items[n.id]])
+        if route == "child_by_family_code":
+            child = children.get(str(sub.params.get("family_code")))
+            if not child:
+                raise HTTPException(status_code=404, detail="Child not found")
+            return json.dumps({
+                "id": child.id, "name": child.name, "email": child.email, "family_code": child.family_code,
+            }).encode("utf-8")
+        raise HTTPException(status_code=404, detail=f"Cannot batch {sub.method} {sub.path}")
+
+    responses = []
+    for index, (sub, route, match) in enumerate(planned):
+        try:
+            status_code, body = 200, run(sub, route, match)
+        except HTTPException as e:
+            status_code, body = e.status_code, json.dumps({"detail": e.detail}).encode("utf-8")
+        request_id = json.dumps(sub.id if sub.id is not None else str(index)).encode("utf-8")
+        responses.append(b'{"id":%s,"status":%d,"body":%s}' % (request_id, status_code, body))
+    return Response(content=b'{"responses":[' + b",".join(responses) + b"]}", media_type="application/json")
+
+# Parents: newest notes across every linked child, paged with an opaque cursor
+@router.get("/parent/feed", response_model=NoteFeedSchema)
+def api_parent_feed(limit: int = 20, cursor: Optional[str] = None,
+                    db: Session = Depends(get_read_db), current_user = Depends(require_parent)):
+    try:
+        notes, next_cursor = parent_feed(db, current_user["user"].id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    items = list_checklist_items_for_notes(db, [n.id for n in notes])
+    return NoteFeedSchema(
+        notes=[
+            NoteSchema(
+                id=n.id, title=n.title, content=n.content, owner_id=n.owner_id,
+                folder=n.folder, tags=n.tags.split(",") if n.tags else [],
+                is_checklist=n.is_checklist, updated_at=n.updated_at,
+                checklist_items=[ChecklistItemSchema.model_validate(item) for item in items[n.id]],
+            )
+            for n in notes
+        ],
+        next_cursor=next_cursor,
+    )
+
+@router.post("/parent/children")
+def api_link_child(payload: LinkChildSchema, db: Session = Depends(get_db), current_user = Depends(require_parent)):
+    try:
+        child = link_child_to_parent(db, current_user["user"].id, payload.family_code)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"id": child.id, "name": child.name}
+
+@metrics_router.get("/cache")
+def api_cache_metrics():
+    return note_list_cache.stats()
+
+@metrics_router.get("/idempotency")
+def api_idempotency_metrics():
+    return idempotency_store.stats()
+
+@metrics_router.get("/jobs")
+def api_job_metrics():
+    return job_queue.metrics()
+
+@metrics_router.get("/archive")
+def api_archive_metrics():
+    return archive_metrics.snapshot()
+
+@router.get("/child/by-family-code")
+def get_child_by_family_code_endpoint(family_code: str, db: Session = Depends(get_read_db)):
     child = get_child_by_family_code(db, family_code)
     if not child:
         raise HTTPException(status_code=404, detail="Child not found")
@@ -271,3 +676,11 @@ def get_child_by_family_code_endpoint(family_code: str, db: Session = Depends(ge
         "family_code": child.family_code,
     }
 
+def create_app() -> FastAPI:
+    app = FastAPI(title="NoteNest API", lifespan=lifespan)
+    add_cors(app)  # Only add CORS middleware
+    app.include_router(router)
+    app.include_router(metrics_router)
+    return app
+
+app = create_app()
@@ -0,0 +1,11 @@
+from typing import Sequence
+
+# Latency samples kept per metric (a sliding window of the most recent)
+LATENCY_SAMPLES = 1000
+
+
+def percentile_ms(sorted_seconds: Sequence[float], p: float) -> float:
+    """p-th percentile of ascending latencies in seconds, in milliseconds (0 when there are none)"""
+    if not sorted_seconds:
+        return 0.0
+    return sorted_seconds[min(len(sorted_seconds) - 1, int(p / 100 * len(sorted_seconds)))] * 1000
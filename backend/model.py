@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index, LargeBinary
 from sqlalchemy.orm import relationship, declarative_base
 
 Base = declarative_base()
@@ -17,24 +17,92 @@ class Note(Base):
     is_checklist = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    rehydrated_at = Column(DateTime, nullable=True)  # last restored from archived_notes
+    # Last checklist change; keeps the note from being archived without moving updated_at (PATCH's base version)
+    touched_at = Column(DateTime, nullable=True)
 
     checklist_items = relationship("ChecklistItem", back_populates="note", cascade="all, delete-orphan")
+    revisions = relationship("NoteRevision", back_populates="note", cascade="all, delete-orphan")
 
     # COMPOSITE INDEX for pagination query optimization
     __table_args__ = (
         # Most important: optimizes "WHERE owner_id = ? ORDER BY created_at DESC LIMIT ? OFFSET ?"
         Index('ix_notes_owner_created_desc', 'owner_id', 'created_at'),
+        # SQLite otherwise hands out max(id) + 1, reusing the ids of archived rows (see ArchivedNote)
+        {"sqlite_autoincrement": True},
     )
+
+class NoteRevision(Base):
+    __tablename__ = "note_revisions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    note_id = Column(Integer, ForeignKey("notes.id", ondelete="CASCADE"), nullable=False)
+    rev = Column(Integer, nullable=False)
+    is_snapshot = Column(Boolean, default=False, nullable=False)
+    data = Column(LargeBinary, nullable=False)  # zlib-compressed full content or diff
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    note = relationship("Note", back_populates="revisions")
+
+    __table_args__ = (
+        Index('ix_note_revisions_note_rev', 'note_id', 'rev', unique=True),
+        {"sqlite_autoincrement": True},
+    )
+
+class ArchivedNote(Base):
+    """A note moved out of `notes` after a long time untouched; restored on access"""
+    __tablename__ = "archived_notes"
+
+    id = Column(Integer, primary_key=True)  # the note's id, kept for rehydration
+    owner_id = Column(Integer, ForeignKey("children.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    raw_bytes = Column(Integer, nullable=False)  # size of the rows it replaced
+    data = Column(LargeBinary, nullable=False)  # zlib-compressed JSON: note, checklist items, revision headers
+    revision_data = Column(LargeBinary, nullable=False)  # revision blobs (already compressed), concatenated
+
+    __table_args__ = (
+        Index('ix_archived_notes_owner_created', 'owner_id', 'created_at'),
+    )
+
 class ChecklistItem(Base):
     __tablename__ = "checklist_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    note_id = Column(Integer, ForeignKey("notes.id"), nullable=False)
+    note_id = Column(Integer, ForeignKey("notes.id"), nullable=False, index=True)
+    owner_id = Column(Integer, nullable=True, index=True)  # copy of notes.owner_id; partition key
     text = Column(String(1024), nullable=False)
     checked = Column(Boolean, default=False)
 
     note = relationship("Note", back_populates="checklist_items")
 
+    __table_args__ = {"sqlite_autoincrement": True}
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(128), nullable=False)
+    payload = Column(Text, default="{}")  # JSON-encoded keyword arguments
+    status = Column(String(16), default="pending", nullable=False)  # pending / running / failed / done
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+    run_after = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Set while running and renewed by the worker; a running job past it belonged to a dead process
+    lease_expires_at = Column(DateTime, nullable=True)
+    # Scheduled runs only: "<name>:<window>", so processes scheduling the same job queue it once per
+    # window. Such rows end as "done" rather than being deleted, to keep blocking their window
+    schedule_key = Column(String(160), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Workers poll "WHERE status = 'pending' AND run_after <= now ORDER BY run_after"
+        Index('ix_jobs_status_run_after', 'status', 'run_after'),
+        Index('ux_jobs_schedule_key', 'schedule_key', unique=True),
+    )
+
 
 class Child(Base):
     __tablename__ = "children"
@@ -57,8 +125,21 @@ class Parent(Base):
     name = Column(String, nullable=False)
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
-    child_id = Column(Integer, ForeignKey("children.id"), nullable=False)
+    # First linked child; parent_child_links is authoritative. NULL where 8adc50a73338 dropped the column
+    child_id = Column(Integer, ForeignKey("children.id"), nullable=True)
     refresh_token = Column(Text , unique= True , nullable= True)
     created_at = Column(DateTime, default=datetime.utcnow)
     # Relationship to child
-    child = relationship("Child", back_populates="parents")
\ No newline at end of file
+    child = relationship("Child", back_populates="parents")
+
+
+class ParentChildLink(Base):
+    """Many-to-many link between parents and children (backfilled from Parent.child_id)"""
+    __tablename__ = "parent_child_links"
+    parent_id = Column(Integer, ForeignKey("parents.id", ondelete="CASCADE"), primary_key=True)
+    child_id = Column(Integer, ForeignKey("children.id", ondelete="CASCADE"), primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_parent_child_links_child_id', 'child_id'),
+    )
@@ -0,0 +1,265 @@
+"""Online conversion of `notes` and `checklist_items` to hash partitions by owner_id.
+
+PostgreSQL only. Both tables are rebuilt side by side while the application
+keeps running:
+
+1. create `<table>_new` (hash-partitioned, or plain when reverting) with the
+   same columns, indexes and foreign keys;
+2. mirror every write on the live tables into the new ones with triggers;
+3. copy existing rows in id-ordered batches, one short transaction each;
+4. swap the tables by renaming them in a single short transaction.
+
+The old tables are kept as `<table>_old` for rollback; drop them with
+`--drop-old` once satisfied. Partitioned tables need the partition key in
+every unique constraint, so primary keys become (id, owner_id), checklist
+items reference notes by (note_id, owner_id), and `note_revisions` loses its
+database-level foreign key (the ORM still cascades deletes).
+
+Runs from the Alembic revision d8f3b6a04c12 when enabled with
+`alembic -x notes_partitions=16 upgrade head`, or standalone:
+
+    python -m backend.partitioning --database-url postgresql://... --partitions 16
+"""
+import argparse
+import re
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import create_engine, text
+
+DEFAULT_BATCH_SIZE = 50000
+TABLES = ("notes", "checklist_items")
+
+
+def is_partitioned(conn, table: str = "notes") -> bool:
+    return bool(conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"
+    ), {"table": table}).scalar())
+
+
+def _columns(conn, table: str) -> List[str]:
+    return [row[0] for row in conn.execute(text(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = :table ORDER BY ordinal_position"
+    ), {"table": table})]
+
+
+def _secondary_indexes(conn, table: str) -> Dict[str, str]:
+    """index name -> CREATE INDEX statement, excluding the primary key"""
+    rows = conn.execute(text(
+        "SELECT i.indexname, i.indexdef FROM pg_indexes i "
+        "WHERE i.schemaname = current_schema() AND i.tablename = :table "
+        "AND i.indexname NOT IN (SELECT conname FROM pg_constraint WHERE contype = 'p' AND conrelid = to_regclass(:table))"
+    ), {"table": table})
+    return {name: definition for name, definition in rows}
+
+
+def _partitions(conn, table: str) -> List[str]:
+    return [row[0] for row in conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:table) ORDER BY c.relname"
+    ), {"table": table})]
+
+
+def _foreign_keys_referencing(conn, table: str) -> List[tuple]:
+    """(referencing table, constraint name) for FKs that point at `table`"""
+    return [tuple(row) for row in conn.execute(text(
+        "SELECT conrelid::regclass::text, conname FROM pg_constraint "
+        "WHERE contype = 'f' AND confrelid = to_regclass(:table) AND conparentid = 0"
+    ), {"table": table})]
+
+
+def _create_new_table(conn, table: str, partitions: Optional[int]) -> None:
+    key = "(id, owner_id)" if partitions else "(id)"
+    suffix = " PARTITION BY HASH (owner_id)" if partitions else ""
+    conn.execute(text(f"CREATE TABLE {table}_new (LIKE {table} INCLUDING DEFAULTS){suffix}"))
+    if table == "checklist_items":
+        conn.execute(text("ALTER TABLE checklist_items_new ALTER COLUMN owner_id SET NOT NULL"))
+    conn.execute(text(f"ALTER TABLE {table}_new ADD CONSTRAINT {table}_new_pkey PRIMARY KEY {key}"))
+    for i in range(partitions or 0):
+        conn.execute(text(
+            f"CREATE TABLE {table}_new_p{i} PARTITION OF {table}_new "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {i})"
+        ))
+    for name, definition in _secondary_indexes(conn, table).items():
+        if definition.startswith("CREATE UNIQUE") and partitions and "owner_id" not in definition:
+            raise RuntimeError(f"Unique index {name} does not include owner_id and cannot be partitioned")
+        definition = definition.replace(f"INDEX {name} ON", f"INDEX {name}_new ON", 1)
+        definition = re.sub(rf" ON (ONLY )?(\w+\.)?{table} ", f" ON {table}_new ", definition, count=1)
+        conn.execute(text(definition))
+
+
+def _create_sync_trigger(conn, table: str, partitions: Optional[int]) -> None:
+    """Mirror row changes on the live table into <table>_new until the swap.
+
+    Updates are applied in place (an upsert), never as delete plus insert,
+    so a note keeps its row in notes_new while checklist items reference it.
+    """
+    key = "id, owner_id" if partitions else "id"
+    assignments = ", ".join(
+        f"{column} = EXCLUDED.{column}" for column in _columns(conn, table) if column not in ("id", "owner_id")
+    )
+    fill_owner = ""
+    if table == "checklist_items":
+        fill_owner = (
+            "IF NEW.owner_id IS NULL THEN "
+            "NEW.owner_id := (SELECT owner_id FROM notes WHERE id = NEW.note_id); END IF;"
+        )
+    conn.execute(text(f"""
+        CREATE OR REPLACE FUNCTION {table}_sync_new() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                DELETE FROM {table}_new WHERE id = OLD.id;
+                RETURN NULL;
+            END IF;
+            {fill_owner}
+            IF TG_OP = 'UPDATE' AND NEW.owner_id IS DISTINCT FROM OLD.owner_id THEN
+                -- A new owner is a new partition key, so the upsert below would not find the row
+                DELETE FROM {table}_new WHERE id = OLD.id;
+            END IF;
+            INSERT INTO {table}_new SELECT (NEW).*
+                ON CONFLICT ({key}) DO UPDATE SET {assignments};
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """))
+    conn.execute(text(
+        f"CREATE TRIGGER {table}_sync_new AFTER INSERT OR UPDATE OR DELETE ON {table} "
+        f"FOR EACH ROW EXECUTE FUNCTION {table}_sync_new()"
+    ))
+
+
+def _backfill(conn, table: str, batch_size: int, pause: float, log) -> int:
+    columns = _columns(conn, table)
+    select_list = ", ".join(
+        "COALESCE(t.owner_id, (SELECT n.owner_id FROM notes n WHERE n.id = t.note_id))"
+        if table == "checklist_items" and column == "owner_id" else f"t.{column}"
+        for column in columns
+    )
+    statement = text(
+        f"INSERT INTO {table}_new ({', '.join(columns)}) SELECT {select_list} FROM {table} t "
+        f"WHERE t.id > :lo AND t.id <= :hi ON CONFLICT DO NOTHING"
+    )
+    # Rows above max_id arrive after the trigger exists and are mirrored by it
+    max_id = conn.execute(text(f"SELECT COALESCE(max(id), 0) FROM {table}")).scalar()
+    copied = 0
+    for lo in range(0, max_id, batch_size):
+        copied += conn.execute(statement, {"lo": lo, "hi": lo + batch_size}).rowcount
+        log(f"{table}: copied through id {min(lo + batch_size, max_id)} of {max_id}")
+        if pause:
+            time.sleep(pause)
+    return copied
+
+
+def _swap(conn, partitions: Optional[int]) -> None:
+    """Rename new tables into place in one short transaction"""
+    sequences = {
+        table: conn.execute(text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": table}).scalar()
+        for table in TABLES
+    }
+    indexes = {table: list(_secondary_indexes(conn, table)) for table in TABLES}
+    old_partitions = {table: _partitions(conn, table) for table in TABLES}
+    new_partitions = {table: _partitions(conn, f"{table}_new") for table in TABLES}
+    referencing = _foreign_keys_referencing(conn, "notes")
+
+    conn.execute(text("BEGIN"))
+    try:
+        conn.execute(text("LOCK TABLE notes, checklist_items, note_revisions IN ACCESS EXCLUSIVE MODE"))
+        for table in TABLES:
+            conn.execute(text(f"DROP TRIGGER {table}_sync_new ON {table}"))
+            conn.execute(text(f"DROP FUNCTION {table}_sync_new()"))
+        for owner_table, constraint in referencing:
+            conn.execute(text(f"ALTER TABLE {owner_table} DROP CONSTRAINT {constraint}"))
+        for table in TABLES:
+            conn.execute(text(f"ALTER TABLE {table} RENAME CONSTRAINT {table}_pkey TO {table}_old_pkey"))
+            conn.execute(text(f"ALTER TABLE {table} RENAME TO {table}_old"))
+            conn.execute(text(f"ALTER TABLE {table}_new RENAME TO {table}"))
+            conn.execute(text(f"ALTER TABLE {table} RENAME CONSTRAINT {table}_new_pkey TO {table}_pkey"))
+            for name in indexes[table]:
+                conn.execute(text(f"ALTER INDEX {name} RENAME TO {name}_old"))
+                conn.execute(text(f"ALTER INDEX {name}_new RENAME TO {name}"))
+            for name in old_partitions[table]:
+                conn.execute(text(f"ALTER TABLE {name} RENAME TO {name}_old"))
+            for name in new_partitions[table]:
+                conn.execute(text(f"ALTER TABLE {name} RENAME TO {name.replace(f'{table}_new_', f'{table}_', 1)}"))
+            if sequences[table]:
+                conn.execute(text(f"ALTER SEQUENCE {sequences[table]} OWNED BY {table}.id"))
+        conn.execute(text(
+            "ALTER TABLE checklist_items ALTER CONSTRAINT checklist_items_new_note_id_fkey NOT DEFERRABLE"
+        ))
+        if not partitions:
+            # Plain tables can keep the single-column reference; validated after the swap
+            conn.execute(text(
+                "ALTER TABLE note_revisions ADD CONSTRAINT note_revisions_note_id_fkey "
+                "FOREIGN KEY (note_id) REFERENCES notes (id) ON DELETE CASCADE NOT VALID"
+            ))
+        conn.execute(text("COMMIT"))
+    except Exception:
+        conn.execute(text("ROLLBACK"))
+        raise
+    if not partitions:
+        conn.execute(text("ALTER TABLE note_revisions VALIDATE CONSTRAINT note_revisions_note_id_fkey"))
+
+
+def rebuild(conn, partitions: Optional[int], batch_size: int = DEFAULT_BATCH_SIZE, pause: float = 0.0, log=print) -> None:
+    """Rebuild notes/checklist_items as `partitions` hash partitions, or as plain tables when None.
+
+    `conn` must be in autocommit mode so each batch commits on its own.
+    """
+    for table in TABLES:
+        if conn.execute(text("SELECT to_regclass(:t)"), {"t": f"{table}_old"}).scalar():
+            raise RuntimeError(f"{table}_old exists from a previous conversion; drop it first (--drop-old)")
+
+    _create_new_table(conn, "notes", partitions)
+    conn.execute(text(
+        "ALTER TABLE notes_new ADD CONSTRAINT notes_new_owner_id_fkey "
+        "FOREIGN KEY (owner_id) REFERENCES children (id)"
+    ))
+    _create_sync_trigger(conn, "notes", partitions)
+    _backfill(conn, "notes", batch_size, pause, log)
+
+    # Items reference the new notes table, so they are copied once it is complete. The reference is
+    # checked at commit until the swap: mirrored writes land in whatever order the live statements ran
+    _create_new_table(conn, "checklist_items", partitions)
+    columns = "(note_id, owner_id) REFERENCES notes_new (id, owner_id)" if partitions else "(note_id) REFERENCES notes_new (id)"
+    conn.execute(text(
+        "ALTER TABLE checklist_items_new ADD CONSTRAINT checklist_items_new_note_id_fkey "
+        f"FOREIGN KEY {columns} DEFERRABLE INITIALLY DEFERRED"
+    ))
+    _create_sync_trigger(conn, "checklist_items", partitions)
+    _backfill(conn, "checklist_items", batch_size, pause, log)
+
+    _swap(conn, partitions)
+    for table in TABLES:
+        conn.execute(text(f"ANALYZE {table}"))
+    log("swap complete; old tables kept as notes_old and checklist_items_old")
+
+
+def drop_old(conn) -> None:
+    for table in reversed(TABLES):
+        conn.execute(text(f"DROP TABLE IF EXISTS {table}_old CASCADE"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert notes/checklist_items to or from hash partitions")
+    parser.add_argument("--database-url", required=True)
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--partitions", type=int, help="number of hash partitions to create")
+    mode.add_argument("--unpartition", action="store_true", help="convert back to plain tables")
+    mode.add_argument("--drop-old", action="store_true", help="drop the *_old tables left by a conversion")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds to sleep between batches")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url, isolation_level="AUTOCOMMIT")
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("Hash partitioning requires PostgreSQL")
+    with engine.connect() as conn:
+        if args.drop_old:
+            drop_old(conn)
+        else:
+            rebuild(conn, None if args.unpartition else args.partitions, args.batch_size, args.pause)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
-from typing import List, Optional, Literal
-from pydantic import BaseModel, EmailStr
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Literal, Union
+from pydantic import BaseModel, EmailStr, Field, field_validator
 
 class ChecklistItemSchema(BaseModel):
     id: Optional[int] = None
@@ -17,9 +18,74 @@ class NoteSchema(BaseModel):
     tags: List[str] = []
     is_checklist: bool = False
     checklist_items: List[ChecklistItemSchema] = []
+    updated_at: Optional[datetime] = None  # base version for PATCH
 
     model_config = {"from_attributes": True}
 
+class TextSpliceSchema(BaseModel):
+    # Counted in UTF-16 code units, like JavaScript string indices (an emoji counts 2)
+    offset: int
+    delete_count: int = 0
+    insert: str = ""
+
+class NotePatchSchema(BaseModel):
+    """Only fields present in the request change; folder and tags may be sent as null to clear them"""
+    base_updated_at: datetime  # updated_at of the version the edits were made against
+    title: Optional[str] = None
+    content: Optional[str] = None  # full replacement; mutually exclusive with splices
+    splices: List[TextSpliceSchema] = []  # applied in order to the base content
+    folder: Optional[str] = None
+    tags: Optional[List[str]] = None
+    is_checklist: Optional[bool] = None
+
+    @field_validator("base_updated_at")
+    @classmethod
+    def naive_utc(cls, value: datetime) -> datetime:
+        # updated_at is stored as naive UTC; "...Z" or "+02:00" must compare equal to it
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+class NoteRevisionSchema(BaseModel):
+    rev: int
+    is_snapshot: bool
+    created_at: Optional[datetime] = None
+    size: int  # stored (compressed) bytes
+
+class NoteRevisionContentSchema(BaseModel):
+    note_id: int
+    rev: int
+    created_at: Optional[datetime] = None
+    content: str
+
+class NoteExportSchema(BaseModel):
+    """One line of an NDJSON export; the same shape is accepted by import"""
+    id: Optional[int] = None  # id in the exporting account; ignored on import
+    title: str
+    content: str = ""
+    folder: Optional[str] = None
+    tags: List[str] = []
+    is_checklist: bool = False
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    checklist_items: List[ChecklistItemSchema] = []
+
+class BatchSubRequestSchema(BaseModel):
+    id: Optional[str] = None  # echoed back so clients can match responses
+    method: Literal["GET"] = "GET"  # only reads can be batched
+    path: str  # e.g. "/notes/12" or "/notes/12/checklist/"
+    params: Dict[str, Union[int, str]] = {}  # query parameters
+
+class BatchRequestSchema(BaseModel):
+    requests: List[BatchSubRequestSchema] = Field(max_length=50)
+
+class NoteFeedSchema(BaseModel):
+    notes: List[NoteSchema]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
+
+class LinkChildSchema(BaseModel):
+    family_code: str
+
 class UserSignupSchema(BaseModel):
     name: str
     email: EmailStr
@@ -0,0 +1,235 @@
+import json
+import os
+import threading
+import time
+import zlib
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Tuple
+from dotenv import load_dotenv
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+from backend.model import ArchivedNote, ChecklistItem, Child, Note, NoteRevision
+from backend.cache import note_list_cache
+from backend.jobs import job
+from backend.metrics import LATENCY_SAMPLES, percentile_ms
+
+load_dotenv()
+
+# Notes neither updated nor rehydrated for this many days move to archived_notes; 0 disables archiving
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "180"))
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "86400"))
+# Owners read per query, and notes moved per transaction, by the archive job
+ARCHIVE_OWNER_BATCH = 200
+ARCHIVE_NOTE_BATCH = 200
+
+
+class ArchiveMetrics:
+    """Totals for archive runs and a window of rehydration latencies"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies: deque = deque(maxlen=LATENCY_SAMPLES)
+        self._counts = {
+            "runs": 0, "notes_archived": 0, "hot_bytes_moved": 0, "archive_bytes_written": 0,
+            "notes_rehydrated": 0, "bytes_rehydrated": 0,
+        }
+        self.last_run: Optional[dict] = None
+
+    def record_run(self, notes: int, raw_bytes: int, stored_bytes: int, seconds: float) -> None:
+        with self._lock:
+            self._counts["runs"] += 1
+            self._counts["notes_archived"] += notes
+            self._counts["hot_bytes_moved"] += raw_bytes
+            self._counts["archive_bytes_written"] += stored_bytes
+            self.last_run = {
+                "finished_at": datetime.utcnow().isoformat(), "seconds": seconds, "notes_archived": notes,
+                "bytes_reclaimed": raw_bytes - stored_bytes,
+            }
+
+    def record_rehydration(self, raw_bytes: int, seconds: float) -> None:
+        with self._lock:
+            self._counts["notes_rehydrated"] += 1
+            self._counts["bytes_rehydrated"] += raw_bytes
+            self._latencies.append(seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            counts = dict(self._counts)
+            last_run = self.last_run
+
+        return {
+            "archive_after_days": ARCHIVE_AFTER_DAYS,
+            **counts,
+            # Net: row data that left the hot tables minus what the archive rows take
+            "bytes_reclaimed": counts["hot_bytes_moved"] - counts["archive_bytes_written"],
+            "last_run": last_run,
+            "rehydration_p50_ms": percentile_ms(latencies, 50),
+            "rehydration_p95_ms": percentile_ms(latencies, 95),
+            "rehydration_p99_ms": percentile_ms(latencies, 99),
+        }
+
+
+archive_metrics = ArchiveMetrics()
+
+def _pack(note: Note) -> ArchivedNote:
+    """One archive row holding the note, its checklist items and its revisions"""
+    revisions = sorted(note.revisions, key=lambda r: r.rev)
+    payload = json.dumps({
+        "title": note.title, "content": note.content, "folder": note.folder, "tags": note.tags,
+        "is_checklist": note.is_checklist,
+        "items": [[item.id, item.text, item.checked] for item in note.checklist_items],
+        "revisions": [
+            [r.id, r.rev, r.is_snapshot, r.created_at.isoformat() if r.created_at else None, len(r.data)]
+            for r in revisions
+        ],
+    }, separators=(",", ":")).encode("utf-8")
+    # Revision blobs are zlib already; appending them raw beats compressing them twice
+    revision_data = b"".join(r.data for r in revisions)
+    return ArchivedNote(
+        id=note.id, owner_id=note.owner_id, created_at=note.created_at, updated_at=note.updated_at,
+        raw_bytes=len(payload) + len(revision_data), data=zlib.compress(payload, 9), revision_data=revision_data,
+    )
+
+def _unpack(archived: ArchivedNote, with_revisions: bool = False) -> Note:
+    """A transient Note (with checklist items, and revisions if asked) rebuilt from an archive row"""
+    payload = json.loads(zlib.decompress(archived.data))
+    note = Note(
+        id=archived.id, owner_id=archived.owner_id, title=payload["title"], content=payload["content"],
+        folder=payload["folder"], tags=payload["tags"], is_checklist=payload["is_checklist"],
+        created_at=archived.created_at, updated_at=archived.updated_at,
+    )
+    note.checklist_items = [
+        ChecklistItem(id=item_id, note_id=archived.id, owner_id=archived.owner_id, text=text, checked=checked)
+        for item_id, text, checked in payload["items"]
+    ]
+    if with_revisions:
+        revisions, offset = [], 0
+        for revision_id, rev, is_snapshot, created_at, size in payload["revisions"]:
+            revisions.append(NoteRevision(
+                id=revision_id, rev=rev, is_snapshot=is_snapshot,
+                created_at=datetime.fromisoformat(created_at) if created_at else None,
+                data=archived.revision_data[offset:offset + size],
+            ))
+            offset += size
+        note.revisions = revisions
+    return note
+
+def archive_owner_notes(db: Session, owner_id: int, cutoff: datetime,
+                        batch_size: int = ARCHIVE_NOTE_BATCH) -> Tuple[int, int, int]:
+    """Move one owner's notes untouched since `cutoff` to archived_notes, a batch per transaction.
+
+    A note counts as touched when it is edited, restored from the archive or
+    has a checklist item added, changed or removed.
+
+    Notes created after the cutoff cannot qualify, so candidates are found
+    through the (owner_id, created_at) index. Rows are locked while they are
+    copied (on PostgreSQL), so an edit racing the move either lands first, and
+    the note stays, or waits and finds the note gone. Returns (notes, bytes
+    moved out of the hot tables, bytes written to the archive).
+    """
+    notes_moved = raw_bytes = stored_bytes = 0
+    while True:
+        query = (
+            db.query(Note).options(selectinload(Note.checklist_items), selectinload(Note.revisions))
+            .filter(
+                Note.owner_id == owner_id, Note.created_at < cutoff, Note.updated_at < cutoff,
+                or_(Note.rehydrated_at.is_(None), Note.rehydrated_at < cutoff),
+                or_(Note.touched_at.is_(None), Note.touched_at < cutoff),
+            )
+        )
+        notes = query.order_by(Note.created_at).limit(batch_size).with_for_update(of=Note).all()
+        if not notes:
+            break
+        rows = [_pack(note) for note in notes]
+        db.add_all(rows)
+        for note in notes:
+            db.delete(note)  # the ORM cascade takes its checklist items and revisions
+        notes_moved += len(rows)
+        raw_bytes += sum(row.raw_bytes for row in rows)
+        stored_bytes += sum(len(row.data) + len(row.revision_data) for row in rows)
+        db.commit()
+        db.expunge_all()
+        if len(notes) < batch_size:
+            break
+    if notes_moved:
+        note_list_cache.invalidate_owner(owner_id)
+    return notes_moved, raw_bytes, stored_bytes
+
+@job("notes.archive_stale")
+def archive_stale_notes(db: Session, days: int = ARCHIVE_AFTER_DAYS, owner_batch: int = ARCHIVE_OWNER_BATCH,
+                        batch_size: int = ARCHIVE_NOTE_BATCH) -> int:
+    """Archive every owner's notes untouched for `days` days (runs on the job queue)"""
+    start = time.perf_counter()
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    totals = [0, 0, 0]
+    last_owner_id = 0
+    while True:
+        owner_ids = db.scalars(
+            select(Child.id).where(Child.id > last_owner_id).order_by(Child.id).limit(owner_batch)
+        ).all()
+        if not owner_ids:
+            break
+        for owner_id in owner_ids:
+            moved = archive_owner_notes(db, owner_id, cutoff, batch_size)
+            totals = [total + value for total, value in zip(totals, moved)]
+        last_owner_id = owner_ids[-1]
+    archive_metrics.record_run(*totals, seconds=time.perf_counter() - start)
+    return totals[0]
+
+def archived_owner_id(db: Session, note_id: int) -> Optional[int]:
+    """Owner of an archived note, read without a lock, so callers can authorize before rehydrating"""
+    return db.query(ArchivedNote.owner_id).filter(ArchivedNote.id == note_id).scalar()
+
+def rehydrate_note(db: Session, note_id: int) -> Optional[Note]:
+    """Move an archived note back into `notes` with its ids, items and revisions.
+
+    Returns the note as found in `notes` if it was not archived (None if it
+    does not exist), which also covers a concurrent request restoring it
+    first. The note keeps its id and updated_at, so links and PATCH base
+    versions held by clients stay valid; rehydrated_at holds it in the hot
+    table for another ARCHIVE_AFTER_DAYS.
+    """
+    start = time.perf_counter()
+    # The lookup locks the row and the restored note exists only on the primary, so stay there
+    db.info.pop("read_only", None)
+    archived = db.query(ArchivedNote).filter(ArchivedNote.id == note_id).with_for_update().first()
+    if archived is None:
+        return db.query(Note).filter(Note.id == note_id).first()
+    note = _unpack(archived, with_revisions=True)
+    note.rehydrated_at = datetime.utcnow()
+    owner_id, raw_bytes = archived.owner_id, archived.raw_bytes
+    db.add(note)
+    db.delete(archived)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        restored = db.query(Note).filter(Note.id == note_id).first()
+        if restored is None:
+            raise  # not a race: an id in the archive row is taken by another row
+        # A concurrent request restored it first (SQLite has no row lock to wait on)
+        return restored
+    note_list_cache.invalidate_owner(owner_id)
+    archive_metrics.record_rehydration(raw_bytes, time.perf_counter() - start)
+    return note
+
+def list_archived_by_owner(db: Session, owner_id: int, limit: int = 20, offset: int = 0) -> List[Note]:
+    """Archived notes as transient Notes, read in place without rehydrating them"""
+    rows = (
+        db.query(ArchivedNote).filter(ArchivedNote.owner_id == owner_id)
+        .order_by(ArchivedNote.created_at, ArchivedNote.id).offset(offset).limit(limit).all()
+    )
+    return [_unpack(row) for row in rows]
+
+def iter_archived_batches(db: Session, owner_id: int, batch_size: int) -> Iterator[List[Note]]:
+    """All of an owner's archived notes in id order, a batch at a time, for export"""
+    for rows in db.scalars(
+        select(ArchivedNote).where(ArchivedNote.owner_id == owner_id)
+        .order_by(ArchivedNote.id).execution_options(yield_per=batch_size)
+    ).partitions():
+        yield [_unpack(row) for row in rows]
+        for row in rows:
+            db.expunge(row)
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, Iterable, Optional
 from sqlalchemy.orm import Session
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
@@ -6,7 +6,8 @@ import secrets
 import string
 import warnings
 from passlib.exc import PasslibHashWarning
-from backend.model import Child, Parent
+from backend.model import Child, Parent, ParentChildLink
+from backend.jobs import job
 import jwt
 import os
 from fastapi import HTTPException, status
@@ -61,6 +62,27 @@ def generate_family_code() -> str:
 def get_child_by_family_code(db: Session, family_code: str) -> Optional[Child]:
     return db.query(Child).filter(Child.family_code == family_code).first()
 
+def get_children_by_family_codes(db: Session, family_codes: Iterable[str]) -> Dict[str, Child]:
+    family_codes = set(family_codes)
+    if not family_codes:
+        return {}
+    return {c.family_code: c for c in db.query(Child).filter(Child.family_code.in_(family_codes))}
+
+def parent_has_child(db: Session, parent_id: int, child_id: int) -> bool:
+    return db.query(ParentChildLink).filter(
+        ParentChildLink.parent_id == parent_id, ParentChildLink.child_id == child_id,
+    ).first() is not None
+
+def link_child_to_parent(db: Session, parent_id: int, family_code: str) -> Child:
+    """Give a parent access to another child, identified by the child's family code"""
+    child = get_child_by_family_code(db, family_code)
+    if not child:
+        raise ValueError("Invalid family code")
+    if not parent_has_child(db, parent_id, child.id):
+        db.add(ParentChildLink(parent_id=parent_id, child_id=child.id))
+        db.commit()
+    return child
+
 def get_child_by_email(db: Session, email: str) -> Optional[Child]:
     return db.query(Child).filter(Child.email == email).first()
 
@@ -145,6 +167,8 @@ def signup_parent(db: Session, name: str, email: str, password: str, family_code
         )
         
         db.add(parent)
+        db.flush()
+        db.add(ParentChildLink(parent_id=parent.id, child_id=child.id))
         db.commit()
         db.refresh(parent)
         
@@ -296,4 +320,19 @@ def logout_user(db: Session, user_id: int, role: str):
         db.commit()
         return True
     
-    return False
\ No newline at end of file
+    return False
+
+@job("auth.cleanup_refresh_tokens")
+def cleanup_expired_refresh_tokens(db: Session, batch_size: int = 500) -> int:
+    """Clear stored refresh tokens that have expired (runs on the job queue)"""
+    cleared = 0
+    for model in (Child, Parent):
+        users = db.query(model).filter(model.refresh_token.isnot(None)).yield_per(batch_size)
+        for user in users:
+            try:
+                jwt.decode(user.refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
+            except jwt.PyJWTError:
+                user.refresh_token = None
+                cleared += 1
+        db.commit()
+    return cleared
@@ -0,0 +1,95 @@
+import base64
+import heapq
+from functools import lru_cache
+from datetime import datetime
+from itertools import groupby, islice
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, bindparam, or_, select, union_all
+from sqlalchemy.orm import Session
+from backend.model import Note, ParentChildLink
+
+FEED_MAX_LIMIT = 100
+
+def encode_feed_cursor(created_at: datetime, note_id: int) -> str:
+    """Opaque cursor for the position after the note (created_at, id)"""
+    raw = f"{created_at.isoformat()}|{note_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_feed_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, note_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return datetime.fromisoformat(created_at), int(note_id)
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid feed cursor")
+
+def _feed_order(row) -> Tuple[datetime, int]:
+    return row.created_at, row.id
+
+def _child_seek(child_id, check_link: bool, paged: bool):
+    """Keys of one child's newest notes, as an index seek on (owner_id, created_at).
+
+    With check_link, the seek only returns rows if the :parent_id parent is linked
+    to the child. Values are bound at execution, so statements can be cached.
+    """
+    stmt = select(Note.id, Note.owner_id, Note.created_at).where(Note.owner_id == child_id)
+    if check_link:
+        stmt = stmt.join(ParentChildLink, and_(
+            ParentChildLink.child_id == Note.owner_id, ParentChildLink.parent_id == bindparam("parent_id"),
+        ))
+    if paged:
+        stmt = stmt.where(or_(
+            Note.created_at < bindparam("after_created_at"),
+            and_(Note.created_at == bindparam("after_created_at"), Note.id < bindparam("after_id")),
+        ))
+    return stmt.order_by(Note.created_at.desc(), Note.id.desc()).limit(bindparam("limit"))
+
+@lru_cache(maxsize=4)
+def _lateral_seeks(paged: bool):
+    """PostgreSQL: links and per-child seeks in one statement"""
+    link = select(ParentChildLink.child_id).where(ParentChildLink.parent_id == bindparam("parent_id")).subquery()
+    seek = _child_seek(link.c.child_id, False, paged).subquery().lateral()
+    return select(seek).select_from(link).join(seek, seek.c.owner_id == link.c.child_id)
+
+@lru_cache(maxsize=256)
+def _union_seeks(children: int, paged: bool):
+    """Other databases: one UNION ALL member per linked child, bound as :child_0..:child_N"""
+    # SQLite only allows ORDER BY/LIMIT inside a UNION member when it is a subquery
+    return union_all(*(
+        select(_child_seek(bindparam(f"child_{i}"), True, paged).subquery()) for i in range(children)
+    ))
+
+def parent_feed(db: Session, parent_id: int, limit: int = 20, cursor: Optional[str] = None) -> Tuple[List[Note], Optional[str]]:
+    """Most recent notes across all of a parent's linked children, newest first.
+
+    Each child contributes the keys of at most `limit` + 1 notes from its own
+    index range, and the per-child runs are k-way merged, so the cost is k
+    short seeks rather than sorting every note of every child; only the
+    winning page is then loaded in full. On PostgreSQL one LATERAL query reads
+    the links and seeks each child; elsewhere the links are read first and the
+    seeks, each re-checking the link, run as one UNION ALL. Returns the page
+    and the cursor for the next one (None at the end).
+    """
+    limit = max(1, min(limit, FEED_MAX_LIMIT))
+    params = {"parent_id": parent_id, "limit": limit + 1}
+    if cursor:
+        params["after_created_at"], params["after_id"] = decode_feed_cursor(cursor)
+
+    if db.get_bind().dialect.name == "postgresql":
+        stmt = _lateral_seeks(bool(cursor))
+    else:
+        child_ids = db.scalars(select(ParentChildLink.child_id).where(ParentChildLink.parent_id == parent_id)).all()
+        if not child_ids:
+            return [], None
+        stmt = _union_seeks(len(child_ids), bool(cursor))
+        params.update((f"child_{i}", child_id) for i, child_id in enumerate(child_ids))
+    keys = db.execute(stmt, params).all()
+
+    # Re-establish each child's order (cheap: at most `limit` + 1 rows each), then merge the runs
+    keys.sort(key=lambda row: (row.owner_id, _feed_order(row)), reverse=True)
+    runs = [list(run) for _, run in groupby(keys, key=lambda row: row.owner_id)]
+    top = list(islice(heapq.merge(*runs, key=_feed_order, reverse=True), limit + 1))
+    next_cursor = encode_feed_cursor(*_feed_order(top[limit - 1])) if len(top) > limit else None
+
+    page_ids = [row.id for row in top[:limit]]
+    notes = {n.id: n for n in db.query(Note).filter(Note.id.in_(page_ids))} if page_ids else {}
+    return [notes[note_id] for note_id in page_ids if note_id in notes], next_cursor
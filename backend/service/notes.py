@@ -1,7 +1,19 @@
 from datetime import datetime
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
+from typing import List, Optional, Dict, Any, Callable, Iterable, Sequence, Tuple
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
 from backend.model import Note, ChecklistItem
+from backend.cache import note_list_cache
+from backend.jobs import job_queue
+from backend.service.revisions import record_revision
+from backend.service.archive import archived_owner_id, list_archived_by_owner, rehydrate_note
+
+# Tries at an edit whose revision number a concurrent edit took first
+REVISION_ATTEMPTS = 5
+
+class NoteVersionConflict(ValueError):
+    """The note changed since the version a client edited"""
 
 def create_note(
     db: Session,
@@ -21,48 +33,215 @@ def create_note(
         is_checklist=is_checklist,
     )
     db.add(note)
+    record_revision(db, note, previous_content=None)
     db.commit()
     db.refresh(note)
+    note_list_cache.invalidate_owner(owner_id)
+    return note
+
+def _note_key(note_id: int, owner_id: Optional[int] = None) -> list:
+    """Filter criteria for one note; with its owner, a partitioned notes table is searched in one partition"""
+    criteria = [Note.id == note_id]
+    if owner_id is not None:
+        criteria.append(Note.owner_id == owner_id)
+    return criteria
+
+def get_note(db: Session, note_id: int, rehydrate_for: Callable[[int], bool] = lambda owner_id: False,
+             owner_id: Optional[int] = None) -> Optional[Note]:
+    """A live note by id; an archived one is moved back first if rehydrate_for(owner_id) allows it.
+
+    Rehydrating writes and locks on the primary, so callers pass their access
+    check rather than letting any request for a guessed id restore a note.
+    Callers that only accept one owner's note pass owner_id: other notes are
+    then not found.
+    """
+    note = db.query(Note).filter(*_note_key(note_id, owner_id)).first()
+    if note is None:
+        archived_owner = archived_owner_id(db, note_id)
+        if archived_owner is not None and owner_id in (None, archived_owner) and rehydrate_for(archived_owner):
+            note = rehydrate_note(db, note_id)
+    return note
+
+def list_notes_by_owner(db: Session, owner_id: int, limit: int = 20, offset: int = 0,
+                        include_archived: bool = False) -> List[Note]:
+    """A page of an owner's notes; with include_archived, archived notes follow the live ones.
+
+    Archived notes are listed read-only from the archive and are not rehydrated.
+    """
+    # Checklist items for the whole page come from one IN query, not one per note
+    notes = (
+        db.query(Note).options(selectinload(Note.checklist_items))
+        .filter(Note.owner_id == owner_id).offset(offset).limit(limit).all()
+    )
+    if include_archived and len(notes) < limit:
+        if notes or offset == 0:
+            live_count = offset + len(notes)
+        else:
+            live_count = db.query(func.count(Note.id)).filter(Note.owner_id == owner_id).scalar()
+        notes += list_archived_by_owner(db, owner_id, limit=limit - len(notes), offset=max(0, offset - live_count))
+    return notes
+
+def get_notes_by_ids(db: Session, note_ids: Iterable[int],
+                     rehydrate_for: Callable[[int], bool] = lambda owner_id: False) -> Dict[int, Note]:
+    note_ids = set(note_ids)
+    if not note_ids:
+        return {}
+    notes = {n.id: n for n in db.query(Note).filter(Note.id.in_(note_ids))}
+    for note_id in note_ids - notes.keys():
+        note = get_note(db, note_id, rehydrate_for)
+        if note is not None:
+            notes[note_id] = note
+    return notes
+
+def update_note(db: Session, note_id: int, fields: Dict[str, Any], owner_id: Optional[int] = None) -> Optional[Note]:
+    for attempt in range(REVISION_ATTEMPTS):
+        # A no-op UPDATE first takes the write lock (the row on PostgreSQL, the database on SQLite),
+        # so edits of one note run one at a time and each takes the next revision number
+        db.query(Note).filter(*_note_key(note_id, owner_id)).update({Note.id: Note.id}, synchronize_session=False)
+        note = db.query(Note).filter(*_note_key(note_id, owner_id)).populate_existing().first()
+        if not note:
+            return None
+        previous_content = note.content
+        for key, value in fields.items():
+            if hasattr(note, key):
+                setattr(note, key, value)
+        content_changed = note.content != previous_content
+        if content_changed:
+            record_revision(db, note, previous_content=previous_content or "")
+        note.updated_at = datetime.utcnow()
+        try:
+            db.commit()
+            break
+        except IntegrityError:
+            # A writer that read the note before the lock can still take the revision number first; redo on top of it
+            db.rollback()
+            if attempt == REVISION_ATTEMPTS - 1:
+                raise
+    db.refresh(note)
+    note_list_cache.invalidate_owner(note.owner_id)
+    if content_changed:
+        job_queue.enqueue("revisions.compact", note_id=note_id)
     return note
 
-def get_note(db: Session, note_id: int) -> Optional[Note]:
-    return db.query(Note).filter(Note.id == note_id).first()
+def apply_splices(content: str, splices: Sequence[Tuple[int, int, str]]) -> str:
+    """Apply (offset, delete_count, insert) edits in order; each sees the previous result.
+
+    Offsets and counts are UTF-16 code units, as browsers count string
+    positions, so the edits run on the UTF-16 encoding (two bytes per unit).
+    """
+    units = content.encode("utf-16-le")
+    for offset, delete_count, insert in splices:
+        if offset < 0 or delete_count < 0 or offset + delete_count > len(units) // 2:
+            raise ValueError(f"Splice out of range: offset={offset}, delete_count={delete_count}")
+        units = units[:offset * 2] + insert.encode("utf-16-le") + units[(offset + delete_count) * 2:]
+    try:
+        return units.decode("utf-16-le")
+    except UnicodeDecodeError:
+        raise ValueError("Splice splits a character (a UTF-16 surrogate pair)")
 
-def list_notes_by_owner(db: Session, owner_id: int, limit: int = 20, offset: int = 0) -> List[Note]:
-    return db.query(Note).filter(Note.owner_id == owner_id).offset(offset).limit(limit).all()
+def patch_note(
+    db: Session,
+    note_id: int,
+    base_updated_at: datetime,
+    fields: Dict[str, Any],
+    splices: Optional[Sequence[Tuple[int, int, str]]] = None,
+    owner_id: Optional[int] = None,
+) -> Optional[Note]:
+    """Apply a partial update if the note is still at base_updated_at.
 
-def update_note(db: Session, note_id: int, fields: Dict[str, Any]) -> Optional[Note]:
-    note = db.query(Note).filter(Note.id == note_id).first()
+    The write is a conditional UPDATE on updated_at, so two clients patching the
+    same base version cannot both succeed.
+    """
+    note = db.query(Note).filter(*_note_key(note_id, owner_id)).first()
     if not note:
         return None
-    for key, value in fields.items():
-        if hasattr(note, key):
-            setattr(note, key, value)
-    note.updated_at = datetime.utcnow()
+    if note.updated_at != base_updated_at:
+        raise NoteVersionConflict("Note was modified since base version")
+
+    previous_content = note.content or ""
+    values = {key: value for key, value in fields.items() if hasattr(Note, key)}
+    if splices:
+        values["content"] = apply_splices(previous_content, splices)
+    values["updated_at"] = datetime.utcnow()
+
+    matched = (
+        db.query(Note)
+        .filter(*_note_key(note_id, note.owner_id), Note.updated_at == base_updated_at)
+        .update(values, synchronize_session="evaluate")
+    )
+    if not matched:
+        db.rollback()
+        raise NoteVersionConflict("Note was modified since base version")
+    content_changed = "content" in values and values["content"] != previous_content
+    if content_changed:
+        record_revision(db, note, previous_content=previous_content)
     db.commit()
     db.refresh(note)
+    note_list_cache.invalidate_owner(note.owner_id)
+    if content_changed:
+        job_queue.enqueue("revisions.compact", note_id=note_id)
     return note
 
-def delete_note(db: Session, note_id: int) -> bool:
-    note = db.query(Note).filter(Note.id == note_id).first()
+def delete_note(db: Session, note_id: int, owner_id: Optional[int] = None) -> bool:
+    note = db.query(Note).filter(*_note_key(note_id, owner_id)).first()
     if not note:
         return False
+    owner_id = note.owner_id
     db.delete(note)
     db.commit()
+    note_list_cache.invalidate_owner(owner_id)
     return True
 
 # Checklist helpers
 
-def add_checklist_item(db: Session, note_id: int, text: str, checked: bool = False) -> ChecklistItem:
-    item = ChecklistItem(note_id=note_id, text=text, checked=checked)
+def _invalidate_note_owner(db: Session, item: ChecklistItem) -> None:
+    # Checklist items are embedded in note listings, so their owner's cache is stale too.
+    # Items carry their note's owner_id; only rows from before that column need the lookup
+    owner_id = item.owner_id
+    if owner_id is None:
+        owner_id = db.query(Note.owner_id).filter(Note.id == item.note_id).scalar()
+    if owner_id is not None:
+        note_list_cache.invalidate_owner(owner_id)
+
+def _touch_note(db: Session, note_id: int, owner_id: Optional[int] = None) -> None:
+    """Stage touched_at on a checklist change, so the archive job sees the note as in use.
+
+    updated_at is set to itself to keep its onupdate from firing: it is the
+    version PATCH clients send back, and items are not part of it.
+    """
+    db.query(Note).filter(*_note_key(note_id, owner_id)).update(
+        {Note.touched_at: datetime.utcnow(), Note.updated_at: Note.updated_at}, synchronize_session=False,
+    )
+
+def add_checklist_item(db: Session, note_id: int, text: str, checked: bool = False,
+                       likely_owner_id: Optional[int] = None) -> ChecklistItem:
+    """Add an item to a note; likely_owner_id, when the caller can guess it, narrows the owner lookup"""
+    owner_id = None
+    if likely_owner_id is not None:
+        owner_id = db.query(Note.owner_id).filter(*_note_key(note_id, likely_owner_id)).scalar()
+    if owner_id is None:
+        owner_id = db.query(Note.owner_id).filter(Note.id == note_id).scalar()
+    _touch_note(db, note_id, owner_id)
+    item = ChecklistItem(note_id=note_id, owner_id=owner_id, text=text, checked=checked)
     db.add(item)
     db.commit()
     db.refresh(item)
+    if owner_id is not None:
+        note_list_cache.invalidate_owner(owner_id)
     return item
 
 def list_checklist_items(db: Session, note_id: int) -> List[ChecklistItem]:
     return db.query(ChecklistItem).filter(ChecklistItem.note_id == note_id).all()
 
+def list_checklist_items_for_notes(db: Session, note_ids: Iterable[int]) -> Dict[int, List[ChecklistItem]]:
+    """Checklist items of several notes in one query, keyed by note id"""
+    items: Dict[int, List[ChecklistItem]] = {note_id: [] for note_id in note_ids}
+    if not items:
+        return items
+    for item in db.query(ChecklistItem).filter(ChecklistItem.note_id.in_(items)).order_by(ChecklistItem.id):
+        items[item.note_id].append(item)
+    return items
+
 def update_checklist_item(db: Session, item_id: int, fields: Dict[str, Any]) -> Optional[ChecklistItem]:
     item = db.query(ChecklistItem).filter(ChecklistItem.id == item_id).first()
     if not item:
@@ -70,8 +249,10 @@ def update_checklist_item(db: Session, item_id: int, fields: Dict[str, Any]) ->
     for key, value in fields.items():
         if hasattr(item, key):
             setattr(item, key, value)
+    _touch_note(db, item.note_id, item.owner_id)
     db.commit()
     db.refresh(item)
+    _invalidate_note_owner(db, item)
     return item
 
 def delete_checklist_item(db: Session, item_id: int) -> bool:
@@ -79,5 +260,7 @@ def delete_checklist_item(db: Session, item_id: int) -> bool:
     if not item:
         return False
     db.delete(item)
+    _touch_note(db, item.note_id, item.owner_id)
     db.commit()
+    _invalidate_note_owner(db, item)
     return True
\ No newline at end of file
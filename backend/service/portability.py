@@ -0,0 +1,209 @@
+import json
+import re
+import zipfile
+from datetime import datetime
+from typing import Dict, Iterator, List, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from backend.model import Note, ChecklistItem
+from backend.cache import note_list_cache
+from backend.service.archive import iter_archived_batches
+from backend.sceheme import NoteExportSchema, ChecklistItemSchema
+
+# Notes fetched per round-trip from the server-side cursor
+EXPORT_BATCH_SIZE = 500
+# Notes inserted per import transaction
+IMPORT_BATCH_SIZE = 1000
+# A single NDJSON line (one note) may not exceed this
+IMPORT_MAX_LINE_BYTES = 4 * 1024 * 1024
+
+class ImportFormatError(ValueError):
+    """An import line could not be parsed"""
+
+def _iter_note_batches(db: Session, owner_id: int, batch_size: int) -> Iterator[List[Tuple[Note, List[ChecklistItem]]]]:
+    """Notes in id order, a batch at a time, each with its checklist items.
+
+    Notes and items are read by two cursors in note id order and merged, so
+    the export is one pass over each table whatever the account size.
+    Archived notes follow, read from the archive without rehydrating them.
+    """
+    note_batches = db.scalars(
+        select(Note)
+        .where(Note.owner_id == owner_id)
+        .order_by(Note.id)
+        .execution_options(yield_per=batch_size)  # server-side cursor where supported
+    ).partitions()
+    item_rows = iter(db.scalars(
+        select(ChecklistItem)
+        .where(ChecklistItem.owner_id == owner_id)
+        .order_by(ChecklistItem.note_id, ChecklistItem.id)
+        .execution_options(yield_per=batch_size * 4)
+    ))
+    next_item = next(item_rows, None)
+    for notes in note_batches:
+        items: Dict[int, List[ChecklistItem]] = {}
+        while next_item is not None and next_item.note_id <= notes[-1].id:
+            items.setdefault(next_item.note_id, []).append(next_item)
+            next_item = next(item_rows, None)
+        yield [(n, items.get(n.id, [])) for n in notes]
+        # Only this batch is ever held; drop it from the session before the next fetch
+        for obj in notes + [item for note_items in items.values() for item in note_items]:
+            db.expunge(obj)
+    for archived in iter_archived_batches(db, owner_id, batch_size):
+        yield [(n, n.checklist_items) for n in archived]
+
+def _export_record(note: Note, items: List[ChecklistItem]) -> NoteExportSchema:
+    return NoteExportSchema(
+        id=note.id, title=note.title, content=note.content or "", folder=note.folder,
+        tags=note.tags.split(",") if note.tags else [], is_checklist=note.is_checklist,
+        created_at=note.created_at, updated_at=note.updated_at,
+        checklist_items=[ChecklistItemSchema.model_validate(item) for item in items],
+    )
+
+def export_ndjson(db: Session, owner_id: int, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """Yield one chunk of NDJSON (one line per note) per cursor batch"""
+    for batch in _iter_note_batches(db, owner_id, batch_size):
+        yield b"".join(_export_record(note, items).model_dump_json().encode("utf-8") + b"\n" for note, items in batch)
+
+def _slug(value: str, fallback: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", value).strip("-").lower()[:60]
+    return slug or fallback
+
+def note_markdown(note: Note, items: List[ChecklistItem]) -> str:
+    """Markdown with a front matter block; values are JSON strings, which YAML also reads"""
+    lines = ["---", f"title: {json.dumps(note.title)}"]
+    if note.folder:
+        lines.append(f"folder: {json.dumps(note.folder)}")
+    if note.tags:
+        lines.append(f"tags: {json.dumps(note.tags.split(','))}")
+    for field in ("created_at", "updated_at"):
+        value = getattr(note, field)
+        if value:
+            lines.append(f"{field}: {value.isoformat()}")
+    lines += ["---", "", note.content or ""]
+    if items:
+        lines.append("")
+        lines += [f"- [{'x' if item.checked else ' '}] {item.text}" for item in items]
+    return "\n".join(lines) + "\n"
+
+class _ChunkSink:
+    """Write-only file object for zipfile that hands back what was written so far"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+def export_markdown_zip(db: Session, owner_id: int, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """Yield a zip of one Markdown file per note, grouped in folder directories.
+
+    The sink is not seekable, so zipfile writes each entry's sizes after its
+    data and only the central directory (a few dozen bytes per note) is held
+    until the end.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for batch in _iter_note_batches(db, owner_id, batch_size):
+            for note, items in batch:
+                folder = _slug(note.folder, "notes") if note.folder else "notes"
+                name = f"{folder}/{note.id}-{_slug(note.title, 'untitled')}.md"
+                timestamp = (note.updated_at or note.created_at or datetime(1980, 1, 1)).timetuple()[:6]
+                info = zipfile.ZipInfo(name, date_time=max(timestamp, (1980, 1, 1, 0, 0, 0)))
+                info.compress_type = zipfile.ZIP_DEFLATED
+                archive.writestr(info, note_markdown(note, items))
+            yield sink.drain()
+    yield sink.drain()
+
+class NoteImporter:
+    """Inserts NDJSON notes for one owner from an upload fed in arbitrary chunks.
+
+    feed() only splits lines; flush() parses and inserts the pending lines in
+    one transaction, so memory is bounded by the batch size and the longest
+    line. Batches committed before an error stay imported. Imported notes get
+    no revision history; it starts from their content on the first edit.
+    """
+
+    def __init__(self, db: Session, owner_id: int, batch_size: int = IMPORT_BATCH_SIZE,
+                 max_line_bytes: int = IMPORT_MAX_LINE_BYTES):
+        self.db = db
+        self.owner_id = owner_id
+        self.batch_size = batch_size
+        self.max_line_bytes = max_line_bytes
+        self.notes = 0
+        self.checklist_items = 0
+        self._buffer = bytearray()
+        self._pending: List[Tuple[int, bytes]] = []
+        self._line_number = 0
+
+    def feed(self, chunk: bytes) -> bool:
+        """Add upload bytes; returns True once a full batch is ready to flush"""
+        self._buffer += chunk
+        *lines, rest = self._buffer.split(b"\n")
+        for line in lines:
+            self._add_line(bytes(line))
+        if len(rest) > self.max_line_bytes:
+            raise ImportFormatError(f"Line {self._line_number + 1}: longer than {self.max_line_bytes} bytes")
+        self._buffer = rest
+        return len(self._pending) >= self.batch_size
+
+    def finish(self) -> None:
+        """End of upload: queue a final line without a trailing newline"""
+        if self._buffer:
+            self._add_line(bytes(self._buffer))
+            self._buffer = bytearray()
+
+    def _add_line(self, line: bytes) -> None:
+        self._line_number += 1
+        if line.strip():
+            self._pending.append((self._line_number, line))
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        records = []
+        for line_number, line in self._pending:
+            try:
+                records.append(NoteExportSchema.model_validate_json(line))
+            except ValidationError as e:
+                raise ImportFormatError(f"Line {line_number}: {e.errors()[0]['msg']}")
+        self._pending = []
+
+        now = datetime.utcnow()
+        note_rows = [
+            {
+                "title": r.title, "content": r.content, "owner_id": self.owner_id,
+                "folder": r.folder, "tags": ",".join(r.tags), "is_checklist": r.is_checklist,
+                "created_at": r.created_at or now, "updated_at": r.updated_at or r.created_at or now,
+            }
+            for r in records
+        ]
+        try:
+            # Table-level inserts skip ORM bulk bookkeeping: one multi-row INSERT per page of rows
+            note_ids = self.db.execute(
+                insert(Note.__table__).returning(Note.__table__.c.id, sort_by_parameter_order=True), note_rows
+            ).scalars().all()
+            item_rows = [
+                {"note_id": note_id, "owner_id": self.owner_id, "text": item.text, "checked": item.checked}
+                for note_id, r in zip(note_ids, records)
+                for item in r.checklist_items
+            ]
+            if item_rows:
+                self.db.execute(insert(ChecklistItem.__table__), item_rows)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        self.notes += len(note_rows)
+        self.checklist_items += len(item_rows)
+        note_list_cache.invalidate_owner(self.owner_id)
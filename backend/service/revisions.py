@@ -0,0 +1,132 @@
+import json
+import zlib
+from difflib import SequenceMatcher
+from typing import List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from backend.model import Note, NoteRevision
+from backend.jobs import job
+
+# Every SNAPSHOT_INTERVAL-th revision stores the full content, so rebuilding any
+# version applies at most SNAPSHOT_INTERVAL - 1 diffs.
+SNAPSHOT_INTERVAL = 20
+
+def _keeps_snapshot(rev: int) -> bool:
+    return (rev - 1) % SNAPSHOT_INTERVAL == 0
+
+def _compress(payload: str) -> bytes:
+    return zlib.compress(payload.encode("utf-8"))
+
+def _decompress(data: bytes) -> str:
+    return zlib.decompress(data).decode("utf-8")
+
+def make_diff(old: str, new: str) -> str:
+    """Line-level diff as JSON: [[start, end, replacement], ...] against the old lines"""
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    ops = [
+        [i1, i2, "".join(new_lines[j1:j2])]
+        for tag, i1, i2, j1, j2 in SequenceMatcher(None, old_lines, new_lines, autojunk=False).get_opcodes()
+        if tag != "equal"
+    ]
+    return json.dumps(ops, separators=(",", ":"))
+
+def apply_diff(old: str, diff: str) -> str:
+    old_lines = old.splitlines(keepends=True)
+    parts = []
+    cursor = 0
+    for start, end, replacement in json.loads(diff):
+        parts.extend(old_lines[cursor:start])
+        parts.append(replacement)
+        cursor = end
+    parts.extend(old_lines[cursor:])
+    return "".join(parts)
+
+def latest_revision_number(db: Session, note_id: int) -> int:
+    return db.query(func.max(NoteRevision.rev)).filter(NoteRevision.note_id == note_id).scalar() or 0
+
+def record_revision(db: Session, note: Note, previous_content: Optional[str]) -> NoteRevision:
+    """Stage a revision for note.content; the caller commits.
+
+    previous_content is the content of the latest recorded revision (None for a
+    new note). Notes created before history existed get their old content
+    recorded as a baseline snapshot first. The revision holds the full content,
+    so the write never waits on a diff; enqueue "revisions.compact" after
+    committing to shrink it.
+    """
+    rev = latest_revision_number(db, note.id) if note.id is not None else 0
+    if rev == 0 and previous_content is not None:
+        rev = 1
+        db.add(NoteRevision(note_id=note.id, rev=rev, is_snapshot=True, data=_compress(previous_content)))
+
+    revision = NoteRevision(note=note, rev=rev + 1, is_snapshot=True, data=_compress(note.content or ""))
+    db.add(revision)
+    return revision
+
+@job("revisions.compact")
+def compact_revisions(db: Session, note_id: int) -> int:
+    """Rewrite a note's full-content revisions between snapshot boundaries as diffs (runs on the job queue).
+
+    Each becomes a diff against the version before it. The rewrite only
+    matches rows still stored in full, so repeated or concurrent runs agree.
+    Returns the number of revisions rewritten.
+    """
+    first = (
+        db.query(func.min(NoteRevision.rev))
+        .filter(
+            NoteRevision.note_id == note_id, NoteRevision.is_snapshot.is_(True),
+            (NoteRevision.rev - 1) % SNAPSHOT_INTERVAL != 0,
+        )
+        .scalar()
+    )
+    if first is None:
+        return 0
+    boundary = first - (first - 1) % SNAPSHOT_INTERVAL
+    revisions = (
+        db.query(NoteRevision)
+        .filter(NoteRevision.note_id == note_id, NoteRevision.rev >= boundary)
+        .order_by(NoteRevision.rev)
+        .all()
+    )
+    compacted = 0
+    content = None
+    for revision in revisions:
+        payload = _decompress(revision.data)
+        if not revision.is_snapshot:
+            content = apply_diff(content, payload)
+            continue
+        if content is not None and not _keeps_snapshot(revision.rev):
+            compacted += (
+                db.query(NoteRevision)
+                .filter(NoteRevision.id == revision.id, NoteRevision.is_snapshot.is_(True))
+                .update({"is_snapshot": False, "data": _compress(make_diff(content, payload))},
+                        synchronize_session=False)
+            )
+        content = payload
+    db.commit()
+    return compacted
+
+def list_revisions(db: Session, note_id: int) -> List[NoteRevision]:
+    return db.query(NoteRevision).filter(NoteRevision.note_id == note_id).order_by(NoteRevision.rev).all()
+
+def get_revision(db: Session, note_id: int, rev: int) -> Optional[Tuple[NoteRevision, str]]:
+    """Rebuild a version from the nearest snapshot at or before it"""
+    snapshot_rev = (
+        db.query(func.max(NoteRevision.rev))
+        .filter(NoteRevision.note_id == note_id, NoteRevision.rev <= rev, NoteRevision.is_snapshot.is_(True))
+        .scalar()
+    )
+    if snapshot_rev is None:
+        return None
+    chain = (
+        db.query(NoteRevision)
+        .filter(NoteRevision.note_id == note_id, NoteRevision.rev >= snapshot_rev, NoteRevision.rev <= rev)
+        .order_by(NoteRevision.rev)
+        .all()
+    )
+    if not chain or chain[-1].rev != rev:
+        return None
+    content = _decompress(chain[0].data)
+    for revision in chain[1:]:
+        content = apply_diff(content, _decompress(revision.data))
+    return chain[-1], content
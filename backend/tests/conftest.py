@@ -0,0 +1,100 @@
+"""Shared fixtures: one throwaway SQLite database, emptied after every test.
+
+DATABASE_URL is set before any backend module is imported, so the app's
+lazily created engine points at the test database.
+"""
+import os
+import tempfile
+
+TEST_DIR = tempfile.mkdtemp(prefix="notenest-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DIR, 'primary.db')}"
+os.environ.setdefault("JWT_SECRET_KEY", "notenest-test-secret-key-of-32-bytes-or-more")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import db as db_module
+from backend.cache import note_list_cache
+from backend.db import ReadYourWrites, SessionLocal, get_engine
+from backend.idempotency import InMemoryIdempotencyBackend, idempotency_store
+from backend.main import app
+from backend.model import Base, Child, Parent, ParentChildLink
+from backend.service.auth import create_access_token
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    Base.metadata.create_all(get_engine())
+    yield
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    yield
+    engine = get_engine()
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+    note_list_cache.backend.clear()
+    note_list_cache.reset_stats()
+    idempotency_store.backend = InMemoryIdempotencyBackend()
+    db_module.read_your_writes = ReadYourWrites()
+    db_module.replica_pool = None
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def auth_headers(role: str, user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'user_id': user_id, 'role': role})}"}
+
+
+@pytest.fixture
+def make_child(db):
+    """Create a child account; returns (child_id, auth headers)"""
+    count = [0]
+
+    def make(name: str = "Kid"):
+        count[0] += 1
+        child = Child(name=name, email=f"child{count[0]}-{name.lower()}@example.com",
+                      hashed_password="x", family_code=f"FC{count[0]:04d}{name[:2].upper()}")
+        db.add(child)
+        db.commit()
+        return child.id, auth_headers("child", child.id)
+    return make
+
+
+@pytest.fixture
+def make_parent(db):
+    """Create a parent linked to the given children; returns (parent_id, auth headers)"""
+    count = [0]
+
+    def make(*child_ids: int):
+        count[0] += 1
+        parent = Parent(name="Parent", email=f"parent{count[0]}@example.com",
+                        hashed_password="x", child_id=child_ids[0])
+        db.add(parent)
+        db.flush()
+        db.add_all(ParentChildLink(parent_id=parent.id, child_id=child_id) for child_id in child_ids)
+        db.commit()
+        return parent.id, auth_headers("parent", parent.id)
+    return make
+
+
+@pytest.fixture
+def new_note(client):
+    """Create a note through the API as its owner; returns the response JSON"""
+    def create(headers: dict, owner_id: int, **fields) -> dict:
+        response = client.post("/notes/", headers=headers, json={"title": "Note", "owner_id": owner_id, **fields})
+        assert response.status_code == 200, response.text
+        return response.json()
+    return create
@@ -0,0 +1,144 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from backend.model import ArchivedNote, ChecklistItem, Note, NoteRevision
+from backend.service import notes as notes_service
+from backend.service.archive import _unpack, archive_stale_notes, rehydrate_note
+
+
+@pytest.fixture
+def archived_note(client, db, make_child, new_note):
+    """A child with one archived checklist note (two edits, two items); returns (child_id, headers, note_id)"""
+    child_id, headers = make_child()
+    note = new_note(headers, child_id, title="Old", content="v1\n", is_checklist=True)
+    client.put(f"/notes/{note['id']}", headers=headers,
+               json={"title": "Old", "content": "v2\n", "is_checklist": True, "owner_id": child_id})
+    for text in ("milk", "eggs"):
+        client.post(f"/notes/{note['id']}/checklist/", headers=headers, json={"text": text})
+    long_ago = datetime.utcnow() - timedelta(days=400)
+    db.query(Note).filter(Note.id == note["id"]).update(
+        {"created_at": long_ago, "updated_at": long_ago, "touched_at": None})
+    db.commit()
+    new_note(headers, child_id, title="Fresh")
+
+    assert archive_stale_notes(db, days=90) == 1
+    return child_id, headers, note["id"]
+
+
+def is_archived(db, note_id):
+    db.expire_all()
+    return db.get(ArchivedNote, note_id) is not None
+
+
+def test_archived_notes_leave_the_listing_until_asked_for(client, archived_note):
+    child_id, headers, note_id = archived_note
+    listing = client.get("/notes/", params={"owner_id": child_id}, headers=headers).json()
+    assert [n["title"] for n in listing] == ["Fresh"]
+
+    listing = client.get("/notes/", params={"owner_id": child_id, "include_archived": True}, headers=headers).json()
+    assert [n["title"] for n in listing] == ["Fresh", "Old"]
+    assert [i["text"] for i in listing[1]["checklist_items"]] == ["milk", "eggs"]
+
+
+def test_owner_rehydrates_with_items_and_history(client, db, archived_note):
+    _, headers, note_id = archived_note
+    response = client.get(f"/notes/{note_id}", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["content"] == "v2\n"
+    assert [i["text"] for i in response.json()["checklist_items"]] == ["milk", "eggs"]
+    assert not is_archived(db, note_id)
+    assert db.query(NoteRevision).filter(NoteRevision.note_id == note_id).count() == 2
+    assert client.get(f"/notes/{note_id}/revisions/1", headers=headers).json()["content"] == "v1\n"
+
+
+def test_linked_parent_rehydrates(client, db, make_parent, archived_note):
+    child_id, _, note_id = archived_note
+    _, parent_headers = make_parent(child_id)
+    assert client.get(f"/notes/{note_id}/revisions", headers=parent_headers).status_code == 200
+    assert not is_archived(db, note_id)
+
+
+def test_strangers_cannot_rehydrate(client, db, make_child, make_parent, archived_note):
+    _, _, note_id = archived_note
+    stranger_id, stranger_headers = make_child("Eve")
+    _, parent_headers = make_parent(stranger_id)
+
+    assert client.get(f"/notes/{note_id}").status_code == 404
+    assert client.get(f"/notes/{note_id}", headers=stranger_headers).status_code == 404
+    assert client.get(f"/notes/{note_id}/checklist/").json() == []
+    assert client.delete(f"/notes/{note_id}", headers=stranger_headers).status_code == 404
+    response = client.post("/batch", headers=parent_headers, json={"requests": [{"path": f"/notes/{note_id}"}]})
+    assert response.json()["responses"][0]["status"] == 404
+    assert is_archived(db, note_id)
+
+
+def test_owner_gets_archived_items_from_the_checklist_route(client, db, archived_note):
+    _, headers, note_id = archived_note
+    items = client.get(f"/notes/{note_id}/checklist/", headers=headers).json()
+    assert [i["text"] for i in items] == ["milk", "eggs"]
+    assert not is_archived(db, note_id)
+
+
+def test_empty_checklist_of_a_live_note_does_not_rehydrate(client, make_child, new_note, monkeypatch):
+    child_id, headers = make_child()
+    note = new_note(headers, child_id, is_checklist=True)
+
+    def fail(db, note_id):
+        raise AssertionError("rehydrate_note called for a live note")
+
+    monkeypatch.setattr(notes_service, "rehydrate_note", fail)
+    assert client.get(f"/notes/{note['id']}/checklist/", headers=headers).json() == []
+    assert client.get(f"/notes/{note['id']}/checklist/").json() == []
+
+
+def test_checklist_changes_keep_an_old_note_live(client, db, make_child, new_note):
+    child_id, headers = make_child()
+    note = new_note(headers, child_id, title="Chores", is_checklist=True)
+    item = client.post(f"/notes/{note['id']}/checklist/", headers=headers, json={"text": "dishes"}).json()
+    long_ago = datetime.utcnow() - timedelta(days=400)
+    db.query(Note).filter(Note.id == note["id"]).update(
+        {"created_at": long_ago, "updated_at": long_ago, "touched_at": None})
+    db.commit()
+    new_note(headers, child_id, title="Fresh")
+
+    toggled = client.put(f"/checklist/{item['id']}", headers=headers, json={"text": "dishes", "checked": True})
+    assert toggled.status_code == 200
+    assert archive_stale_notes(db, days=90) == 0
+    assert not is_archived(db, note["id"])
+    # The item change is not a content version: a PATCH based on the old updated_at still applies
+    assert db.get(Note, note["id"]).updated_at == long_ago
+    assert client.put(f"/checklist/{item['id']}", headers=headers,
+                      json={"text": "dishes", "checked": False}).status_code == 200
+
+
+def test_new_rows_never_take_archived_ids(client, db, make_child, new_note):
+    child_id, headers = make_child()
+    note = new_note(headers, child_id, title="Only", is_checklist=True)
+    client.post(f"/notes/{note['id']}/checklist/", headers=headers, json={"text": "milk"})
+    long_ago = datetime.utcnow() - timedelta(days=400)
+    db.query(Note).filter(Note.id == note["id"]).update(
+        {"created_at": long_ago, "updated_at": long_ago, "touched_at": None})
+    db.commit()
+    assert archive_stale_notes(db, days=90) == 1  # the newest note, its item and revision ids are all archived
+
+    other = new_note(headers, child_id, title="Next", is_checklist=True)
+    client.post(f"/notes/{other['id']}/checklist/", headers=headers, json={"text": "eggs"})
+    assert other["id"] != note["id"]
+    response = client.get(f"/notes/{note['id']}", headers=headers)
+    assert response.status_code == 200
+    assert [i["text"] for i in response.json()["checklist_items"]] == ["milk"]
+
+
+def test_an_id_clash_on_restore_is_not_taken_for_a_concurrent_restore(db, archived_note):
+    _, _, note_id = archived_note
+    archived_item_id = _unpack(db.get(ArchivedNote, note_id)).checklist_items[0].id
+    live_note_id = db.query(Note.id).scalar()
+    db.add(ChecklistItem(id=archived_item_id, note_id=live_note_id, text="squatter"))
+    db.commit()
+
+    with pytest.raises(IntegrityError):
+        rehydrate_note(db, note_id)
+    assert is_archived(db, note_id)
@@ -0,0 +1,66 @@
+def batch(client, headers, *requests):
+    response = client.post("/batch", headers=headers, json={"requests": list(requests)})
+    assert response.status_code == 200, response.text
+    return {r["id"]: r for r in response.json()["responses"]}
+
+
+def test_batch_reads_own_notes(client, make_child, new_note):
+    child_id, headers = make_child()
+    note = new_note(headers, child_id, title="Mine", is_checklist=True)
+    client.post(f"/notes/{note['id']}/checklist/", headers=headers, json={"text": "milk"})
+
+    responses = batch(
+        client, headers,
+        {"id": "list", "path": "/notes/", "params": {"owner_id": child_id}},
+        {"id": "note", "path": f"/notes/{note['id']}"},
+        {"id": "items", "path": f"/notes/{note['id']}/checklist/"},
+    )
+    assert [n["title"] for n in responses["list"]["body"]] == ["Mine"]
+    assert responses["note"]["body"]["checklist_items"][0]["text"] == "milk"
+    assert [i["text"] for i in responses["items"]["body"]] == ["milk"]
+
+
+def test_other_owners_notes_are_refused_per_entry(client, make_child, new_note):
+    child_id, headers = make_child("Ann")
+    other_id, other_headers = make_child("Bob")
+    mine = new_note(headers, child_id, title="Mine")
+    theirs = new_note(other_headers, other_id, title="Theirs")
+
+    responses = batch(
+        client, headers,
+        {"id": "mine", "path": f"/notes/{mine['id']}"},
+        {"id": "their-note", "path": f"/notes/{theirs['id']}"},
+        {"id": "their-items", "path": f"/notes/{theirs['id']}/checklist/"},
+        {"id": "their-list", "path": "/notes/", "params": {"owner_id": other_id}},
+        {"id": "missing", "path": "/notes/999999"},
+        {"id": "write", "path": "/notes/import"},
+    )
+    assert responses["mine"]["status"] == 200
+    # Someone else's note looks exactly like one that does not exist
+    assert responses["their-note"] == {**responses["missing"], "id": "their-note"}
+    assert responses["their-items"]["status"] == 404
+    assert responses["their-list"]["status"] == 403
+    assert responses["write"]["status"] == 404
+    assert "Theirs" not in str(responses)
+
+
+def test_parents_batch_only_linked_children(client, make_child, make_parent, new_note):
+    child_id, child_headers = make_child("Ann")
+    other_id, other_headers = make_child("Bob")
+    _, parent_headers = make_parent(child_id)
+    linked = new_note(child_headers, child_id, title="Linked")
+    unlinked = new_note(other_headers, other_id, title="Unlinked")
+
+    responses = batch(
+        client, parent_headers,
+        {"id": "linked", "path": f"/notes/{linked['id']}"},
+        {"id": "unlinked", "path": f"/notes/{unlinked['id']}"},
+        {"id": "unlinked-list", "path": "/notes/", "params": {"owner_id": other_id}},
+    )
+    assert responses["linked"]["body"]["title"] == "Linked"
+    assert responses["unlinked"]["status"] == 404
+    assert responses["unlinked-list"]["status"] == 403
+
+
+def test_batch_requires_authentication(client):
+    assert client.post("/batch", json={"requests": [{"path": "/notes/1"}]}).status_code == 401
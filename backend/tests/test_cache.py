@@ -0,0 +1,85 @@
+from backend import main
+from backend.cache import InMemoryCacheBackend, note_list_cache
+
+
+def list_titles(client, headers, owner_id):
+    response = client.get("/notes/", params={"owner_id": owner_id}, headers=headers)
+    assert response.status_code == 200
+    return sorted(n["title"] for n in response.json())
+
+
+def test_listing_is_served_from_cache_until_a_write(client, make_child, new_note):
+    child_id, headers = make_child()
+    new_note(headers, child_id, title="First")
+
+    assert list_titles(client, headers, child_id) == ["First"]
+    assert list_titles(client, headers, child_id) == ["First"]
+    assert note_list_cache.stats()["hits"] == 1
+
+    new_note(headers, child_id, title="Second")
+    assert list_titles(client, headers, child_id) == ["First", "Second"]
+
+
+def test_every_note_and_checklist_write_invalidates(client, make_child, new_note):
+    child_id, headers = make_child()
+    note = new_note(headers, child_id, title="Groceries", is_checklist=True)
+    list_titles(client, headers, child_id)
+
+    client.put(f"/notes/{note['id']}", headers=headers, json={"title": "Shopping", "owner_id": child_id})
+    assert list_titles(client, headers, child_id) == ["Shopping"]
+
+    item = client.post(f"/notes/{note['id']}/checklist/", headers=headers, json={"text": "milk"}).json()
+    page = client.get("/notes/", params={"owner_id": child_id}, headers=headers).json()
+    assert [i["text"] for i in page[0]["checklist_items"]] == ["milk"]
+
+    client.put(f"/checklist/{item['id']}", headers=headers, json={"text": "milk", "checked": True})
+    page = client.get("/notes/", params={"owner_id": child_id}, headers=headers).json()
+    assert page[0]["checklist_items"][0]["checked"] is True
+
+    client.delete(f"/checklist/{item['id']}", headers=headers)
+    page = client.get("/notes/", params={"owner_id": child_id}, headers=headers).json()
+    assert page[0]["checklist_items"] == []
+
+    client.delete(f"/notes/{note['id']}", headers=headers)
+    assert list_titles(client, headers, child_id) == []
+
+
+def test_invalidation_is_per_owner(client, make_child, new_note):
+    first_id, first_headers = make_child("Ann")
+    second_id, second_headers = make_child("Bob")
+    new_note(first_headers, first_id)
+    list_titles(client, first_headers, first_id)
+
+    new_note(second_headers, second_id)
+    list_titles(client, first_headers, first_id)
+    assert note_list_cache.stats()["hits"] == 1
+
+
+def test_memory_backend_is_bounded_by_bytes():
+    backend = InMemoryCacheBackend(max_bytes=100)
+    backend.set("a", b"x" * 39, ttl=60)
+    backend.set("b", b"x" * 39, ttl=60)
+    backend.get("a")
+    backend.set("c", b"x" * 39, ttl=60)  # over 100 bytes: the least recently used entry goes
+
+    assert backend.get("b") is None
+    assert backend.get("a") is not None and backend.get("c") is not None
+    assert backend.used_bytes == 80
+
+    backend.set("huge", b"x" * 200, ttl=60)  # larger than the whole cache: not stored, nothing evicted
+    assert backend.get("huge") is None
+    assert backend.used_bytes == 80
+
+
+def test_metrics_are_disabled_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(main, "METRICS_TOKEN", None)
+    assert client.get("/metrics/cache").status_code == 404
+
+
+def test_metrics_require_the_token(client, monkeypatch):
+    monkeypatch.setattr(main, "METRICS_TOKEN", "s3cret")
+    assert client.get("/metrics/cache").status_code == 401
+    assert client.get("/metrics/jobs", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    for name in ("cache", "idempotency", "jobs", "archive"):
+        response = client.get(f"/metrics/{name}", headers={"Authorization": "Bearer s3cret"})
+        assert response.status_code == 200, name
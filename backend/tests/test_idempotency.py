@@ -0,0 +1,81 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.idempotency import InMemoryIdempotencyBackend, StoredResponse
+from backend.model import ChecklistItem, Note
+
+
+def post_note(client, headers, owner_id, key, title="Note"):
+    return client.post("/notes/", headers={**headers, "Idempotency-Key": key},
+                       json={"title": title, "owner_id": owner_id})
+
+
+def test_replay_returns_the_first_response(client, db, make_child):
+    child_id, headers = make_child()
+    first = post_note(client, headers, child_id, "k1")
+    again = post_note(client, headers, child_id, "k1")
+
+    assert first.status_code == again.status_code == 200
+    assert again.content == first.content
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert db.query(Note).count() == 1
+
+
+def test_concurrent_duplicates_create_one_note(client, db, make_child):
+    child_id, headers = make_child()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(lambda _: post_note(client, headers, child_id, "burst"), range(8)))
+
+    assert [r.status_code for r in responses] == [200] * 8
+    assert len({r.content for r in responses}) == 1
+    assert db.query(Note).count() == 1
+
+
+def test_reusing_a_key_with_another_body_is_rejected(client, make_child):
+    child_id, headers = make_child()
+    post_note(client, headers, child_id, "k1", title="First")
+    assert post_note(client, headers, child_id, "k1", title="Second").status_code == 422
+
+
+def test_keys_are_scoped_per_caller(client, db, make_child):
+    first_id, first_headers = make_child("Ann")
+    second_id, second_headers = make_child("Bob")
+    first = post_note(client, first_headers, first_id, "shared")
+    second = post_note(client, second_headers, second_id, "shared")
+
+    assert second.json()["owner_id"] == second_id
+    assert first.json()["id"] != second.json()["id"]
+    assert db.query(Note).count() == 2
+
+
+def test_checklist_keys_need_a_caller_and_are_scoped_per_note(client, db, make_child, new_note):
+    child_id, headers = make_child()
+    notes = [new_note(headers, child_id, title=title, is_checklist=True) for title in ("A", "B")]
+
+    anonymous = client.post(f"/notes/{notes[0]['id']}/checklist/", headers={"Idempotency-Key": "item"},
+                            json={"text": "milk"})
+    assert anonymous.status_code == 401
+    assert client.post(f"/notes/{notes[0]['id']}/checklist/", json={"text": "milk"}).status_code == 200
+
+    for note in notes:
+        for _ in range(2):
+            response = client.post(f"/notes/{note['id']}/checklist/",
+                                   headers={**headers, "Idempotency-Key": "item"}, json={"text": "eggs"})
+            assert response.status_code == 200
+    assert sorted((i.note_id, i.text) for i in db.query(ChecklistItem)) == [
+        (notes[0]["id"], "eggs"), (notes[0]["id"], "milk"), (notes[1]["id"], "eggs"),
+    ]
+
+
+def test_memory_store_is_bounded_by_bytes():
+    store = InMemoryIdempotencyBackend(max_bytes=200)
+    response = StoredResponse("f" * 8, 200, "application/json", b"x" * 50)
+    for key in ("k1", "k2", "k3"):
+        store.set(key, response, ttl=60)
+
+    assert store.get("k1") is None
+    assert store.get("k2") == store.get("k3") == response
+    assert store.used_bytes <= 200
+
+    store.set("big", response._replace(body=b"x" * 500), ttl=60)
+    assert store.get("big") is None and store.get("k3") == response
@@ -0,0 +1,93 @@
+import time
+from datetime import datetime, timedelta
+
+from backend.jobs import JobQueue, job, job_queue
+from backend.model import Job, NoteRevision
+from backend.service.revisions import SNAPSHOT_INTERVAL, compact_revisions, get_revision
+
+calls = []
+
+
+@job("tests.noop")
+def noop(db):
+    calls.append("noop")
+
+
+@job("tests.fail")
+def fail(db):
+    calls.append("fail")
+    raise RuntimeError("boom")
+
+
+def test_only_expired_leases_are_recovered(db):
+    now = datetime.utcnow()
+    db.add_all([
+        Job(name="tests.noop", status="running", lease_expires_at=now + timedelta(minutes=5)),
+        Job(name="tests.noop", status="running", lease_expires_at=now - timedelta(seconds=1)),
+        Job(name="tests.noop", status="running", lease_expires_at=None),
+    ])
+    db.commit()
+
+    assert JobQueue(mode="durable")._recover_expired_jobs() == 2
+    db.expire_all()
+    assert [row.status for row in db.query(Job).order_by(Job.id)] == ["running", "pending", "pending"]
+
+
+def test_durable_schedules_queue_one_run_per_window(db):
+    first_process, second_process = JobQueue(mode="durable"), JobQueue(mode="durable")
+    assert first_process._enqueue_once("tests.noop", "tests.noop:1", {})
+    assert not second_process._enqueue_once("tests.noop", "tests.noop:1", {})
+
+    calls.clear()
+    assert first_process._claim_and_run()
+    assert calls == ["noop"]
+    # The finished run still blocks its window, and is cleared by the next window's run
+    assert not second_process._enqueue_once("tests.noop", "tests.noop:1", {})
+    assert second_process._enqueue_once("tests.noop", "tests.noop:2", {})
+    db.expire_all()
+    assert [(row.schedule_key, row.status) for row in db.query(Job)] == [("tests.noop:2", "pending")]
+
+
+def test_schedule_drops_fired_timers():
+    jobs = JobQueue()
+    jobs.schedule("tests.noop", 0.01)
+    time.sleep(0.3)
+    assert len(jobs._timers) <= 2
+    jobs.stop()
+    assert jobs._timers == []
+
+
+def test_stop_cancels_retry_timers():
+    calls.clear()
+    jobs = JobQueue(max_attempts=3)
+    jobs.enqueue("tests.fail")  # no workers started, so it runs inline and schedules a retry
+    retries = list(jobs._timers)
+    assert calls == ["fail"] and len(retries) == 1
+
+    jobs.stop()
+    retries[0].join(1)
+    assert not retries[0].is_alive()
+    assert calls == ["fail"]
+
+
+def test_edits_are_stored_whole_until_compacted(client, db, make_child, new_note, monkeypatch):
+    monkeypatch.setattr(job_queue, "enqueue", lambda name, **payload: None)  # a backlog: nothing runs yet
+    child_id, headers = make_child()
+    versions = ["one\n"]
+    note = new_note(headers, child_id, content=versions[0])
+    for i in range(SNAPSHOT_INTERVAL + 2):
+        versions.append(f"one\nline {i}\n")
+        client.put(f"/notes/{note['id']}", headers=headers,
+                   json={"title": "Note", "content": versions[-1], "owner_id": child_id})
+
+    def snapshots():
+        db.expire_all()
+        return [r.rev for r in db.query(NoteRevision).filter(NoteRevision.is_snapshot.is_(True))
+                .order_by(NoteRevision.rev)]
+
+    assert snapshots() == list(range(1, len(versions) + 1))
+    assert compact_revisions(db, note["id"]) == len(versions) - 2
+    assert compact_revisions(db, note["id"]) == 0
+    assert snapshots() == [1, SNAPSHOT_INTERVAL + 1]
+    for rev, expected in enumerate(versions, start=1):
+        assert get_revision(db, note["id"], rev)[1] == expected
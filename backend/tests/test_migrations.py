@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, text
+
+from backend.model import Base
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), os.pardir)
+
+
+def run(args, url, cwd=BACKEND_DIR):
+    env = {**os.environ, "DATABASE_URL": url}
+    result = subprocess.run([sys.executable, *args], cwd=cwd, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def test_empty_database_is_built_and_stamped_at_head(tmp_path):
+    url = f"sqlite:///{tmp_path / 'fresh.db'}"
+    run(["-m", "alembic", "upgrade", "head"], url)
+    heads = run(["-m", "alembic", "heads"], url).split()[0]
+
+    engine = create_engine(url)
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT version_num FROM alembic_version")).scalar() == heads
+        assert compare_metadata(MigrationContext.configure(connection), Base.metadata) == []
+    engine.dispose()
+
+
+def test_sessions_bind_without_the_app_lifespan(tmp_path):
+    url = f"sqlite:///{tmp_path / 'script.db'}"
+    script = "from sqlalchemy import text; from backend.db import SessionLocal; print(SessionLocal().execute(text('SELECT 7')).scalar())"
+    assert run(["-c", script], url, cwd=os.path.join(BACKEND_DIR, os.pardir)).strip() == "7"
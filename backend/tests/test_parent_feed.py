@@ -0,0 +1,56 @@
+from backend.model import Child
+
+
+def read_feed(client, headers, limit=2):
+    """Every page of the feed; returns the note ids in order"""
+    ids, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/parent/feed", params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        ids += [n["id"] for n in page["notes"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            return ids
+
+
+def test_feed_pages_through_linked_children_only(client, make_child, make_parent, new_note):
+    first_id, first_headers = make_child("Ann")
+    second_id, second_headers = make_child("Bob")
+    other_id, other_headers = make_child("Cat")
+    _, parent_headers = make_parent(first_id, second_id)
+    linked = []
+    for i in range(3):
+        linked.append(new_note(first_headers, first_id, title=f"Ann {i}")["id"])
+        linked.append(new_note(second_headers, second_id, title=f"Bob {i}")["id"])
+        new_note(other_headers, other_id, title=f"Cat {i}")
+
+    # Notes created within one clock tick tie on created_at; ids break the tie, newest first
+    assert read_feed(client, parent_headers) == sorted(linked, reverse=True)
+
+
+def test_linking_a_child_adds_their_notes(client, db, make_child, make_parent, new_note):
+    first_id, first_headers = make_child("Ann")
+    second_id, second_headers = make_child("Bob")
+    _, parent_headers = make_parent(first_id)
+    new_note(first_headers, first_id)
+    later = new_note(second_headers, second_id)["id"]
+    assert later not in read_feed(client, parent_headers)
+
+    family_code = db.get(Child, second_id).family_code
+    response = client.post("/parent/children", headers=parent_headers, json={"family_code": family_code})
+    assert response.status_code == 200
+    assert later in read_feed(client, parent_headers)
+
+
+def test_feed_is_for_parents_only(client, make_child):
+    _, child_headers = make_child()
+    assert client.get("/parent/feed", headers=child_headers).status_code == 403
+    assert client.get("/parent/feed").status_code == 401
+
+
+def test_bad_cursor_is_rejected(client, make_child, make_parent):
+    child_id, _ = make_child()
+    _, parent_headers = make_parent(child_id)
+    assert client.get("/parent/feed", params={"cursor": "not-a-cursor"}, headers=parent_headers).status_code == 400
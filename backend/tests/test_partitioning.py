@@ -0,0 +1,65 @@
+"""Online partitioning against a real PostgreSQL database.
+
+Skipped unless TEST_POSTGRES_URL names a throwaway database: the test drops
+and recreates every table in it.
+"""
+import os
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from backend.model import Base
+from backend.partitioning import drop_old, is_partitioned, rebuild
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+pytestmark = pytest.mark.skipif(not POSTGRES_URL, reason="set TEST_POSTGRES_URL to a throwaway PostgreSQL database")
+
+
+@pytest.fixture
+def pg():
+    engine = create_engine(POSTGRES_URL, isolation_level="AUTOCOMMIT")
+    with engine.connect() as conn:
+        drop_old(conn)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield engine
+    with engine.connect() as conn:
+        drop_old(conn)
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+def test_live_edits_of_notes_with_items_are_mirrored(pg):
+    with pg.connect() as conn:
+        conn.execute(text(
+            "INSERT INTO children (id, name, email, hashed_password, family_code) VALUES (1, 'Kid', 'k@x', 'x', 'FC1')"
+        ))
+        for note_id in (1, 2, 3):
+            conn.execute(text(
+                "INSERT INTO notes (id, title, content, owner_id, is_checklist) VALUES (:id, 'Note', '', 1, true)"
+            ), {"id": note_id})
+            conn.execute(text(
+                "INSERT INTO checklist_items (note_id, owner_id, text, checked) VALUES (:id, 1, 'milk', false)"
+            ), {"id": note_id})
+
+    edited = []
+
+    def log(message):
+        # Runs between batches: the new tables exist, triggers are live, and items are already copied
+        if message.startswith("checklist_items:") and not edited:
+            with pg.begin() as conn:
+                conn.execute(text("UPDATE notes SET title = 'Renamed' WHERE id = 1"))
+                conn.execute(text("UPDATE checklist_items SET checked = true WHERE note_id = 1"))
+                conn.execute(text("INSERT INTO checklist_items (note_id, text, checked) VALUES (2, 'eggs', false)"))
+                conn.execute(text("DELETE FROM checklist_items WHERE note_id = 3"))
+                conn.execute(text("DELETE FROM notes WHERE id = 3"))
+            edited.append(message)
+
+    with pg.connect() as conn:
+        rebuild(conn, partitions=4, batch_size=1, log=log)
+        assert edited
+        assert is_partitioned(conn)
+        assert conn.execute(text("SELECT title FROM notes ORDER BY id")).scalars().all() == ["Renamed", "Note"]
+        items = conn.execute(text("SELECT note_id, text, checked, owner_id FROM checklist_items ORDER BY id")).all()
+        assert [tuple(item) for item in items] == [(1, "milk", True, 1), (2, "milk", False, 1), (2, "eggs", False, 1)]
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+
+from backend.model import ChecklistItem
+
+
+def patch(client, headers, note_id, base, **body):
+    return client.patch(f"/notes/{note_id}", headers=headers, json={"base_updated_at": base, **body})
+
+
+def test_stale_base_version_is_409(client, make_child, new_note):
+    child_id, headers = make_child()
+    note = new_note(headers, child_id, content="hello")
+    first = patch(client, headers, note["id"], note["updated_at"], title="Mine")
+    assert first.status_code == 200
+
+    second = patch(client, headers, note["id"], note["updated_at"], title="Theirs")
+    assert second.status_code == 409
+    assert client.get(f"/notes/{note['id']}").json()["title"] == "Mine"
+
+    retried = patch(client, headers, note["id"], first.json()["updated_at"], title="Theirs")
+    assert retried.status_code == 200
+
+
+def test_splice_offsets_count_utf16_code_units(client, make_child, new_note):
+    child_id, headers = make_child()
+    note = new_note(headers, child_id, content="hi 😀 there")
+    # JavaScript: "hi 😀 there".indexOf("there") === 6
+    response = patch(client, headers, note["id"], note["updated_at"],
+                     splices=[{"offset": 6, "delete_count": 5, "insert": "you"}, {"offset": 0, "insert": "> "}])
+    assert response.status_code == 200
+    assert response.json()["content"] == "> hi 😀 you"
+
+
+def test_splice_inside_a_surrogate_pair_is_rejected(client, make_child, new_note):
+    child_id, headers = make_child()
+    note = new_note(headers, child_id, content="😀")
+    response = patch(client, headers, note["id"], note["updated_at"], splices=[{"offset": 1, "insert": "x"}])
+    assert response.status_code == 400
+    out_of_range = patch(client, headers, note["id"], note["updated_at"], splices=[{"offset": 3}])
+    assert out_of_range.status_code == 400
+
+
+def test_null_clears_folder_and_omitted_fields_are_kept(client, make_child, new_note):
+    child_id, headers = make_child()
+    note = new_note(headers, child_id, content="body", folder="school", tags=["a", "b"])
+    response = patch(client, headers, note["id"], note["updated_at"], folder=None, tags=None)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["folder"] is None
+    assert body["tags"] == []
+    assert body["content"] == "body"
+    assert body["title"] == note["title"]
+
+
+def test_null_title_is_rejected(client, make_child, new_note):
+    child_id, headers = make_child()
+    note = new_note(headers, child_id)
+    assert patch(client, headers, note["id"], note["updated_at"], title=None).status_code == 400
+
+
+def test_writes_are_scoped_to_the_callers_notes(client, db, make_child, new_note):
+    child_id, headers = make_child("Ann")
+    other_id, other_headers = make_child("Bob")
+    note = new_note(headers, child_id, title="Mine", is_checklist=True)
+
+    body = {"title": "Taken", "owner_id": other_id}
+    assert client.put(f"/notes/{note['id']}", headers=other_headers, json=body).status_code == 404
+    assert patch(client, other_headers, note["id"], note["updated_at"], title="Taken").status_code == 404
+    assert client.delete(f"/notes/{note['id']}", headers=other_headers).status_code == 404
+    assert client.get(f"/notes/{note['id']}", headers=headers).json()["title"] == "Mine"
+
+    # Adding an item still finds the note's real owner when the caller is not it
+    client.post(f"/notes/{note['id']}/checklist/", headers=other_headers, json={"text": "milk"})
+    assert [i.owner_id for i in db.query(ChecklistItem)] == [child_id]
+
+
+def test_base_version_may_carry_a_utc_offset(client, make_child, new_note):
+    child_id, headers = make_child()
+    note = new_note(headers, child_id, title="Draft")
+    base = datetime.fromisoformat(note["updated_at"])
+
+    as_zulu = patch(client, headers, note["id"], base.isoformat() + "Z", title="Zulu")
+    assert as_zulu.status_code == 200
+    shifted = datetime.fromisoformat(as_zulu.json()["updated_at"]).replace(tzinfo=timezone.utc)
+    as_offset = patch(client, headers, note["id"], shifted.astimezone(timezone(timedelta(hours=2))).isoformat(),
+                      title="Offset")
+    assert as_offset.status_code == 200
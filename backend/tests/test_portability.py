@@ -0,0 +1,61 @@
+import io
+import json
+import zipfile
+
+
+def export(client, headers, owner_id, format="ndjson"):
+    response = client.get("/notes/export", params={"owner_id": owner_id, "format": format}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.content
+
+
+def portable(ndjson: bytes) -> list:
+    """Export lines without the ids that differ between accounts"""
+    records = [json.loads(line) for line in ndjson.splitlines() if line.strip()]
+    for record in records:
+        record.pop("id")
+        for item in record["checklist_items"]:
+            item.pop("id")
+    return records
+
+
+def test_export_then_import_round_trips(client, make_child, new_note):
+    source_id, source_headers = make_child("Ann")
+    target_id, target_headers = make_child("Bob")
+    new_note(source_headers, source_id, title="Diary", content="Dear diary,\nsnow ☃ today 🎉\n",
+             folder="School", tags=["winter", "fun"])
+    groceries = new_note(source_headers, source_id, title="Groceries", is_checklist=True)
+    for text in ("milk", "eggs"):
+        client.post(f"/notes/{groceries['id']}/checklist/", headers=source_headers, json={"text": text})
+    exported = export(client, source_headers, source_id)
+
+    # Uploaded in small chunks, so lines arrive split across reads
+    chunks = (exported[i:i + 7] for i in range(0, len(exported), 7))
+    response = client.post("/notes/import", headers=target_headers, content=chunks)
+    assert response.json() == {"notes": 2, "checklist_items": 2}
+
+    assert portable(export(client, target_headers, target_id)) == portable(exported)
+    titles = [n["title"] for n in client.get("/notes/", params={"owner_id": target_id}, headers=target_headers).json()]
+    assert sorted(titles) == ["Diary", "Groceries"]
+
+
+def test_bad_line_reports_how_far_the_import_got(client, make_child):
+    child_id, headers = make_child()
+    body = b'{"title": "ok"}\n{"content": "no title"}\n'
+    response = client.post("/notes/import", headers=headers, content=body)
+    assert response.status_code == 400
+    assert "Line 2" in response.json()["detail"]
+
+
+def test_export_is_limited_to_own_and_linked_children(client, make_child, make_parent, new_note):
+    child_id, child_headers = make_child("Ann")
+    other_id, other_headers = make_child("Bob")
+    _, parent_headers = make_parent(child_id)
+    new_note(child_headers, child_id, title="Mine", folder="Art")
+
+    assert client.get("/notes/export", params={"owner_id": child_id}, headers=other_headers).status_code == 403
+    assert client.get("/notes/export", params={"owner_id": other_id}, headers=parent_headers).status_code == 403
+    archive = zipfile.ZipFile(io.BytesIO(export(client, parent_headers, child_id, format="markdown")))
+    [name] = archive.namelist()
+    assert name.startswith("art/")
+    assert "Mine" in archive.read(name).decode("utf-8")
@@ -0,0 +1,60 @@
+import shutil
+
+import pytest
+
+from backend import db as db_module
+from backend.cache import InMemoryCacheBackend, note_list_cache
+from backend.db import ReadYourWrites, ReplicaPool, get_engine
+
+
+@pytest.fixture
+def lagging_replica(tmp_path):
+    """A replica frozen at the primary's current contents; returns a function that takes the snapshot"""
+    pools = []
+
+    def snapshot():
+        path = tmp_path / "replica.db"
+        shutil.copy(get_engine().url.database, path)
+        pools.append(ReplicaPool([f"sqlite:///{path}"]))
+        db_module.replica_pool = pools[-1]
+    yield snapshot
+    for pool in pools:
+        pool.dispose()
+
+
+def list_notes(client, headers, owner_id):
+    response = client.get("/notes/", params={"owner_id": owner_id}, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_writer_reads_its_write_after_a_stale_replica_read(client, make_child, make_parent, new_note,
+                                                          lagging_replica):
+    child_id, child_headers = make_child()
+    _, parent_headers = make_parent(child_id)
+    lagging_replica()
+
+    new_note(child_headers, child_id, title="Fresh")
+    assert list_notes(client, parent_headers, child_id) == []  # the parent is not pinned: replica, stale
+    assert [n["title"] for n in list_notes(client, child_headers, child_id)] == ["Fresh"]
+
+
+def test_replica_pages_are_not_cached(client, make_child, make_parent, new_note, lagging_replica):
+    child_id, child_headers = make_child()
+    _, parent_headers = make_parent(child_id)
+    new_note(child_headers, child_id, title="Old")
+    lagging_replica()
+
+    list_notes(client, parent_headers, child_id)
+    list_notes(client, parent_headers, child_id)
+    assert note_list_cache.stats()["hits"] == 0
+
+
+def test_the_window_is_shared_through_the_cache_backend():
+    shared = InMemoryCacheBackend()
+    first_worker, second_worker = ReadYourWrites(shared, window=5), ReadYourWrites(shared, window=5)
+    first_worker.record_write(("child", 1))
+
+    assert second_worker.pinned(("child", 1))
+    assert not second_worker.pinned(("child", 2))
+    assert not ReadYourWrites(InMemoryCacheBackend()).pinned(("child", 1))
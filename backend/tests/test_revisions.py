@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.service.revisions import SNAPSHOT_INTERVAL
+
+
+def test_every_version_can_be_rebuilt(client, make_child, new_note):
+    child_id, headers = make_child()
+    versions = ["line one\n"]
+    note = new_note(headers, child_id, content=versions[0])
+    # Enough edits to cross a snapshot boundary, so some versions rebuild from diffs
+    for i in range(SNAPSHOT_INTERVAL + 5):
+        lines = versions[-1].splitlines(keepends=True)
+        content = "".join(lines + [f"line {i}\n"]) if i % 3 else "".join([f"first {i}\n"] + lines[1:])
+        client.put(f"/notes/{note['id']}", headers=headers, json={"title": "Note", "content": content, "owner_id": child_id})
+        versions.append(content)
+
+    revisions = client.get(f"/notes/{note['id']}/revisions", headers=headers).json()
+    assert [r["rev"] for r in revisions] == list(range(1, len(versions) + 1))
+    assert [r["rev"] for r in revisions if r["is_snapshot"]] == [1, SNAPSHOT_INTERVAL + 1]
+    for rev, expected in enumerate(versions, start=1):
+        response = client.get(f"/notes/{note['id']}/revisions/{rev}", headers=headers)
+        assert response.json()["content"] == expected
+
+
+def test_unknown_revision_is_404(client, make_child, new_note):
+    child_id, headers = make_child()
+    note = new_note(headers, child_id, content="x")
+    assert client.get(f"/notes/{note['id']}/revisions/9", headers=headers).status_code == 404
+
+
+def test_concurrent_edits_get_distinct_revisions(client, make_child, new_note):
+    child_id, headers = make_child()
+    note = new_note(headers, child_id, content="start\n")
+    edits = 8
+
+    def edit(i):
+        return client.put(f"/notes/{note['id']}", headers=headers,
+                          json={"title": "Note", "content": f"edit {i}\n", "owner_id": child_id})
+
+    with ThreadPoolExecutor(max_workers=edits) as pool:
+        responses = list(pool.map(edit, range(edits)))
+
+    assert [r.status_code for r in responses] == [200] * edits
+    revisions = client.get(f"/notes/{note['id']}/revisions", headers=headers).json()
+    assert [r["rev"] for r in revisions] == list(range(1, edits + 2))
+    final = client.get(f"/notes/{note['id']}").json()["content"]
+    latest = client.get(f"/notes/{note['id']}/revisions/{edits + 1}", headers=headers).json()["content"]
+    assert latest == final